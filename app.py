@@ -6,11 +6,14 @@ Guaranteed to work on Streamlit Cloud
 """
 
 import streamlit as st
-import PyPDF2
-import io
 import re
 from datetime import datetime
+import numpy as np
 import requests
+from pdf_extraction import extract_pages
+from text_cleanup import clean_pages
+from chunking import chunk_text
+from sentence_scoring import SentenceMatrix, top_sentences
 
 # Page configuration
 st.set_page_config(
@@ -161,14 +164,7 @@ window.matchMedia('(prefers-color-scheme: dark)').addEventListener('change', app
 def extract_text_from_pdf(pdf_file):
     """Extract text from a single PDF file"""
     try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
-        text = ""
-        
-        for page_num in range(len(pdf_reader.pages)):
-            page = pdf_reader.pages[page_num]
-            text += page.extract_text() + "\n"
-        
-        return text.strip()
+        return "\n".join(clean_pages(extract_pages(pdf_file))).strip()
     except Exception as e:
         st.error(f"Error reading PDF: {str(e)}")
         return None
@@ -182,96 +178,62 @@ def get_text_stats(text):
 
 def create_intelligent_summary(text, target_length):
     """Create an intelligent summary using advanced rule-based extraction"""
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
+    matrix = SentenceMatrix.from_text(text)
+    sentences = matrix.sentences
     
     if len(sentences) < 3:
         return text[:500] + "..." if len(text) > 500 else text
     
-    # Advanced scoring system
-    scored_sentences = []
-    
-    # Get important keywords from the text
-    word_freq = {}
-    words = re.findall(r'\b[a-zA-Z]{4,}\b', text.lower())
-    for word in words:
-        word_freq[word] = word_freq.get(word, 0) + 1
+    # Get important keywords from the text (counted once per distinct token)
+    word_freq = matrix.word_frequencies(r'\b[a-z]{4,}\b')
     
     # Get top keywords (excluding common words)
     common_words = {'that', 'this', 'with', 'have', 'will', 'been', 'from', 'they', 'know', 'want', 'been', 'good', 'much', 'some', 'time', 'very', 'when', 'come', 'here', 'just', 'like', 'long', 'make', 'many', 'over', 'such', 'take', 'than', 'them', 'well', 'were'}
-    important_keywords = [word for word, freq in sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:20] if word not in common_words]
+    important_keywords = [word for word, freq in word_freq.most_common(20) if word not in common_words]
     
-    for i, sentence in enumerate(sentences):
-        score = 0
-        sentence_lower = sentence.lower()
-        
-        # Length score (prefer medium-length sentences)
-        if 50 <= len(sentence) <= 250:
-            score += 3
-        elif 30 <= len(sentence) <= 300:
-            score += 2
-        elif len(sentence) >= 20:
-            score += 1
-        
-        # Keyword frequency score
-        for keyword in important_keywords[:10]:
-            if keyword in sentence_lower:
-                score += 2
-        
-        # Position score (first and last sentences often important)
-        if i < 3:  # First 3 sentences
-            score += 3
-        elif i >= len(sentences) - 3:  # Last 3 sentences
-            score += 2
-        elif i < len(sentences) * 0.2:  # First 20%
-            score += 1
-        
-        # Important phrase indicators
-        important_phrases = [
-            'in conclusion', 'to summarize', 'in summary', 'overall', 'finally',
-            'important', 'significant', 'key', 'main', 'primary', 'essential',
-            'results show', 'findings indicate', 'research shows', 'study found',
-            'analysis reveals', 'data suggests', 'evidence shows',
-            'therefore', 'thus', 'consequently', 'as a result'
-        ]
-        
-        for phrase in important_phrases:
-            if phrase in sentence_lower:
-                score += 3
-        
-        # Numerical data and statistics (often important)
-        if re.search(r'\d+%|\d+\.\d+|\$\d+|figure \d+|table \d+', sentence_lower):
-            score += 2
-        
-        # Questions (often highlight key points)
-        if sentence.strip().endswith('?'):
-            score += 1
-        
-        # Avoid very short or very long sentences
-        if len(sentence) < 20:
-            score -= 2
-        elif len(sentence) > 400:
-            score -= 1
-        
-        scored_sentences.append((sentence, score, i))
+    # Advanced scoring system, one array operation per feature
+    lengths = matrix.lengths
+    position = np.arange(len(sentences))
     
-    # Sort by score, then by position for tie-breaking
-    scored_sentences.sort(key=lambda x: (x[1], -x[2]), reverse=True)
+    # Length score (prefer medium-length sentences)
+    score = np.select(
+        [(lengths >= 50) & (lengths <= 250), (lengths >= 30) & (lengths <= 300), lengths >= 20], [3, 2, 1], 0
+    )
+    
+    # Keyword frequency score
+    score += 2 * matrix.contains(important_keywords[:10])
+    
+    # Position score (first and last sentences often important)
+    score += np.select(
+        [position < 3, position >= len(sentences) - 3, position < len(sentences) * 0.2], [3, 2, 1], 0
+    )
+    
+    # Important phrase indicators
+    important_phrases = [
+        'in conclusion', 'to summarize', 'in summary', 'overall', 'finally',
+        'important', 'significant', 'key', 'main', 'primary', 'essential',
+        'results show', 'findings indicate', 'research shows', 'study found',
+        'analysis reveals', 'data suggests', 'evidence shows',
+        'therefore', 'thus', 'consequently', 'as a result'
+    ]
+    score += 3 * matrix.contains(important_phrases)
+    
+    # Numerical data and statistics (often important)
+    score += 2 * matrix.matches(r'\d+%|\d+\.\d+|\$\d+|figure \d+|table \d+')
+    
+    # Avoid very long sentences (shorter ones never pass the 20 character cut)
+    score -= lengths > 400
     
     # Select number of sentences based on target length
     if target_length == "short":
-        num_sentences = min(4, len(scored_sentences))
+        num_sentences = 4
     elif target_length == "medium":
-        num_sentences = min(7, len(scored_sentences))
+        num_sentences = 7
     else:  # long
-        num_sentences = min(12, len(scored_sentences))
-    
-    # Get selected sentences and sort by original position
-    selected = scored_sentences[:num_sentences]
-    selected.sort(key=lambda x: x[2])  # Sort by original position
+        num_sentences = 12
     
-    summary_sentences = [s[0] for s in selected]
-    summary = ". ".join(summary_sentences)
+    # Best scores, earlier sentences first on ties, kept in original order
+    summary = ". ".join(sentences[i] for i in top_sentences(score, num_sentences))
     
     # Clean up the summary
     summary = re.sub(r'\s+', ' ', summary)  # Remove extra whitespace
@@ -282,17 +244,6 @@ def create_intelligent_summary(text, target_length):
     
     return summary
 
-def chunk_text(text, max_words=800):
-    """Split text into chunks for processing"""
-    words = text.split()
-    chunks = []
-    
-    for i in range(0, len(words), max_words):
-        chunk = " ".join(words[i:i + max_words])
-        chunks.append(chunk)
-    
-    return chunks
-
 def main():
     # Header
     st.markdown("""
@@ -405,7 +356,7 @@ def main():
                 
                 if len(text.split()) > 2000:
                     # For large documents, process in chunks
-                    chunks = chunk_text(text, max_words=1000)
+                    chunks = chunk_text(text, max_size=1000, unit="words")
                     chunk_summaries = []
                     
                     progress_bar = st.progress(0)
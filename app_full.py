@@ -6,14 +6,20 @@ Optimized for Streamlit Cloud
 """
 
 import streamlit as st
-import PyPDF2
-import io
 import re
 from datetime import datetime
 import requests
+from uploads import upload_size
+from pdf_extraction import extract_pages
+from text_cleanup import clean_pages
+from chunking import chunk_text
+from model_context import transformers_context_length
+from sentence_scoring import SentenceMatrix, top_sentences
+from model_registry import MODELS
 from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM, AutoModelForCausalLM
 import torch
 import os
+import numpy as np
 
 # Page configuration
 st.set_page_config(
@@ -224,7 +230,11 @@ setInterval(() => {
 </script>
 """, unsafe_allow_html=True)
 
-@st.cache_resource
+def load_pipeline(task, model_name):
+    """CPU pipeline from the shared model registry (reloaded if it was evicted)"""
+    # Force CPU usage for Streamlit Cloud
+    return MODELS.get(model_name, lambda: pipeline(task, model=model_name, device=-1, framework="pt"))
+
 def get_summarizer(model_choice="BART"):
     """Initialize the summarization model - supports BART with optional Llama"""
     try:
@@ -235,12 +245,7 @@ def get_summarizer(model_choice="BART"):
                 # Try to load conversational model
                 model_name = "microsoft/DialoGPT-medium"
                 
-                summarizer = pipeline(
-                    "text-generation",
-                    model=model_name,
-                    device=-1,
-                    framework="pt"
-                )
+                summarizer = load_pipeline("text-generation", model_name)
                 
                 st.success("✅ Loaded conversational AI model")
                 return summarizer, "llama"
@@ -254,12 +259,7 @@ def get_summarizer(model_choice="BART"):
         if model_choice == "BART":
             model_name = "facebook/bart-large-cnn"
             
-            summarizer = pipeline(
-                "summarization",
-                model=model_name,
-                device=-1,  # Force CPU usage for Streamlit Cloud
-                framework="pt"
-            )
+            summarizer = load_pipeline("summarization", model_name)
             
             return summarizer, "bart"
             
@@ -268,12 +268,7 @@ def get_summarizer(model_choice="BART"):
         # Final fallback to smallest model
         try:
             fallback_model = "sshleifer/distilbart-cnn-6-6"
-            summarizer = pipeline(
-                "summarization",
-                model=fallback_model,
-                device=-1,
-                framework="pt"
-            )
+            summarizer = load_pipeline("summarization", fallback_model)
             st.warning(f"Using fallback model: {fallback_model}")
             return summarizer, "bart"
         except Exception as e2:
@@ -283,11 +278,8 @@ def get_summarizer(model_choice="BART"):
 def extract_text_from_pdf(pdf_file):
     """Extract text from a single PDF file"""
     try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text, len(pdf_reader.pages)
+        pages = clean_pages(extract_pages(pdf_file))
+        return "".join(page_text + "\n" for page_text in pages), len(pages)
     except Exception as e:
         st.error(f"Error reading PDF {pdf_file.name}: {str(e)}")
         return "", 0
@@ -304,27 +296,6 @@ def extract_text_from_pdfs(pdf_files):
     
     return combined_text, total_pages
 
-def chunk_text(text, max_tokens=1000):
-    """Split text into chunks for processing"""
-    words = text.split()
-    chunks = []
-    current_chunk = []
-    current_length = 0
-    
-    for word in words:
-        if current_length + len(word) > max_tokens and current_chunk:
-            chunks.append(" ".join(current_chunk))
-            current_chunk = [word]
-            current_length = len(word)
-        else:
-            current_chunk.append(word)
-            current_length += len(word)
-    
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
-    
-    return chunks
-
 def get_text_stats(text):
     """Get basic statistics about the text"""
     words = len(text.split())
@@ -373,48 +344,40 @@ def create_llama_summary(text, summarizer, target_length):
 
 def create_comprehensive_summary(text, target_length):
     """Create a comprehensive summary using rule-based extraction"""
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
+    matrix = SentenceMatrix.from_text(text)
+    sentences = matrix.sentences
     
     if len(sentences) < 3:
         return None
     
-    # Score sentences based on various factors
-    scored_sentences = []
-    for sentence in sentences:
-        score = 0
-        
-        # Length score (prefer medium-length sentences)
-        if 50 <= len(sentence) <= 200:
-            score += 2
-        
-        # Keyword score (look for important terms)
-        important_words = ['important', 'significant', 'key', 'main', 'primary', 
-                          'conclusion', 'result', 'finding', 'analysis', 'summary']
-        for word in important_words:
-            if word.lower() in sentence.lower():
-                score += 1
-        
-        # Position score (first and last sentences often important)
-        if sentence in sentences[:3] or sentence in sentences[-3:]:
-            score += 1
-        
-        scored_sentences.append((sentence, score))
+    # Score sentences based on various factors, one array operation per feature
+    lengths = matrix.lengths
+    position = np.arange(len(sentences))
+    
+    # Length score (prefer medium-length sentences)
+    score = np.where((lengths >= 50) & (lengths <= 200), 2, 0)
+    
+    # Keyword score (look for important terms)
+    important_words = ['important', 'significant', 'key', 'main', 'primary', 
+                      'conclusion', 'result', 'finding', 'analysis', 'summary']
+    score += matrix.contains(important_words)
     
-    # Sort by score and select top sentences
-    scored_sentences.sort(key=lambda x: x[1], reverse=True)
+    # Position score (first and last sentences often important)
+    score += (position < 3) | (position >= len(sentences) - 3)
     
     # Select number of sentences based on target length
     if target_length == "short":
-        num_sentences = min(3, len(scored_sentences))
+        num_sentences = 3
     elif target_length == "medium":
-        num_sentences = min(5, len(scored_sentences))
+        num_sentences = 5
     else:  # long
-        num_sentences = min(8, len(scored_sentences))
+        num_sentences = 8
     
-    selected_sentences = [s[0] for s in scored_sentences[:num_sentences]]
+    # Top sentences, highest score first
+    selected = top_sentences(score, num_sentences)
+    selected = selected[np.argsort(-score[selected], kind="stable")]
     
-    return ". ".join(selected_sentences) + "."
+    return ". ".join(sentences[i] for i in selected) + "."
 
 def main():
     """Main application function"""
@@ -516,7 +479,7 @@ def main():
             
             with st.expander("📋 File Details"):
                 for i, pdf in enumerate(pdf_files, 1):
-                    file_size = len(pdf.getvalue()) / 1024  # Size in KB
+                    file_size = upload_size(pdf) / 1024  # Size in KB
                     st.write(f"{i}. **{pdf.name}** ({file_size:.1f} KB)")
     
     with col2:
@@ -601,7 +564,11 @@ def main():
                     else:
                         # Use BART for summarization
                         # Split into chunks for processing
-                        chunks = chunk_text(text, max_tokens=800)
+                        chunks = chunk_text(
+                            text,
+                            max_size=transformers_context_length(summarizer.tokenizer, summarizer.model.config),
+                            tokenizer=summarizer.tokenizer
+                        )
                         
                         if len(chunks) == 1:
                             # Single chunk - direct summarization
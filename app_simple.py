@@ -5,11 +5,14 @@ Secure, Local, No API Keys Required
 """
 
 import streamlit as st
-import PyPDF2
-import io
 import re
 from datetime import datetime
+import numpy as np
 import requests
+from uploads import upload_size
+from pdf_extraction import extract_pages
+from text_cleanup import clean_pages
+from sentence_scoring import SentenceMatrix, top_sentences
 
 # Page configuration
 st.set_page_config(
@@ -165,11 +168,7 @@ st.markdown("""
 def extract_text_from_pdf(pdf_file):
     """Extract text from a single PDF file"""
     try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        return "\n".join(clean_pages(extract_pages(pdf_file))).strip()
     except Exception as e:
         st.error(f"Error reading PDF: {str(e)}")
         return None
@@ -183,61 +182,42 @@ def get_text_stats(text):
 
 def create_extractive_summary(text, target_length):
     """Create a summary using extractive method"""
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
+    matrix = SentenceMatrix.from_text(text)
+    sentences = matrix.sentences
     
     if len(sentences) < 3:
         return text[:500] + "..." if len(text) > 500 else text
     
-    # Score sentences based on various factors
-    scored_sentences = []
-    for i, sentence in enumerate(sentences):
-        score = 0
-        
-        # Length score (prefer medium-length sentences)
-        if 50 <= len(sentence) <= 200:
-            score += 2
-        
-        # Keyword score (look for important terms)
-        important_words = ['important', 'significant', 'key', 'main', 'primary', 
-                          'conclusion', 'result', 'finding', 'analysis', 'summary',
-                          'therefore', 'however', 'moreover', 'furthermore', 'additionally']
-        for word in important_words:
-            if word.lower() in sentence.lower():
-                score += 1
-        
-        # Position score (first and last sentences often important)
-        if i < 3 or i >= len(sentences) - 3:
-            score += 1
-        
-        # Frequency score (sentences with common words)
-        words = sentence.lower().split()
-        for word in words:
-            if len(word) > 4 and text.lower().count(word) > 2:
-                score += 0.5
-        
-        scored_sentences.append((sentence, score))
+    # Score sentences based on various factors, one array operation per feature
+    lengths = matrix.lengths
+    position = np.arange(len(sentences))
     
-    # Sort by score and select top sentences
-    scored_sentences.sort(key=lambda x: x[1], reverse=True)
+    # Length score (prefer medium-length sentences)
+    score = np.where((lengths >= 50) & (lengths <= 200), 2.0, 0.0)
+    
+    # Keyword score (look for important terms)
+    important_words = ['important', 'significant', 'key', 'main', 'primary', 
+                      'conclusion', 'result', 'finding', 'analysis', 'summary',
+                      'therefore', 'however', 'moreover', 'furthermore', 'additionally']
+    score += matrix.contains(important_words)
+    
+    # Position score (first and last sentences often important)
+    score += (position < 3) | (position >= len(sentences) - 3)
+    
+    # Frequency score (words longer than 4 letters that recur in the text)
+    frequent = (matrix.term_lengths() > 4) & (matrix.term_frequencies() > 2)
+    score += 0.5 * np.bincount(matrix.rows, weights=frequent[matrix.cols], minlength=len(sentences))
     
     # Select number of sentences based on target length
     if target_length == "short":
-        num_sentences = min(3, len(scored_sentences))
+        num_sentences = 3
     elif target_length == "medium":
-        num_sentences = min(6, len(scored_sentences))
+        num_sentences = 6
     else:  # long
-        num_sentences = min(10, len(scored_sentences))
-    
-    selected_sentences = [s[0] for s in scored_sentences[:num_sentences]]
-    
-    # Reorder sentences to maintain original flow
-    original_order = []
-    for sentence in sentences:
-        if sentence in selected_sentences:
-            original_order.append(sentence)
+        num_sentences = 10
     
-    return ". ".join(original_order) + "."
+    # Top sentences, reordered to maintain original flow
+    return ". ".join(sentences[i] for i in top_sentences(score, num_sentences)) + "."
 
 def main():
     # Header
@@ -314,7 +294,7 @@ def main():
             st.success(f"✅ {len(uploaded_files)} file(s) uploaded successfully!")
             
             # Show file details
-            total_size = sum(len(file.getvalue()) for file in uploaded_files)
+            total_size = sum(upload_size(file) for file in uploaded_files)
             st.info(f"📊 Total size: {total_size / (1024*1024):.1f} MB")
             
             if st.button("🚀 Generate Summary", type="primary"):
@@ -1,10 +1,23 @@
-from fastapi import FastAPI, File, UploadFile
-from fastapi.middleware.cors import CORSMiddleware
-from PyPDF2 import PdfReader
-import tempfile
 import os
-from transformers import pipeline
-import torch
+import signal
+import threading
+import time
+from typing import Optional
+from fastapi import FastAPI, File, HTTPException, Query, UploadFile
+from fastapi.responses import JSONResponse
+from functools import lru_cache
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+from pdf_extraction import ExtractionReport, LazyPdfDocument, parse_page_range
+from page_cache import PageTextCache
+from uploads import spool_upload
+from text_cleanup import clean_pages
+from chunking import chunk_document
+from document import Document
+from model_context import transformers_context_length
+from warmup import WARMUP_ENABLED, warm_up
+from quantization import DISTILBART_MODEL
+from summary_engines import summarization_pipeline
 
 app = FastAPI()
 
@@ -17,58 +30,135 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def extract_text_from_pdf(pdf_path):
-    text = ""
-    reader = PdfReader(pdf_path)
-    for page in reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            text += page_text + "\n"
-    return text
-
-def chunk_text(text, max_tokens=1024):
-    import re
-    sentences = re.split(r'(?<=[.!?]) +', text)
-    chunks = []
-    current_chunk = ""
-    for sentence in sentences:
-        if len(current_chunk) + len(sentence) < max_tokens:
-            current_chunk += sentence + " "
-        else:
-            chunks.append(current_chunk.strip())
-            current_chunk = sentence + " "
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-    return chunks
-
-# Use distilbart-cnn-12-6 for fast summarization
-summarizer = pipeline(
-    "summarization",
-    model="sshleifer/distilbart-cnn-12-6",
-    device=0 if torch.cuda.is_available() else -1
-)
+# Repeat uploads of the same document skip parsing entirely
+page_cache = PageTextCache()
+
+def extract_text_from_pdf(pdf_path, key=None, page_range=None, report=None, file_name="PDF"):
+    """Extract the selected pages as a Document that keeps page provenance"""
+    page_numbers, page_texts = [], []
+    with LazyPdfDocument(pdf_path, cache=page_cache, key=key, report=report) as document:
+        pages = parse_page_range(page_range, len(document))
+        for page_no, page_text in document.iter_pages(pages):
+            page_numbers.append(page_no)
+            page_texts.append(page_text)
+    page_texts = clean_pages(page_texts)
+    return Document.from_pages(
+        (file_name, page_no, page_text) for page_no, page_text in zip(page_numbers, page_texts)
+    )
+
+# Startup loads and warms the model in the background; /readyz reports when it is done
+readiness = {"ready": False, "failed": False, "error": None, "attempts": 0, "warmup": []}
+_model_lock = threading.Lock()
+
+# Failed loads/warmups are retried after MODEL_LOAD_BACKOFF seconds, doubling each time
+MODEL_LOAD_ATTEMPTS = int(os.environ.get("MODEL_LOAD_ATTEMPTS", "3"))
+MODEL_LOAD_BACKOFF = float(os.environ.get("MODEL_LOAD_BACKOFF", "10"))
+
+@lru_cache(maxsize=1)
+def _load_summarizer():
+    # torch/transformers are imported on first use so the app starts without them;
+    # SUMMARY_ENGINE=onnx runs on ONNX Runtime, MODEL_QUANTIZE=1 serves the int8 model on CPU
+    return summarization_pipeline(DISTILBART_MODEL)
+
+def get_summarizer():
+    """Use distilbart-cnn-12-6 for fast summarization (loaded once, on first use)"""
+    with _model_lock:
+        return _load_summarizer()
+
+def stop_process():
+    """Shut the server down (as on SIGTERM) so the orchestrator restarts it"""
+    os.kill(os.getpid(), signal.SIGTERM)
+
+def prepare_models(attempts=MODEL_LOAD_ATTEMPTS, backoff=MODEL_LOAD_BACKOFF, give_up=stop_process):
+    """Load the model and run the warmup summaries, then mark the replica ready
+
+    Failures are retried with doubling delays. When the last attempt fails
+    the replica is marked failed and `give_up()` stops the process, rather
+    than leaving it up but never ready.
+    """
+    attempts = max(attempts, 1)
+    for attempt in range(1, attempts + 1):
+        readiness["attempts"] = attempt
+        try:
+            get_summarizer()
+            if WARMUP_ENABLED:
+                readiness["warmup"] = [
+                    {"words": words, "seconds": round(seconds, 3)} for words, seconds in warm_up(fast_summarize)
+                ]
+            readiness["error"] = None
+            readiness["ready"] = True
+            return
+        except Exception as e:
+            readiness["error"] = str(e)
+        if attempt < attempts:
+            time.sleep(backoff * 2 ** (attempt - 1))
+    readiness["failed"] = True
+    give_up()
+
+@app.on_event("startup")
+def start_model_preparation():
+    threading.Thread(target=prepare_models, name="model-warmup", daemon=True).start()
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: the model is loaded and warmed up"""
+    if readiness["ready"]:
+        return {"status": "ready", "warmup": readiness["warmup"]}
+    status = "failed" if readiness["failed"] else "warming up"
+    return JSONResponse(
+        status_code=503,
+        content={"status": status, "error": readiness["error"], "attempts": readiness["attempts"]}
+    )
 
 def fast_summarize(text):
-    return summarizer(text, max_length=130, min_length=30, do_sample=False)[0]['summary_text']
+    return get_summarizer()(text, max_length=130, min_length=30, do_sample=False)[0]['summary_text']
 
-@app.post("/summarize/")
-async def summarize_pdf(file: UploadFile = File(...)):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(await file.read())
-        tmp_path = tmp.name
-
-    text = extract_text_from_pdf(tmp_path)
-    os.remove(tmp_path)
-    if not text.strip():
-        return {"summary": "No text could be extracted from the PDF."}
-
-    chunks = chunk_text(text)
-    summaries = []
+def summarize_upload(path, key, page_range, file_name):
+    """Extract and summarize a spooled upload (blocking; runs in the threadpool)"""
+    report = ExtractionReport()
+    try:
+        document = extract_text_from_pdf(path, key=key, page_range=page_range, report=report, file_name=file_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    skipped_pages = [{"page": page_no, "reason": reason} for _, page_no, reason in report.skipped]
+    image_only_pages = [page_no for _, page_no in report.image_only]
+    if document.is_blank():
+        return {
+            "summary": "No text could be extracted from the PDF.",
+            "skipped_pages": skipped_pages,
+            "image_only_pages": image_only_pages
+        }
+
+    summarizer = get_summarizer()
+    context_length = transformers_context_length(summarizer.tokenizer, summarizer.model.config)
+    chunks = chunk_document(document, max_size=context_length, tokenizer=summarizer.tokenizer)
+    sections = []
     for chunk in chunks:
-        summary = fast_summarize(chunk)
-        summaries.append(summary)
-    final_summary = "\n\n".join(summaries)
-    return {"summary": final_summary}
+        summary = fast_summarize(chunk.text(document))
+        sections.append({"pages": [chunk.first_page, chunk.last_page], "summary": summary})
+    final_summary = "\n\n".join(section["summary"] for section in sections)
+    return {
+        "summary": final_summary,
+        "sections": sections,
+        "skipped_pages": skipped_pages,
+        "image_only_pages": image_only_pages
+    }
+
+@app.post("/summarize/")
+async def summarize_pdf(
+    file: UploadFile = File(...),
+    pages: Optional[str] = Query(None, description='Pages to summarize, e.g. "1-20,25"')
+):
+    with await spool_upload(file) as upload:
+        # Extraction and generation block for seconds; keep them off the event loop
+        return await run_in_threadpool(
+            summarize_upload, upload.path, upload.sha256, pages, file.filename or "PDF"
+        )
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark the chunking engine
+
+Usage:
+    python benchmark_chunking.py [path/to/text.txt] [--size 1024] [--repeat 5]
+
+Without a text file a synthetic document of --words words is used. Reports
+MB/sec and chunk counts per unit, next to the previous string-concatenation
+chunker for comparison.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+
+from chunking import chunk_spans
+from document import Document
+
+
+def concat_chunker(text, max_chars):
+    """The old `current_chunk += sentence` chunker, kept as a baseline"""
+    chunks = []
+    current_chunk = ""
+    for sentence in Document.from_text(text).sentences():
+        if len(current_chunk) + len(sentence) < max_chars:
+            current_chunk += sentence + " "
+        else:
+            chunks.append(current_chunk.strip())
+            current_chunk = sentence + " "
+    if current_chunk:
+        chunks.append(current_chunk.strip())
+    return chunks
+
+
+def synthetic_text(words):
+    sentence = "Quarterly revenue grew by 12% while operating costs stayed flat across all regions."
+    per_sentence = len(sentence.split())
+    return " ".join([sentence] * (words // per_sentence + 1))
+
+
+def timed(function, repeat):
+    """Best wall time of `repeat` runs, and the last result"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chunking engine")
+    parser.add_argument("text", nargs="?", help="UTF-8 text file to chunk (default: synthetic)")
+    parser.add_argument("--words", type=int, default=500000, help="Size of the synthetic document")
+    parser.add_argument("--size", type=int, default=1024, help="Chunk size limit in each unit")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    if args.text:
+        with open(args.text, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = synthetic_text(args.words)
+    megabytes = len(text.encode("utf-8")) / (1024 * 1024)
+
+    print(f"📚 Chunking {megabytes:.1f} MB ({len(text.split()):,} words), limit {args.size}")
+    print("=" * 70)
+    print(f"{'Chunker':<22} {'Chunks':>8} {'Seconds':>9} {'MB/sec':>9}")
+
+    runs = [
+        (f"spans ({unit})", lambda unit=unit: chunk_spans(Document.from_text(text), args.size, unit=unit))
+        for unit in ("tokens", "words", "chars")
+    ]
+    runs.append(("string concat (chars)", lambda: concat_chunker(text, args.size * 4)))
+    for name, function in runs:
+        seconds, chunks = timed(function, args.repeat)
+        rate = megabytes / seconds if seconds > 0 else 0
+        print(f"{name:<22} {len(chunks):>8} {seconds:>9.3f} {rate:>9.1f}")
+
+    print("\n💡 Token counts here are estimated; apps pass the model's tokenizer for exact counts.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark the PDF extraction backends on a local corpus
+
+Usage:
+    python benchmark_extraction.py path/to/pdfs [--backends pypdf2,pypdfium2] [--max-pages 500]
+
+Each backend runs in a fresh process so its peak memory is measured in
+isolation. Reports pages/sec and peak RSS per backend.
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(__file__))
+
+from extraction_backends import available_backends, get_backend
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unsupported)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def wait_for_result(process, results, poll_seconds=1.0):
+    """The result a child process put on `results`, or {"error": ...} if it died without one"""
+    while True:
+        try:
+            return results.get(timeout=poll_seconds)
+        except queue.Empty:
+            if process.is_alive():
+                continue
+        # The child has exited: take a result still in flight, else report the crash
+        try:
+            return results.get(timeout=poll_seconds)
+        except queue.Empty:
+            return {"error": f"process exited with code {process.exitcode}"}
+
+
+def run_backend(backend_name, paths, max_pages, results):
+    """Extract every page of every PDF with one backend (runs in a child process)"""
+    try:
+        backend = get_backend(backend_name)
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+        return
+    pages = 0
+    chars = 0
+    failures = 0
+    start = time.perf_counter()
+    for path in paths:
+        try:
+            pdf = backend.open(path)
+            try:
+                for index in range(len(pdf)):
+                    if max_pages and pages >= max_pages:
+                        break
+                    chars += len(pdf.page_text(index))
+                    pages += 1
+            finally:
+                pdf.close()
+        except Exception:
+            failures += 1
+    elapsed = time.perf_counter() - start
+    results.put({
+        "backend": backend_name,
+        "pages": pages,
+        "chars": chars,
+        "failures": failures,
+        "seconds": elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction backends")
+    parser.add_argument("corpus", help="PDF file or directory of PDFs (searched recursively)")
+    parser.add_argument("--backends", default=",".join(available_backends()),
+                        help="Comma-separated backends to compare (default: all installed)")
+    parser.add_argument("--max-pages", type=int, default=0,
+                        help="Stop each backend after this many pages (0 = no limit)")
+    args = parser.parse_args()
+
+    corpus = Path(args.corpus)
+    paths = [corpus] if corpus.is_file() else sorted(corpus.rglob("*.pdf"))
+    if not paths:
+        print(f"❌ No PDF files found in {corpus}")
+        sys.exit(1)
+
+    backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    missing = [name for name in backends if name not in available_backends()]
+    if missing:
+        print(f"❌ Not installed: {', '.join(missing)}")
+        sys.exit(1)
+
+    print(f"📚 Benchmarking {len(backends)} backend(s) on {len(paths)} PDF file(s)")
+    print("=" * 70)
+    print(f"{'Backend':<12} {'Pages':>7} {'Seconds':>9} {'Pages/sec':>10} {'Peak RSS':>10} {'Failed':>7}")
+
+    context = multiprocessing.get_context("spawn")
+    failed = False
+    for name in backends:
+        results = context.Queue()
+        process = context.Process(target=run_backend, args=(name, [str(p) for p in paths], args.max_pages, results))
+        process.start()
+        result = wait_for_result(process, results)
+        process.join()
+        if "error" in result:
+            print(f"{name:<12} ❌ {result['error']}")
+            failed = True
+            continue
+
+        rate = result["pages"] / result["seconds"] if result["seconds"] > 0 else 0
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result["peak_rss_mb"] is not None else "n/a"
+        print(f"{name:<12} {result['pages']:>7} {result['seconds']:>9.2f} {rate:>10.1f} {rss:>10} {result['failures']:>7}")
+
+    print("\n💡 Set PDF_EXTRACT_BACKEND=<backend> to use the fastest one for your documents.")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark int8 dynamic quantization and ONNX Runtime against the fp32 model
+
+Usage:
+    python benchmark_quantization.py [fixtures/summarization] [--modes fp32,int8,onnx] [--repeat 1]
+
+Every .txt file in the fixture directory is summarized on CPU by the fp32
+PyTorch model, the int8 model and (when optimum[onnxruntime] is installed)
+the ONNX Runtime engine, each in a fresh process so its peak memory is
+measured in isolation. Reports load time, input and generated tokens/sec
+and peak RSS per mode, and the ROUGE drift of each mode's summaries:
+ROUGE-1/2/L F1 with the fp32 summaries as references (1.00 means
+identical output).
+"""
+
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(__file__))
+
+from benchmark_extraction import peak_rss_mb, wait_for_result
+from quantization import DISTILBART_MODEL
+from summary_engines import onnx_available
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "summarization")
+MODES = ("fp32", "int8", "onnx")
+
+
+def run_mode(mode, model_name, texts, repeat, results):
+    """Load the model in one mode and summarize every text (runs in a child process)"""
+    # CPU only: the int8 kernels have no GPU counterpart
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    try:
+        from summary_engines import summarization_pipeline
+
+        start = time.perf_counter()
+        engine = "onnx" if mode == "onnx" else "pytorch"
+        summarizer = summarization_pipeline(model_name, engine=engine, quantize=mode == "int8")
+        load_seconds = time.perf_counter() - start
+
+        tokenizer = summarizer.tokenizer
+        input_tokens = sum(len(tokenizer(text, truncation=True)["input_ids"]) for text in texts) * repeat
+        summaries = []
+        output_tokens = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            summaries = [
+                summary["summary_text"]
+                for summary in summarizer(texts, max_length=130, min_length=30, do_sample=False, truncation=True)
+            ]
+            output_tokens += sum(len(tokenizer(summary)["input_ids"]) for summary in summaries)
+        seconds = time.perf_counter() - start
+        results.put({
+            "mode": mode,
+            "load_seconds": load_seconds,
+            "seconds": seconds,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "summaries": summaries,
+            "peak_rss_mb": peak_rss_mb(),
+        })
+    except Exception as e:
+        # Report instead of dying silently (e.g. transformers not installed)
+        results.put({"mode": mode, "error": f"{type(e).__name__}: {e}"})
+
+
+def words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def ngrams(tokens, n):
+    counts = {}
+    for i in range(len(tokens) - n + 1):
+        gram = tuple(tokens[i:i + n])
+        counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def f1(overlap, candidate_total, reference_total):
+    if not overlap:
+        return 0.0
+    precision = overlap / candidate_total
+    recall = overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(candidate, reference, n):
+    """ROUGE-N F1 of two token lists"""
+    candidate_grams, reference_grams = ngrams(candidate, n), ngrams(reference, n)
+    overlap = sum(min(count, reference_grams.get(gram, 0)) for gram, count in candidate_grams.items())
+    return f1(overlap, sum(candidate_grams.values()), sum(reference_grams.values()))
+
+
+def rouge_l(candidate, reference):
+    """ROUGE-L F1 (longest common subsequence) of two token lists"""
+    previous = [0] * (len(reference) + 1)
+    for token in candidate:
+        current = [0]
+        for j, other in enumerate(reference):
+            current.append(previous[j] + 1 if token == other else max(previous[j + 1], current[j]))
+        previous = current
+    return f1(previous[-1], len(candidate), len(reference))
+
+
+def rouge(candidate, reference):
+    """(ROUGE-1, ROUGE-2, ROUGE-L) F1 of a candidate summary against a reference"""
+    candidate, reference = words(candidate), words(reference)
+    return rouge_n(candidate, reference, 1), rouge_n(candidate, reference, 2), rouge_l(candidate, reference)
+
+
+def main():
+    default_modes = [mode for mode in MODES if mode != "onnx" or onnx_available()]
+    parser = argparse.ArgumentParser(description="Benchmark int8 quantized and ONNX Runtime DistilBART against fp32")
+    parser.add_argument("fixtures", nargs="?", default=FIXTURES, help="Directory of .txt documents to summarize")
+    parser.add_argument("--model", default=DISTILBART_MODEL, help="Seq2seq summarization model")
+    parser.add_argument("--modes", default=",".join(default_modes),
+                        help="Comma-separated modes to compare (default: all installed)")
+    parser.add_argument("--repeat", type=int, default=1, help="Summarize the fixture set this many times per mode")
+    args = parser.parse_args()
+
+    paths = sorted(Path(args.fixtures).glob("*.txt"))
+    if not paths:
+        print(f"❌ No .txt fixtures found in {args.fixtures}")
+        sys.exit(1)
+    texts = [path.read_text(encoding="utf-8") for path in paths]
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        print(f"❌ Unknown mode(s): {', '.join(unknown)} (choose from {', '.join(MODES)})")
+        sys.exit(1)
+    if "onnx" in modes and not onnx_available():
+        print("❌ The onnx mode needs optimum[onnxruntime]")
+        sys.exit(1)
+    # Drift is measured against fp32, so it always runs first
+    modes = ["fp32"] + [mode for mode in modes if mode != "fp32"]
+
+    print(f"📚 Benchmarking {args.model} on {len(paths)} fixture(s): {', '.join(modes)} (CPU)")
+    print("=" * 78)
+    print(f"{'Mode':<6} {'Load s':>8} {'Run s':>8} {'In tok/s':>10} {'Out tok/s':>10} {'Peak RSS':>10}")
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for mode in modes:
+        queue = context.Queue()
+        process = context.Process(target=run_mode, args=(mode, args.model, texts, args.repeat, queue))
+        process.start()
+        result = wait_for_result(process, queue)
+        process.join()
+        if "error" in result:
+            print(f"{mode:<6} ❌ {result['error']}")
+            sys.exit(1)
+        results[mode] = result
+
+        seconds = result["seconds"] or float("inf")
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result["peak_rss_mb"] is not None else "n/a"
+        print(f"{mode:<6} {result['load_seconds']:>8.1f} {result['seconds']:>8.1f} "
+              f"{result['input_tokens'] / seconds:>10.1f} {result['output_tokens'] / seconds:>10.1f} {rss:>10}")
+
+    for mode in modes[1:]:
+        print(f"\n📏 ROUGE drift of {mode} against fp32 (F1, 1.00 = identical)")
+        print(f"{'Fixture':<28} {'ROUGE-1':>8} {'ROUGE-2':>8} {'ROUGE-L':>8}")
+        scores = []
+        for path, reference, candidate in zip(paths, results["fp32"]["summaries"], results[mode]["summaries"]):
+            score = rouge(candidate, reference)
+            scores.append(score)
+            print(f"{path.name[:28]:<28} {score[0]:>8.3f} {score[1]:>8.3f} {score[2]:>8.3f}")
+        means = [sum(column) / len(scores) for column in zip(*scores)]
+        print(f"{'Mean':<28} {means[0]:>8.3f} {means[1]:>8.3f} {means[2]:>8.3f}")
+
+    print()
+    for mode in modes[1:]:
+        speedup = results["fp32"]["seconds"] / results[mode]["seconds"] if results[mode]["seconds"] else 0
+        print(f"⚡ {mode} is {speedup:.2f}x the speed of fp32")
+    print("💡 Set MODEL_QUANTIZE=1 to serve the int8 model, or SUMMARY_ENGINE=onnx for ONNX Runtime.")
+
+
+if __name__ == "__main__":
+    main()
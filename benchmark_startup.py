@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the import time of the apps (cold start)
+
+Usage:
+    python benchmark_startup.py [pdf_summarizer backend ...] [--budget-ms 3000] [--repeat 3]
+
+Each module is imported in a fresh interpreter under `python -X importtime`.
+Reports the best cumulative import time and the slowest imports, and exits
+with status 1 if a module exceeds the budget or pulls in one of the heavy
+packages (torch, transformers) that must only load with a model backend.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+MODULES = ["pdf_summarizer", "backend"]
+HEAVY_PACKAGES = ("torch", "transformers")
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from `-X importtime` output"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, total_us, name = line[len("import time:"):].split("|", 2)
+        imports.append((name.strip(), int(self_us), int(total_us)))
+    return imports
+
+
+def cumulative_us(imports, module):
+    """Cumulative import time of `module` itself (including everything it imports)"""
+    return next((total for name, _, total in imports if name == module), 0)
+
+
+def import_profile(module):
+    """Import `module` in a fresh interpreter and return its import records"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app import time")
+    parser.add_argument("modules", nargs="*", default=MODULES, help="Modules to import")
+    parser.add_argument("--budget-ms", type=float, default=3000, help="Maximum cumulative import time per module")
+    parser.add_argument("--repeat", type=int, default=3, help="Imports per module (best is reported)")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        try:
+            runs = [import_profile(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            failed = True
+            continue
+        best = min(runs, key=lambda imports: cumulative_us(imports, module))
+        total_ms = cumulative_us(best, module) / 1000
+        heavy = sorted({name for name, _, _ in best if name.split(".")[0] in HEAVY_PACKAGES})
+
+        status = "✅" if total_ms <= args.budget_ms and not heavy else "❌"
+        print(f"{status} {module}: {total_ms:,.0f} ms (budget {args.budget_ms:,.0f} ms), {len(best)} modules")
+        for name, self_us, total_us in sorted(best, key=lambda record: -record[1])[:args.top]:
+            print(f"    {self_us / 1000:>8.1f} ms self {total_us / 1000:>9.1f} ms total  {name}")
+        if heavy:
+            print(f"    ⚠️ Heavy packages imported at startup: {', '.join(heavy[:5])}")
+        failed = failed or status == "❌"
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""
+Chunking engine shared by every summarization entry point.
+
+A document is cut at sentence boundaries (document.SENTENCE_BOUNDARY) and
+sentences are packed greedily until the next one would push the chunk past
+its size limit. Limits are expressed in tokens, words or characters.
+Chunks are returned as (start, end) offsets into the source text; only
+chunk_text() slices them into strings, once per chunk, so assembly stays
+linear in the length of the document.
+
+For tokens, sentences are tokenized in one batched call to the model's
+fast tokenizer. A sentence longer than the whole budget is cut at token
+boundaries using the tokenizer's offset mapping. Tokens of concatenated
+sentences can differ slightly from the sum of the per-sentence counts, so a
+small safety margin is kept free. Without a tokenizer (e.g. for Ollama)
+tokens are estimated from the character count.
+
+chunk_document() chunks each file of a multi-PDF Document separately and
+keeps whole pages together when they fit, returning Chunk objects that
+record the file and page span they came from. StreamingChunker does the
+same for pages that arrive one at a time.
+
+With an overlap, each chunk starts with the last sentences of the previous
+one (up to `overlap` units) so context is not lost at the boundary. The
+chunk summaries then repeat some material; dedupe_summaries() drops the
+sentences of a summary whose word n-gram shingles mostly appeared in the
+previous one, before they are combined and reduced.
+"""
+
+import os
+import re
+from bisect import bisect_right
+from collections import deque
+from itertools import groupby
+
+from document import Document, sentence_spans
+
+# Tokens left unused in every chunk to absorb tokenization differences
+CHUNK_SAFETY_MARGIN = int(os.environ.get("CHUNK_SAFETY_MARGIN", "32"))
+# Tokens repeated from the end of one chunk at the start of the next
+CHUNK_OVERLAP = int(os.environ.get("CHUNK_OVERLAP", "64"))
+# Estimate used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+UNITS = ("tokens", "words", "chars")
+WORD = re.compile(r'\S+')
+SHINGLE_WORD = re.compile(r'\w+')
+# Bullet or numbered-list marker at the start of a summary line
+LIST_MARKER = re.compile(r'[ \t]*(?:[-*+•]|\d+[.)])[ \t]+')
+_BLANK_LINE_RUN = re.compile(r'\n[ \t]*(?:\n[ \t]*)+\n')
+
+# Summary sentences with at least this share of shingles already seen are dropped
+SHINGLE_SIZE = 4
+DUPLICATE_THRESHOLD = 0.6
+
+
+def estimate_tokens(text):
+    """Token estimate for text that has no tokenizer at hand"""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _char_pieces(spans, budget, chars_per_unit=1):
+    """(start, end, size) per sentence, splitting sentences longer than `budget`"""
+    max_chars = budget * chars_per_unit
+    for start, end in spans:
+        for piece_start in range(start, end, max_chars):
+            piece_end = min(piece_start + max_chars, end)
+            yield piece_start, piece_end, -(-(piece_end - piece_start) // chars_per_unit)
+
+
+def _word_pieces(text, spans, budget):
+    """(start, end, words) per sentence, splitting sentences longer than `budget`"""
+    for start, end in spans:
+        count = len(text[start:end].split())
+        if count <= budget:
+            yield start, end, count
+            continue
+        words = [match.span() for match in WORD.finditer(text, start, end)]
+        for i in range(0, len(words), budget):
+            window = words[i:i + budget]
+            yield window[0][0], window[-1][1], len(window)
+
+
+def _token_pieces(text, spans, budget, tokenizer):
+    """(start, end, tokens) per sentence from a single batched tokenizer call"""
+    if not spans:
+        return
+    encoded = tokenizer(
+        [text[start:end] for start, end in spans],
+        add_special_tokens=False,
+        return_offsets_mapping=True
+    )
+    for (start, end), offsets in zip(spans, encoded["offset_mapping"]):
+        if len(offsets) <= budget:
+            yield start, end, len(offsets)
+            continue
+        # Over-long sentence: cut it at token boundaries
+        for i in range(0, len(offsets), budget):
+            window = offsets[i:i + budget]
+            yield start + window[0][0], start + window[-1][1], len(window)
+
+
+def _budget(max_size, unit, tokenizer, margin):
+    budget = max_size
+    if unit == "tokens":
+        budget -= CHUNK_SAFETY_MARGIN if margin is None else margin
+        if tokenizer is not None:
+            budget -= tokenizer.num_special_tokens_to_add()
+    return max(budget, 1)
+
+
+def _measure(text, spans, unit, budget, tokenizer):
+    """(start, end, size) pieces for sentence `spans`, none larger than `budget`"""
+    if unit == "chars":
+        pieces = _char_pieces(spans, budget)
+    elif unit == "words":
+        pieces = _word_pieces(text, spans, budget)
+    elif tokenizer is not None:
+        pieces = _token_pieces(text, spans, budget, tokenizer)
+    else:
+        pieces = _char_pieces(spans, budget, CHARS_PER_TOKEN)
+    return list(pieces)
+
+
+def _count_gaps(pieces, budget):
+    """For character limits, charge each piece the whitespace before it"""
+    previous_end = None
+    for start, end, size, page in pieces:
+        if previous_end is not None and start >= previous_end:
+            size = min(end - previous_end, budget)
+        previous_end = end
+        yield start, end, size, page
+
+
+class _Packer:
+    """Incrementally groups (start, end, size, page) pieces into chunks"""
+
+    def __init__(self, budget, overlap):
+        self.budget = budget
+        self.overlap = overlap
+        self.current = deque()  # Pieces of the open chunk
+        self.used = 0
+
+    def add(self, piece, room=None):
+        """Add a piece; returns the pieces of the chunk it closed, if any
+
+        `room` (default: the piece's size) is how much must still fit in the
+        open chunk, e.g. a whole page starting with this piece.
+        """
+        room = piece[2] if room is None else room
+        closed = None
+        if self.current and self.used + room > self.budget:
+            closed = list(self.current)
+            self.current, self.used = _carry_over(self.current, self.overlap, room, self.budget)
+        self.current.append(piece)
+        self.used += piece[2]
+        return closed
+
+    def close(self):
+        """Pieces of the open chunk (if any), starting over empty"""
+        closed = list(self.current) if self.current else None
+        self.current = deque()
+        self.used = 0
+        return closed
+
+
+def _pack(pieces, budget, overlap):
+    """Group (piece, room) pairs into chunks (see _Packer.add); returns lists of pieces"""
+    packer = _Packer(budget, overlap)
+    chunks = [closed for closed in (packer.add(piece, room) for piece, room in pieces) if closed]
+    last = packer.close()
+    if last:
+        chunks.append(last)
+    return chunks
+
+
+def _carry_over(pieces, overlap, next_size, budget):
+    """Trailing pieces of a closed chunk to repeat at the start of the next one"""
+    carried = deque()
+    used = 0
+    if overlap > 0:
+        # Never carry the whole chunk, or the window would stop moving
+        for piece in list(pieces)[:0:-1]:
+            if used + piece[2] > overlap:
+                break
+            carried.appendleft(piece)
+            used += piece[2]
+    # The carried context must still leave room for the next piece
+    while carried and used + next_size > budget:
+        used -= carried.popleft()[2]
+    return carried, used
+
+
+def chunk_spans(document, max_size, unit="tokens", tokenizer=None, margin=None, overlap=0):
+    """(start, end) offsets of chunks of at most `max_size` units of `document`
+
+    `unit` is "tokens", "words" or "chars". For tokens, pass the model's
+    fast tokenizer to count exactly; its special tokens (e.g. <s> and </s>)
+    and `margin` (default CHUNK_SAFETY_MARGIN) are subtracted from the budget.
+    `overlap` units of whole sentences are repeated from the previous chunk.
+    """
+    if unit not in UNITS:
+        raise ValueError(f"Unknown chunk unit: {unit!r} (choose from {', '.join(UNITS)})")
+    if isinstance(document, str):
+        document = Document.from_text(document)
+    budget = _budget(max_size, unit, tokenizer, margin)
+    pieces = [
+        (start, end, size, None)
+        for start, end, size in _measure(document.text, document.sentence_spans, unit, budget, tokenizer)
+    ]
+    if unit == "chars":
+        pieces = _count_gaps(pieces, budget)
+    return [(chunk[0][0], chunk[-1][1]) for chunk in _pack(((piece, None) for piece in pieces), budget, overlap)]
+
+
+def chunk_text(document, max_size, unit="tokens", tokenizer=None, margin=None, overlap=0):
+    """Split a Document (or plain text) into chunk strings; see chunk_spans()"""
+    text = document if isinstance(document, str) else document.text
+    spans = chunk_spans(document, max_size, unit, tokenizer, margin, overlap)
+    return [text[start:end] for start, end in spans]
+
+
+class Chunk:
+    """A chunk of a Document: where its text lies and which pages it came from
+
+    `segments` are (start, end) buffer offsets, one per page, so the page
+    markers between them never reach the model.
+    """
+
+    __slots__ = ("file_name", "first_page", "last_page", "segments")
+
+    def __init__(self, file_name, first_page, last_page, segments):
+        self.file_name = file_name
+        self.first_page = first_page
+        self.last_page = last_page
+        self.segments = segments
+
+    def __repr__(self):
+        return f"Chunk({self.label!r}, {self.segments})"
+
+    @property
+    def label(self):
+        """Human-readable provenance, e.g. "report.pdf p. 3-5" """
+        if self.file_name is None:
+            return "text"
+        if self.first_page == self.last_page:
+            return f"{self.file_name} p. {self.first_page}"
+        return f"{self.file_name} p. {self.first_page}-{self.last_page}"
+
+    def text(self, document):
+        """The chunk's text, with one newline between pages"""
+        return "\n".join(document.text[start:end] for start, end in self.segments)
+
+
+def _make_chunk(pieces, pages):
+    """Chunk covering `pieces`, whose page fields index `pages`"""
+    segments = []
+    page_indices = []
+    for start, end, _, page in pieces:
+        if page_indices and page_indices[-1] == page:
+            segments[-1] = (segments[-1][0], end)
+        else:
+            segments.append((start, end))
+            page_indices.append(page)
+    first, last = pages[page_indices[0]], pages[page_indices[-1]]
+    return Chunk(first.file_name, first.page_no, last.page_no, segments)
+
+
+def chunk_document(document, max_size, unit="tokens", tokenizer=None, margin=None,
+                   overlap=0, whole_pages=True):
+    """Chunk a Document without crossing file boundaries, keeping page provenance
+
+    Each file is chunked on its own. With `whole_pages`, a page that fits
+    in one chunk is never split across two; longer pages are split at
+    sentences. Plain text without pages becomes Chunks labelled "text".
+    Sizes and the sliding-window overlap work as in chunk_spans().
+    """
+    if unit not in UNITS:
+        raise ValueError(f"Unknown chunk unit: {unit!r} (choose from {', '.join(UNITS)})")
+    if isinstance(document, str) or not document.pages:
+        return [
+            Chunk(None, None, None, [span])
+            for span in chunk_spans(document, max_size, unit, tokenizer, margin, overlap)
+        ]
+
+    text = document.text
+    pages = document.pages
+    budget = _budget(max_size, unit, tokenizer, margin)
+
+    spans = []
+    for page in pages:
+        spans.extend(document.page_sentence_spans(page))
+    measured = _measure(text, spans, unit, budget, tokenizer)  # One tokenizer call per document
+
+    page_pieces = [[] for _ in pages]
+    page_starts = [page.start for page in pages]
+    for start, end, size in measured:
+        page_pieces[bisect_right(page_starts, start) - 1].append((start, end, size))
+
+    chunks = []
+    for _, indices in groupby(range(len(pages)), key=lambda i: pages[i].file_name):
+        pieces = []
+        for index in indices:
+            pieces.extend(_page_pieces(page_pieces[index], index, unit, budget, whole_pages))
+        chunks.extend(_make_chunk(group, pages) for group in _pack(pieces, budget, overlap))
+    return chunks
+
+
+def _page_pieces(measured, index, unit, budget, whole_pages):
+    """(piece, room) pairs of the sentences of one page, tagged with `index`
+
+    With `whole_pages`, the first sentence of a page that fits in one chunk
+    asks for room for the whole page, so the page is never split. Pages stay
+    sentence pieces, so the overlap can still carry their last sentences.
+    """
+    own = [(start, end, size, index) for start, end, size in measured]
+    if not own:
+        return own
+    if unit == "chars":
+        own = list(_count_gaps(own, budget))
+    # One joining newline between pages counts against token and char limits
+    join_cost = 0 if unit == "words" else 1
+    first_start, first_end, first_size, _ = own[0]
+    own[0] = (first_start, first_end, first_size + join_cost, index)
+    total = sum(piece[2] for piece in own)
+    room = total if whole_pages and total <= budget else None
+    return [(own[0], room)] + [(piece, None) for piece in own[1:]]
+
+
+class StreamingChunker:
+    """Incremental chunk_document(): pages go in one at a time, chunks come out
+
+    Pages of a file must arrive in order; a new file name closes the open
+    chunk. Only pages still referenced by the open chunk are kept. Each
+    page is tokenized in its own batched call. add_page() and finish()
+    return (Chunk, text) pairs; these Chunks carry provenance only (their
+    `segments` are empty, the text comes alongside).
+    """
+
+    def __init__(self, max_size, unit="tokens", tokenizer=None, margin=None, overlap=0, whole_pages=True):
+        if unit not in UNITS:
+            raise ValueError(f"Unknown chunk unit: {unit!r} (choose from {', '.join(UNITS)})")
+        self.unit = unit
+        self.tokenizer = tokenizer
+        self.whole_pages = whole_pages
+        self.budget = _budget(max_size, unit, tokenizer, margin)
+        self._packer = _Packer(self.budget, overlap)
+        self._pages = {}  # index -> (file_name, page_no, text)
+        self._next_index = 0
+        self._file_name = None
+
+    def add_page(self, file_name, page_no, page_text):
+        chunks = []
+        if file_name != self._file_name:
+            chunks.extend(self.finish())
+            self._file_name = file_name
+        if not page_text or page_text.isspace():
+            return chunks
+
+        index = self._next_index
+        self._next_index += 1
+        self._pages[index] = (file_name, page_no, page_text)
+        spans = sentence_spans(page_text)
+        measured = _measure(page_text, spans, self.unit, self.budget, self.tokenizer)
+        for piece, room in _page_pieces(measured, index, self.unit, self.budget, self.whole_pages):
+            closed = self._packer.add(piece, room)
+            if closed:
+                chunks.append(self._emit(closed))
+        self._forget_pages()
+        return chunks
+
+    def finish(self):
+        """Close the open chunk (end of a file or of the stream)"""
+        closed = self._packer.close()
+        chunks = [self._emit(closed)] if closed else []
+        self._pages.clear()
+        return chunks
+
+    def _emit(self, pieces):
+        parts = []
+        last_index = None
+        for start, end, _, index in pieces:
+            page_text = self._pages[index][2]
+            if index == last_index:
+                parts[-1] = (parts[-1][0], parts[-1][1], end)
+            else:
+                parts.append((page_text, start, end))
+            last_index = index
+        first = self._pages[pieces[0][3]]
+        last = self._pages[pieces[-1][3]]
+        chunk = Chunk(first[0], first[1], last[1], [])
+        return chunk, "\n".join(page_text[start:end] for page_text, start, end in parts)
+
+    def _forget_pages(self):
+        """Drop pages that the open chunk no longer refers to"""
+        current = self._packer.current
+        oldest = current[0][3] if current else self._next_index
+        for index in [i for i in self._pages if i < oldest]:
+            del self._pages[index]
+
+
+def _shingles(sentence, size=SHINGLE_SIZE):
+    words = SHINGLE_WORD.findall(sentence.lower())
+    if len(words) <= size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def dedupe_summaries(summaries, threshold=DUPLICATE_THRESHOLD):
+    """Drop summary sentences that repeat the previous chunk's summary
+
+    Neighbouring chunks overlap, so their summaries often restate the same
+    facts. A sentence is dropped when at least `threshold` of its word
+    n-gram shingles occur in the previous summary. Line breaks and list
+    markers of the summary are kept; lines whose sentences are all dropped
+    disappear. Summaries that end up empty are removed.
+    """
+    deduped = []
+    previous = set()
+    for summary in summaries:
+        seen = set()
+        lines = []
+        for line in summary.split("\n"):
+            marker = LIST_MARKER.match(line)
+            prefix = marker.group() if marker else ""
+            body = line[len(prefix):]
+            spans = sentence_spans(body)
+            if not spans:
+                lines.append(line)  # Blank line: paragraph break
+                continue
+            kept = []
+            for start, end in spans:
+                sentence = body[start:end]
+                shingles = _shingles(sentence)
+                seen |= shingles
+                if shingles and len(shingles & previous) >= threshold * len(shingles):
+                    continue
+                kept.append(sentence)
+            if kept:
+                lines.append(prefix + body[:spans[0][0]] + " ".join(kept))
+        previous = seen
+        text = _BLANK_LINE_RUN.sub("\n\n", "\n".join(lines)).strip("\n")
+        if text.strip():
+            deduped.append(text)
+    return deduped
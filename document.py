@@ -0,0 +1,129 @@
+"""
+Page-indexed document model shared by the summarization stages.
+
+A Document holds the extracted text of one or more PDFs in a single string
+buffer. Each Page records where its text sits in that buffer, so page and
+file provenance survive every stage without copying the text. Word,
+character and sentence counts are computed once, on first use, and cached;
+stages read them from the Document instead of re-scanning the text.
+"""
+
+import re
+
+# Sentence boundary: terminal punctuation followed by whitespace
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+
+def sentence_spans(text, start=0, end=None):
+    """(start, end) offsets of the sentences in text[start:end]"""
+    end = len(text) if end is None else end
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    spans = []
+    for match in SENTENCE_BOUNDARY.finditer(text, start, end):
+        if match.start() > start:
+            spans.append((start, match.start()))
+        start = match.end()
+    if start < end:
+        spans.append((start, end))
+    return spans
+
+
+class Page:
+    """One page of a source file: its location in the Document buffer"""
+
+    __slots__ = ("file_name", "page_no", "start", "end")
+
+    def __init__(self, file_name, page_no, start, end):
+        self.file_name = file_name
+        self.page_no = page_no
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Page({self.file_name!r}, {self.page_no}, {self.start}:{self.end})"
+
+
+class Document:
+    """Extracted text plus page provenance and memoized text statistics"""
+
+    __slots__ = ("text", "pages", "_word_count", "_sentence_spans")
+
+    def __init__(self, text, pages=None):
+        self.text = text
+        self.pages = pages if pages is not None else []
+        self._word_count = None
+        self._sentence_spans = None
+
+    @classmethod
+    def from_pages(cls, records):
+        """Build a Document from (file_name, page_no, text) records
+
+        Non-empty pages are preceded by a "--- Page N of file ---" marker,
+        matching the text the summarizers have always been given.
+        """
+        parts = []
+        pages = []
+        offset = 0
+        for file_name, page_no, page_text in records:
+            if not page_text or page_text.isspace():
+                continue
+            marker = f"\n--- Page {page_no} of {file_name} ---\n"
+            start = offset + len(marker)
+            end = start + len(page_text)
+            parts.append(marker)
+            parts.append(page_text + "\n")
+            pages.append(Page(file_name, page_no, start, end))
+            offset = end + 1
+        return cls("".join(parts), pages)
+
+    @classmethod
+    def from_text(cls, text):
+        """Wrap plain text (e.g. a summary) that has no page structure"""
+        return cls(text)
+
+    def __len__(self):
+        return len(self.text)
+
+    def __str__(self):
+        return self.text
+
+    @property
+    def char_count(self):
+        return len(self.text)
+
+    @property
+    def word_count(self):
+        if self._word_count is None:
+            self._word_count = len(self.text.split())
+        return self._word_count
+
+    @property
+    def sentence_spans(self):
+        """(start, end) offsets of every sentence in the buffer"""
+        if self._sentence_spans is None:
+            self._sentence_spans = sentence_spans(self.text)
+        return self._sentence_spans
+
+    @property
+    def sentence_count(self):
+        return len(self.sentence_spans)
+
+    def sentences(self):
+        """Yield the sentences of the document as strings"""
+        text = self.text
+        for start, end in self.sentence_spans:
+            yield text[start:end]
+
+    def page_text(self, page):
+        """Text of one of this document's pages"""
+        return self.text[page.start:page.end]
+
+    def page_sentence_spans(self, page):
+        """Sentence offsets within one page (never crossing its markers)"""
+        return sentence_spans(self.text, page.start, page.end)
+
+    def is_blank(self):
+        return not self.text.strip()
@@ -0,0 +1,218 @@
+"""
+Pluggable PDF text extraction backends.
+
+PyPDF2 is always available and is the default. pypdfium2 (PDFium bindings,
+usually much faster) and pdfminer.six (slower, better layout handling) can
+be selected per deployment with PDF_EXTRACT_BACKEND when they are installed.
+Use benchmark_extraction.py to compare them on your own documents.
+"""
+
+import abc
+import importlib.util
+import io
+import os
+import warnings
+
+from uploads import map_file
+
+DEFAULT_BACKEND = os.environ.get("PDF_EXTRACT_BACKEND", "pypdf2")
+
+# Page kinds reported by the pre-extraction check
+PAGE_TEXT = "text"
+PAGE_IMAGE_ONLY = "image"
+PAGE_EMPTY = "empty"
+
+# Content-stream operators that show text
+_TEXT_OPERATORS = (b"Tj", b"TJ", b"'", b'"')
+
+
+def as_stream(source):
+    """Turn a path, raw bytes or binary file object into a seekable binary stream"""
+    if isinstance(source, (str, os.PathLike)):
+        return map_file(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+
+def extract_page(pdf, index):
+    """Return (kind, text) for one page, skipping extraction for non-text pages"""
+    kind = pdf.page_kind(index)
+    if kind != PAGE_TEXT:
+        return kind, ""
+    page_text = pdf.page_text(index)
+    return (PAGE_TEXT if page_text.strip() else PAGE_EMPTY), page_text
+
+
+class ExtractionBackend(abc.ABC):
+    """Interface: open() returns a document with len(), page_text(index)
+    and page_kind(index)"""
+
+    name = None
+    module = None
+
+    @classmethod
+    def is_available(cls):
+        return importlib.util.find_spec(cls.module) is not None
+
+    @abc.abstractmethod
+    def open(self, source):
+        """Open a PDF given as a path, bytes or binary file object"""
+
+
+class PyPDF2Document:
+    def __init__(self, source):
+        from PyPDF2 import PdfReader
+        self.reader = PdfReader(as_stream(source))
+
+    def __len__(self):
+        return len(self.reader.pages)
+
+    def page_text(self, index):
+        return self.reader.pages[index].extract_text() or ""
+
+    def page_kind(self, index):
+        """Classify a page from its resources and raw content stream
+
+        Text needs a font resource and a text-showing operator; both checks
+        are far cheaper than extract_text(), which interprets every operator.
+        """
+        page = self.reader.pages[index]
+        contents = page.get("/Contents")
+        if contents is None:
+            return PAGE_EMPTY
+        contents = contents.get_object()
+        streams = contents if isinstance(contents, list) else [contents]
+        data = b"".join(stream.get_object().get_data() for stream in streams)
+        if not data.strip():
+            return PAGE_EMPTY
+
+        resources = page.get("/Resources")
+        resources = resources.get_object() if resources is not None else {}
+        xobjects = resources.get("/XObject")
+        subtypes = set()
+        if xobjects:
+            xobjects = xobjects.get_object()
+            subtypes = {xobjects[name].get_object().get("/Subtype") for name in xobjects}
+        if "/Form" in subtypes:
+            return PAGE_TEXT  # Form XObjects can carry their own text
+        if resources.get("/Font") and any(op in data for op in _TEXT_OPERATORS):
+            return PAGE_TEXT
+        return PAGE_IMAGE_ONLY if "/Image" in subtypes else PAGE_EMPTY
+
+    def close(self):
+        pass
+
+
+class PyPDF2Backend(ExtractionBackend):
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    def open(self, source):
+        return PyPDF2Document(source)
+
+
+class PdfiumDocument:
+    def __init__(self, source):
+        import pypdfium2
+        # PDFium reads files itself; in-memory sources go in as streams
+        if isinstance(source, (str, os.PathLike)):
+            self.pdf = pypdfium2.PdfDocument(str(source))
+        else:
+            self.pdf = pypdfium2.PdfDocument(as_stream(source), autoclose=False)
+
+    def __len__(self):
+        return len(self.pdf)
+
+    def page_text(self, index):
+        page = self.pdf[index]
+        try:
+            text_page = page.get_textpage()
+            try:
+                return (text_page.get_text_range() or "").replace("\r\n", "\n")
+            finally:
+                text_page.close()
+        finally:
+            page.close()
+
+    def page_kind(self, index):
+        return PAGE_TEXT  # PDFium extraction is fast enough to just run it
+
+    def close(self):
+        self.pdf.close()
+
+
+class PdfiumBackend(ExtractionBackend):
+    name = "pypdfium2"
+    module = "pypdfium2"
+
+    def open(self, source):
+        return PdfiumDocument(source)
+
+
+class PdfMinerDocument:
+    def __init__(self, source):
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+        parser = PDFParser(as_stream(source))
+        self.pages = list(PDFPage.create_pages(PDFDocument(parser)))
+
+    def __len__(self):
+        return len(self.pages)
+
+    def page_text(self, index):
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        output = io.StringIO()
+        resources = PDFResourceManager()
+        device = TextConverter(resources, output, laparams=LAParams())
+        try:
+            PDFPageInterpreter(resources, device).process_page(self.pages[index])
+        finally:
+            device.close()
+        return output.getvalue()
+
+    def page_kind(self, index):
+        return PAGE_TEXT
+
+    def close(self):
+        pass
+
+
+class PdfMinerBackend(ExtractionBackend):
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def open(self, source):
+        return PdfMinerDocument(source)
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (PyPDF2Backend, PdfiumBackend, PdfMinerBackend)
+}
+
+
+def available_backends():
+    """Names of the backends whose libraries are installed"""
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def get_backend(name=None):
+    """Return the named backend (default: PDF_EXTRACT_BACKEND, else PyPDF2)
+
+    An unknown name raises ValueError. A known backend whose library is not
+    installed falls back to PyPDF2 with a warning, so a deployment setting
+    never breaks extraction outright.
+    """
+    name = (name or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF extraction backend: {name!r} (choose from {', '.join(BACKENDS)})")
+    backend = BACKENDS[name]
+    if not backend.is_available():
+        warnings.warn(f"PDF extraction backend {name!r} is not installed; using pypdf2")
+        backend = PyPDF2Backend
+    return backend()
@@ -0,0 +1,252 @@
+"""
+Supervised worker processes for PDF text extraction.
+
+Some malformed PDFs make text extraction spin for minutes or balloon memory.
+Extraction therefore runs in long-lived worker processes that the parent
+supervises: every page must come back within a timeout, each worker has an
+address-space cap (RLIMIT_AS, where the platform supports it), and workers
+are replaced after a number of documents so leaks cannot build up. A page
+that times out, crashes its worker or hits the memory cap is reported and
+skipped; the rest of the document is still extracted.
+
+Pages are handed back one at a time as the workers finish them, so the
+first pages of a document reach the caller while later ones are still
+being extracted.
+"""
+
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_POLL_SECONDS = 0.1
+
+
+class PageFailure(Exception):
+    """A page could not be extracted inside the sandbox"""
+
+
+def _worker_main(conn, memory_limit_mb):
+    """Worker loop: open documents and extract pages on request"""
+    if memory_limit_mb:
+        try:
+            import resource
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass  # No RLIMIT_AS on this platform; timeouts still apply
+
+    from extraction_backends import extract_page, get_backend
+
+    pdf = None
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+
+        command = message[0]
+        try:
+            if command == "open":
+                _, path, backend_name = message
+                if pdf is not None:
+                    pdf.close()
+                pdf = get_backend(backend_name).open(path)
+                conn.send(("ok", len(pdf)))
+            elif command == "page":
+                conn.send(("ok", extract_page(pdf, message[1])))
+            elif command == "close":
+                if pdf is not None:
+                    pdf.close()
+                pdf = None
+                conn.send(("ok", None))
+        except MemoryError:
+            conn.send(("memory", "memory limit exceeded"))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class SupervisedWorker:
+    """One sandboxed extraction process, restarted whenever it misbehaves"""
+
+    def __init__(self, memory_limit_mb, max_documents):
+        self.memory_limit_mb = memory_limit_mb
+        self.max_documents = max_documents
+        self.process = None
+        self.conn = None
+        self.documents = 0
+
+    def start(self):
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.memory_limit_mb),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.documents = 0
+
+    def kill(self):
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def stop(self):
+        """Ask the worker to exit, killing it if it does not"""
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+            self.process.join(1)
+        except (OSError, ValueError):
+            pass
+        self.kill()
+
+    def call(self, message, timeout):
+        """Send one request and wait up to `timeout` seconds for the reply"""
+        if self.process is None or not self.process.is_alive():
+            self.kill()
+            self.start()
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            self.kill()
+            raise PageFailure(f"timed out after {timeout:g}s")
+        try:
+            status, value = self.conn.recv()
+        except (EOFError, OSError):
+            self.kill()
+            raise PageFailure("worker crashed")
+        if status == "memory":
+            # State after a MemoryError is unreliable: start from a clean process
+            self.kill()
+            raise PageFailure(value)
+        if status == "error":
+            raise PageFailure(value)
+        return value
+
+    def open(self, path, backend_name, timeout):
+        """Open a document, recycling the process after max_documents documents"""
+        if self.process is not None and self.documents >= self.max_documents:
+            self.stop()
+        if self.process is None:
+            self.start()
+        self.documents += 1
+        return self.call(("open", path, backend_name), timeout)
+
+
+def _next_result(results, future):
+    """Next item `future`'s thread puts into `results`, re-raising the thread's error if it dies"""
+    while True:
+        try:
+            return results.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            if future.done() and results.empty():
+                future.result()
+                raise RuntimeError("extraction thread ended before its last page")
+
+
+class SandboxPool:
+    """A fixed set of supervised workers shared by all extraction requests"""
+
+    def __init__(self, size, page_timeout=30.0, memory_limit_mb=2048, max_documents=50):
+        self.size = max(1, size)
+        self.page_timeout = page_timeout
+        self._idle = queue.Queue()
+        for _ in range(self.size):
+            self._idle.put(SupervisedWorker(memory_limit_mb, max_documents))
+
+    def page_count(self, path, backend_name):
+        """Number of pages of the PDF at `path`, parsed inside a worker
+
+        Raises PageFailure when the document cannot be opened.
+        """
+        worker = self._idle.get()
+        try:
+            count = worker.open(path, backend_name, self.page_timeout)
+            try:
+                worker.call(("close",), self.page_timeout)
+            except PageFailure:
+                pass
+            return count
+        finally:
+            self._idle.put(worker)
+
+    def _extract(self, path, backend_name, indices, results, cancelled):
+        """Extract `indices` on one worker, putting (kind, text, failure_reason_or_None) into `results`
+
+        Stops before the next page once `cancelled` is set.
+        """
+        worker = self._idle.get()
+        try:
+            opened = False
+            for position, index in enumerate(indices):
+                if cancelled.is_set():
+                    break
+                if not opened:
+                    try:
+                        worker.open(path, backend_name, self.page_timeout)
+                        opened = True
+                    except PageFailure as e:
+                        reason = f"could not open document ({e})"
+                        for _ in indices[position:]:
+                            results.put((None, "", reason))
+                        break
+                try:
+                    kind, page_text = worker.call(("page", index), self.page_timeout)
+                    results.put((kind, page_text, None))
+                except PageFailure as e:
+                    results.put((None, "", str(e)))
+                    # A killed worker has lost the open document
+                    opened = worker.process is not None
+            if opened:
+                try:
+                    worker.call(("close",), self.page_timeout)
+                except PageFailure:
+                    pass
+        finally:
+            self._idle.put(worker)
+
+    def run(self, path, backend_name, index_groups):
+        """Yield (kind, text, failure_reason_or_None) for each page of `index_groups`, in order
+
+        Each group of page indices is extracted by one worker; groups run
+        concurrently when workers are free. Pages are yielded as soon as
+        they and the pages before them are done. Closing the generator
+        cancels the groups not started yet and stops the running ones after
+        their current page.
+        """
+        cancelled = threading.Event()
+        threads = ThreadPoolExecutor(max_workers=min(self.size, len(index_groups)) or 1)
+        try:
+            groups = []
+            for indices in index_groups:
+                results = queue.Queue()
+                future = threads.submit(self._extract, path, backend_name, indices, results, cancelled)
+                groups.append((indices, results, future))
+            for indices, results, future in groups:
+                for _ in indices:
+                    yield _next_result(results, future)
+        finally:
+            cancelled.set()
+            threads.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            worker.stop()
@@ -0,0 +1,25 @@
+"""
+Test helper: stand-in modules for optional dependencies.
+
+Code that imports torch, transformers or optimum inside its functions can
+be tested without them by installing small fake modules in sys.modules for
+the duration of a test.
+"""
+
+import contextlib
+import sys
+
+
+@contextlib.contextmanager
+def installed_modules(modules):
+    """Put `modules` ({name: module}) in sys.modules, restoring the previous entries on exit"""
+    saved = {name: sys.modules.get(name) for name in modules}
+    sys.modules.update(modules)
+    try:
+        yield
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
@@ -0,0 +1,86 @@
+"""
+Context lengths of the summarization backends, and the chunk budget they leave.
+
+A chunk has to share the model's context with the prompt around it and,
+for decoder-only models (Llama via Ollama or transformers), with the
+generated summary. Each backend reports its real context length:
+
+- transformers models: the smallest of the config's position limit and
+  the tokenizer's model_max_length
+- Ollama: OLLAMA_NUM_CTX when set, else the num_ctx the model was created
+  with, else the model's trained context_length from /api/show capped at
+  OLLAMA_MAX_CTX. The same value is sent as num_ctx with every request so
+  the server actually allocates it.
+"""
+
+import os
+
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
+OLLAMA_NUM_CTX = int(os.environ.get("OLLAMA_NUM_CTX", "0"))
+OLLAMA_MAX_CTX = int(os.environ.get("OLLAMA_MAX_CTX", "8192"))
+# Ollama's own default when neither the request nor the model sets num_ctx
+OLLAMA_DEFAULT_CTX = 2048
+
+DEFAULT_CONTEXT_LENGTH = 1024
+MIN_CHUNK_TOKENS = 256
+# Tokenizers without a limit report a huge sentinel (int(1e30))
+_NO_LIMIT = 1_000_000
+
+
+def transformers_context_length(tokenizer=None, config=None, default=DEFAULT_CONTEXT_LENGTH):
+    """Input tokens a transformers model accepts, from its config and tokenizer"""
+    limits = []
+    for attribute in ("max_position_embeddings", "n_positions", "max_sequence_length"):
+        value = getattr(config, attribute, None)
+        if isinstance(value, int) and value > 0:
+            limits.append(value)
+            break
+    value = getattr(tokenizer, "model_max_length", None)
+    if isinstance(value, int) and 0 < value < _NO_LIMIT:
+        limits.append(value)
+    return min(limits) if limits else default
+
+
+def parse_ollama_show(info, max_ctx=OLLAMA_MAX_CTX):
+    """Context length from an /api/show response (None if it has none)"""
+    for line in (info.get("parameters") or "").splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[0] == "num_ctx" and parts[1].isdigit():
+            return int(parts[1])
+    for key, value in (info.get("model_info") or {}).items():
+        if key.endswith(".context_length") and isinstance(value, int):
+            return min(value, max_ctx)
+    return None
+
+
+def fetch_ollama_context_length(model_name, timeout=5):
+    """Context length reported by the Ollama server for a model
+
+    Raises when the server cannot be reached or does not know the model, so
+    callers can tell a real answer from the fallback.
+    """
+    import requests
+    response = requests.post(f"{OLLAMA_URL}/api/show", json={"name": model_name}, timeout=timeout)
+    response.raise_for_status()
+    return parse_ollama_show(response.json()) or OLLAMA_DEFAULT_CTX
+
+
+def ollama_context_length(model_name, timeout=5):
+    """Context length to use for an Ollama model (see module docstring)"""
+    if OLLAMA_NUM_CTX:
+        return OLLAMA_NUM_CTX
+    try:
+        return fetch_ollama_context_length(model_name, timeout)
+    except Exception:
+        return OLLAMA_DEFAULT_CTX
+
+
+def chunk_budget(context_length, prompt_tokens=0, output_tokens=0, minimum=MIN_CHUNK_TOKENS):
+    """Tokens of document text that fit in one call next to the prompt and output
+
+    When the output reservation leaves less than `minimum`, the chunk takes
+    up to `minimum` tokens from it, but never more than the context left
+    after the prompt. Callers generate at most what the chunk leaves over.
+    """
+    remaining = context_length - prompt_tokens
+    return max(remaining - output_tokens, min(minimum, remaining), 1)
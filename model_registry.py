@@ -0,0 +1,153 @@
+"""
+Memory-bounded registry of loaded models.
+
+st.cache_resource keeps every model it ever loaded resident, so switching
+between DistilBART, bart-large-cnn and DialoGPT in one process piles up
+several GB. ModelRegistry instead holds models under a memory budget:
+each model's footprint (the bytes of its parameters and buffers) is
+measured when it loads, and the least recently used models are evicted
+when a new one would not fit. An evicted model is simply loaded again the
+next time it is asked for.
+
+A model larger than the whole budget is still loaded, alone. Callers that
+hold on to an evicted model keep it alive until they drop it.
+"""
+
+import gc
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+MODEL_MEMORY_MB = int(os.environ.get("MODEL_MEMORY_MB", "3072"))
+
+
+def model_footprint(value):
+    """Bytes held by the models in `value` (a model, a pipeline or a tuple of them)"""
+    if isinstance(value, (tuple, list)):
+        return sum(model_footprint(item) for item in value)
+    # Pipelines wrap their model; tokenizers hold no tensors worth counting
+    model = getattr(value, "model", value)
+    if getattr(model, "footprint_bytes", None) is not None:
+        # Models whose weights live outside torch (ONNX Runtime sessions) report their own size
+        return model.footprint_bytes
+    if not hasattr(model, "parameters"):
+        return 0
+    tensors = list(model.parameters())
+    if hasattr(model, "buffers"):
+        tensors.extend(model.buffers())
+    if hasattr(model, "modules"):
+        # Dynamically quantized layers keep their int8 weights outside parameters()
+        for module in model.modules():
+            if hasattr(module, "_weight_bias"):
+                tensors.extend(tensor for tensor in module._weight_bias() if tensor is not None)
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+def _release_memory():
+    """Return the memory of dropped models to the system (and the GPU)"""
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class ModelRegistry:
+    """LRU cache of loaded models bounded by their total footprint in bytes
+
+    A budget of 0 or less disables eviction. Loads of different models may
+    run concurrently; concurrent requests for the same model share one load.
+    """
+
+    def __init__(self, budget_bytes=MODEL_MEMORY_MB * 1024 * 1024, footprint=model_footprint):
+        self.budget_bytes = budget_bytes
+        self.footprint = footprint
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self._models = OrderedDict()  # key -> (model, size), least recently used first
+        self._sizes = {}  # Footprint of every model loaded so far, evicted or not
+        self._lock = threading.Lock()
+        self._loading = {}
+
+    def __contains__(self, key):
+        return key in self._models
+
+    def __len__(self):
+        return len(self._models)
+
+    @property
+    def used_bytes(self):
+        return sum(size for _, size in self._models.values())
+
+    def loaded(self):
+        """[(key, bytes)] of the resident models, least recently used first"""
+        with self._lock:
+            return [(key, size) for key, (_, size) in self._models.items()]
+
+    def get(self, key, loader):
+        """The model for `key`, calling `loader()` to (re)load it when it is not resident"""
+        with self._lock:
+            if key in self._models:
+                return self._hit(key)
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        with loading:
+            with self._lock:
+                if key in self._models:
+                    return self._hit(key)
+                # Reloads know their size: make room before, not after, the load peak
+                evicted = self._make_room(self._sizes.get(key, 0))
+            if evicted:
+                _release_memory()
+
+            model = loader()
+            size = self.footprint(model)
+            with self._lock:
+                self.loads += 1
+                self._sizes[key] = size
+                evicted = self._make_room(size)
+                self._models[key] = (model, size)
+            if evicted:
+                _release_memory()
+            return model
+
+    def evict(self, key):
+        """Drop `key` if it is resident; returns whether it was"""
+        with self._lock:
+            dropped = self._models.pop(key, None) is not None
+        if dropped:
+            self.evictions += 1
+            _release_memory()
+        return dropped
+
+    def clear(self):
+        """Drop every resident model"""
+        with self._lock:
+            dropped = len(self._models)
+            self._models.clear()
+        self.evictions += dropped
+        if dropped:
+            _release_memory()
+
+    def _hit(self, key):
+        self.hits += 1
+        self._models.move_to_end(key)
+        return self._models[key][0]
+
+    def _make_room(self, size):
+        """Evict least recently used models until `size` more bytes fit (lock held)"""
+        if self.budget_bytes <= 0:
+            return 0
+        used = self.used_bytes
+        evicted = 0
+        while self._models and used + size > self.budget_bytes:
+            _, (_, freed) = self._models.popitem(last=False)
+            used -= freed
+            evicted += 1
+        self.evictions += evicted
+        return evicted
+
+
+# Shared by every session of the app process
+MODELS = ModelRegistry()
@@ -0,0 +1,207 @@
+"""
+Content-addressed on-disk cache of extracted page text.
+
+Entries are keyed by the SHA-256 of the uploaded PDF bytes, so the same
+report uploaded by several people is only parsed once. Each entry is a
+single file: an 8-byte header length, a JSON header with the byte offsets
+of every page (plus optional metadata such as page kinds), then the UTF-8
+text of all pages back to back. Hits are served from a memory map and
+pages are only decoded when they are read. Entries can also be written a
+page at a time (PageTextCache.writer), so a document being extracted never
+has to be held in memory to be cached.
+The directory is kept under a size budget by evicting the least recently
+used entries (file mtime is bumped on every hit).
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+CACHE_DIR = os.environ.get(
+    "PDF_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "pdf-summarizer", "pages")
+)
+CACHE_MAX_MB = int(os.environ.get("PDF_CACHE_MAX_MB", "512"))
+
+ENTRY_SUFFIX = ".pages"
+HASH_BLOCK_SIZE = 1024 * 1024
+_HEADER_LEN = struct.Struct("<Q")
+
+
+def file_digest(source):
+    """SHA-256 hex digest of a PDF given as a path, bytes or binary file object"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    if hasattr(source, "getbuffer"):
+        # In-memory uploads: hash the underlying buffer without copying it
+        return hashlib.sha256(source.getbuffer()).hexdigest()
+
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+    else:
+        source.seek(0)
+        for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+class CachedPages:
+    """Read-only sequence of page texts backed by a memory-mapped cache entry"""
+
+    __slots__ = ("_map", "_offsets", "_base", "meta")
+
+    def __init__(self, mapped, offsets, base, meta=None):
+        self._map = mapped
+        self._offsets = offsets
+        self._base = base
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("page index out of range")
+        start = self._base + self._offsets[index]
+        end = self._base + self._offsets[index + 1]
+        return self._map[start:end].decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class PageTextCache:
+    """Size-bounded LRU cache of per-page text, stored on disk"""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, key):
+        """Return the cached pages for `key`, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            (header_len,) = _HEADER_LEN.unpack_from(mapped, 0)
+            header_end = _HEADER_LEN.size + header_len
+            header = json.loads(mapped[_HEADER_LEN.size:header_end])
+            offsets = header["offsets"]
+        except (struct.error, ValueError, KeyError):
+            # Truncated or foreign file: drop it and treat as a miss
+            mapped.close()
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return CachedPages(mapped, offsets, header_end, header.get("meta"))
+
+    def put(self, key, pages, meta=None):
+        """Store the page texts for `key` (plus a JSON-able `meta` dict) and evict if over budget"""
+        writer = self.writer(key)
+        for page_text in pages:
+            writer.add(page_text)
+        writer.commit(meta)
+
+    def writer(self, key):
+        """PageWriter that stores the entry for `key` one page at a time"""
+        return PageWriter(self, key)
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its budget"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(ENTRY_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+class PageWriter:
+    """A cache entry written one page at a time
+
+    Page texts go to a temp file as they are added; commit() publishes the
+    entry and abort() discards it. Nothing is visible to readers before
+    commit().
+    """
+
+    def __init__(self, cache, key):
+        self.cache = cache
+        self.key = key
+        fd, self._body_path = tempfile.mkstemp(dir=cache.directory, suffix=".tmp")
+        self._body = os.fdopen(fd, "w+b")
+        self._offsets = [0]
+
+    def add(self, page_text):
+        data = (page_text or "").encode("utf-8")
+        self._body.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    def commit(self, meta=None):
+        """Store the pages added so far (plus a JSON-able `meta` dict) and evict if over budget"""
+        header = json.dumps({"offsets": self._offsets, "meta": meta or {}}).encode("utf-8")
+        # Write to a temp file and rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER_LEN.pack(len(header)))
+                f.write(header)
+                self._body.seek(0)
+                shutil.copyfileobj(self._body, f)
+            os.replace(tmp_path, self.cache._path(self.key))
+        except OSError:
+            self.cache._remove(tmp_path)
+            return
+        finally:
+            self.abort()
+        self.cache.evict()
+
+    def abort(self):
+        """Discard the pages added so far"""
+        if not self._body.closed:
+            self._body.close()
+            self.cache._remove(self._body_path)
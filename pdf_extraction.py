@@ -0,0 +1,474 @@
+"""
+PDF text extraction engine shared by the Streamlit apps and the FastAPI backend.
+
+Text extraction (PyPDF2 by default, see extraction_backends) is CPU bound,
+so large PDFs are split into page ranges that a process pool extracts in
+parallel. Pages always come back in document order. Small PDFs are
+extracted serially in-process, where spinning up workers would cost more
+than it saves.
+
+With PDF_SANDBOX enabled (the default), all extraction instead runs in the
+supervised workers of extraction_sandbox, which enforce per-page time and
+memory limits. Pages that fail are skipped and listed in an
+ExtractionReport rather than failing the whole document.
+
+Every page is classified (text / image-only / empty) from its resources
+and content stream before extraction, so scanned and blank pages never pay
+for a full extract_text() call.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing, contextmanager
+
+from extraction_backends import PAGE_EMPTY, PAGE_IMAGE_ONLY, extract_page, get_backend
+from extraction_sandbox import PageFailure, SandboxPool
+from page_cache import file_digest
+
+# Number of worker processes used for large PDFs (1 disables the pool)
+MAX_WORKERS = int(os.environ.get("PDF_EXTRACT_WORKERS", os.cpu_count() or 1))
+
+# PDFs with fewer pages than this are always extracted serially
+PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "64"))
+
+# Smallest page range handed to a single worker task
+MIN_PAGES_PER_TASK = 8
+
+# Sandboxed extraction: per-page timeout, per-worker memory cap, recycling
+SANDBOX_ENABLED = os.environ.get("PDF_SANDBOX", "1") != "0"
+PAGE_TIMEOUT = float(os.environ.get("PDF_PAGE_TIMEOUT", "30"))
+WORKER_MEMORY_MB = int(os.environ.get("PDF_WORKER_MEMORY_MB", "2048"))
+WORKER_MAX_DOCUMENTS = int(os.environ.get("PDF_WORKER_MAX_DOCUMENTS", "50"))
+
+# Pages beyond this budget are skipped (0 = no limit)
+MAX_PAGES_PER_DOCUMENT = int(os.environ.get("PDF_MAX_PAGES", "5000"))
+
+_executor = None
+_sandbox = None
+
+
+class ExtractionReport:
+    """Pages that were skipped during extraction, and pages without text"""
+
+    def __init__(self):
+        self.skipped = []
+        self.image_only = []
+        self.empty_pages = 0
+
+    def skip(self, file_name, page_no, reason):
+        self.skipped.append((file_name, page_no, reason))
+
+    def record(self, file_name, page_no, kind):
+        """Note the kind of an extracted page (see extraction_backends.PAGE_*)"""
+        if kind == PAGE_IMAGE_ONLY:
+            self.image_only.append((file_name, page_no))
+        elif kind == PAGE_EMPTY:
+            self.empty_pages += 1
+
+    def summary(self):
+        """One line per skipped page, for display"""
+        return [f"{file_name} page {page_no}: {reason}" for file_name, page_no, reason in self.skipped]
+
+
+def get_executor():
+    """Return the shared extraction process pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        # Spawn instead of fork: the Streamlit and uvicorn parents are threaded
+        _executor = ProcessPoolExecutor(
+            max_workers=MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the shared process pool (it is recreated on next use)"""
+    global _executor
+    if _executor is not None:
+        # Drop queued page ranges too; only the ranges already running finish
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def get_sandbox():
+    """Return the shared pool of supervised extraction workers"""
+    global _sandbox
+    if _sandbox is None:
+        _sandbox = SandboxPool(
+            MAX_WORKERS,
+            page_timeout=PAGE_TIMEOUT,
+            memory_limit_mb=WORKER_MEMORY_MB,
+            max_documents=WORKER_MAX_DOCUMENTS
+        )
+    return _sandbox
+
+
+def split_page_range(page_count, parts, min_size=MIN_PAGES_PER_TASK):
+    """Split range(page_count) into at most `parts` contiguous (start, stop) ranges"""
+    parts = max(1, min(parts, page_count // max(1, min_size)))
+    size, extra = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _extract_pages(path, indices, backend_name):
+    """Worker task: extract the given 0-based pages of the PDF at `path`"""
+    pdf = get_backend(backend_name).open(path)
+    try:
+        return [extract_page(pdf, i) for i in indices]
+    finally:
+        pdf.close()
+
+
+def parse_page_range(spec, page_count):
+    """Turn a spec like "1-20, 25, 40-" into sorted 0-based page indices
+
+    Page numbers are 1-based and inclusive; an open end runs to the last
+    page. Numbers past the end of the document are clipped. An empty spec
+    selects every page. Raises ValueError for malformed specs.
+    """
+    if spec is None or not str(spec).strip():
+        return list(range(page_count))
+
+    selected = set()
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                first, _, last = part.partition("-")
+                first = int(first) if first.strip() else 1
+                last = int(last) if last.strip() else page_count
+            else:
+                first = last = int(part)
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part!r}")
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid page range: {part!r}")
+        selected.update(range(first - 1, min(last, page_count)))
+    return sorted(selected)
+
+
+def _source_bytes(source):
+    """Return the bytes behind an in-memory source without copying when possible"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return source
+    if hasattr(source, "getbuffer"):
+        return source.getbuffer()
+    source.seek(0)
+    return source.read()
+
+
+def _iter_parallel(path, indices, backend_name):
+    """Yield (kind, text) for the given pages of the PDF at `path`, extracted by the process pool"""
+    # Twice as many tasks as workers keeps the pool busy when ranges run unevenly
+    ranges = split_page_range(len(indices), MAX_WORKERS * 2)
+    executor = get_executor()
+    futures = [
+        executor.submit(_extract_pages, path, indices[start:stop], backend_name)
+        for start, stop in ranges
+    ]
+    for future in futures:
+        for result in future.result():
+            yield result
+
+
+def _spill(source):
+    """Write an in-memory PDF to a temp file; returns its path"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        tmp.write(_source_bytes(source))
+    return tmp.name
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@contextmanager
+def _source_path(source, spill=None):
+    """Path of the PDF on disk
+
+    `spill()` returns a path that outlives the call (see
+    LazyPdfDocument.path); without it, in-memory uploads are spilled to a
+    temp file for the duration of the block.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        yield source
+        return
+    if spill is not None:
+        yield spill()
+        return
+    path = _spill(source)
+    try:
+        yield path
+    finally:
+        _remove_file(path)
+
+
+def _source_name(source):
+    return getattr(source, "name", None) or (str(source) if isinstance(source, (str, os.PathLike)) else "PDF")
+
+
+def _page_count(source, backend, spill=None):
+    """Number of pages of a PDF, counted in a sandbox worker when the sandbox is enabled
+
+    The parent process never parses an untrusted document itself. Raises
+    ValueError when the document cannot be opened. `spill` is passed on to
+    _source_path().
+    """
+    if not SANDBOX_ENABLED:
+        pdf = backend.open(source)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    with _source_path(source, spill) as path:
+        try:
+            return get_sandbox().page_count(path, backend.name)
+        except PageFailure as e:
+            raise ValueError(f"Could not open PDF: {e}")
+
+
+def _iter_extracted(source, open_pdf, indices, backend, report, spill=None):
+    """Yield (index, kind, text) for `indices`, in order, recording kinds and failures
+
+    `open_pdf()` returns the parsed document for in-process extraction; it is
+    only called when pages are extracted in this process (never with the
+    sandbox). `spill` is passed on to _source_path(). Pages that were
+    skipped are yielded with kind None.
+    """
+    name = _source_name(source)
+    over_budget = []
+    if MAX_PAGES_PER_DOCUMENT and len(indices) > MAX_PAGES_PER_DOCUMENT:
+        indices, over_budget = indices[:MAX_PAGES_PER_DOCUMENT], indices[MAX_PAGES_PER_DOCUMENT:]
+    done = 0
+
+    if SANDBOX_ENABLED and indices:
+        sandbox = get_sandbox()
+        if len(indices) >= PARALLEL_MIN_PAGES:
+            groups = [indices[start:stop] for start, stop in split_page_range(len(indices), sandbox.size)]
+        else:
+            groups = [indices]
+        with _source_path(source, spill) as path, closing(sandbox.run(path, backend.name, groups)) as results:
+            for kind, page_text, failure in results:
+                index = indices[done]
+                if failure:
+                    report.skip(name, index + 1, failure)
+                else:
+                    report.record(name, index + 1, kind)
+                yield index, kind, page_text
+                done += 1
+
+    elif MAX_WORKERS > 1 and len(indices) >= PARALLEL_MIN_PAGES:
+        with _source_path(source, spill) as path:
+            try:
+                for kind, page_text in _iter_parallel(path, indices, backend.name):
+                    index = indices[done]
+                    report.record(name, index + 1, kind)
+                    yield index, kind, page_text
+                    done += 1
+            except BrokenProcessPool:
+                # A crashed worker should not fail the upload; finish it serially
+                shutdown_executor()
+
+    pdf = open_pdf() if indices[done:] else None
+    for index in indices[done:]:
+        kind, page_text = extract_page(pdf, index)
+        report.record(name, index + 1, kind)
+        yield index, kind, page_text
+
+    for index in over_budget:
+        report.skip(name, index + 1, f"over the {MAX_PAGES_PER_DOCUMENT}-page budget")
+        yield index, None, ""
+
+
+def iter_page_texts(source, pdf=None, pages=None, backend=None, report=None):
+    """Yield (page_no, text) for the pages of a PDF, in order
+
+    `source` is a file path, raw bytes or a binary file object (such as a
+    Streamlit upload). Pass an already opened backend document as `pdf` to
+    avoid parsing the document again, and `pages` (0-based indices) to
+    extract only part of the document. Image-only, empty and skipped pages
+    are yielded as "" and recorded in `report`.
+    """
+    backend = backend or get_backend()
+    report = report if report is not None else ExtractionReport()
+    spilled = []
+
+    def spill():
+        # One temp copy of an in-memory upload serves the page count and every page
+        if not spilled:
+            spilled.append(_spill(source))
+        return spilled[0]
+
+    def open_pdf():
+        return pdf if pdf is not None else backend.open(source)
+
+    try:
+        if pages is not None:
+            indices = list(pages)
+        else:
+            indices = list(range(len(pdf) if pdf is not None else _page_count(source, backend, spill)))
+        for index, _, page_text in _iter_extracted(source, open_pdf, indices, backend, report, spill):
+            yield index + 1, page_text
+    finally:
+        for path in spilled:
+            _remove_file(path)
+
+
+class LazyPdfDocument:
+    """A PDF whose pages are only extracted when something asks for them
+
+    Workers read the PDF from disk: an in-memory upload is spilled to a temp
+    file once, on first need, and removed by close() (or when the document
+    is garbage collected).
+    Page counts come from the cache or from parsing the document structure
+    (in a sandbox worker when the sandbox is enabled), which is cheap; the
+    expensive text extraction runs per page on first access. page_text()
+    memoizes pages; iter_pages() streams them without keeping their text,
+    writing a full pass straight into `cache`. Documents already in `cache`
+    are never parsed. Cache entries are per backend, since backends produce
+    different text.
+    """
+
+    def __init__(self, source, cache=None, key=None, backend=None, report=None):
+        self.source = source
+        self.cache = cache
+        self.backend = backend or get_backend()
+        self.report = report if report is not None else ExtractionReport()
+        self.name = _source_name(source)
+        if cache is not None and key is None:
+            key = file_digest(source)
+        self.key = key
+        self._cached = cache.get(self.cache_key) if cache is not None else None
+        self._pdf = None
+        self._page_count = None
+        self._spilled = None
+        self._texts = {}
+        self._kinds = {}
+
+    @property
+    def cache_key(self):
+        return f"{self.backend.name}-{self.key}"
+
+    @property
+    def pdf(self):
+        if self._pdf is None:
+            self._pdf = self.backend.open(self.source)
+        return self._pdf
+
+    @property
+    def path(self):
+        """The PDF on disk: the source path, or a temp file holding an in-memory upload"""
+        if isinstance(self.source, (str, os.PathLike)):
+            return self.source
+        if self._spilled is None:
+            path = _spill(self.source)
+            self._spilled = (path, weakref.finalize(self, _remove_file, path))
+        return self._spilled[0]
+
+    def close(self):
+        """Release the parsed document and remove the spilled upload, if any"""
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+        if self._spilled is not None:
+            self._spilled[1]()
+            self._spilled = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        if self._cached is not None:
+            return len(self._cached)
+        if self._page_count is None:
+            if self._pdf is not None:
+                self._page_count = len(self._pdf)
+            else:
+                self._page_count = _page_count(self.source, self.backend, lambda: self.path)
+        return self._page_count
+
+    def __getitem__(self, index):
+        return self.page_text(index)
+
+    def page_text(self, index):
+        """Text of the 0-based page `index`, extracting it on first access"""
+        if self._cached is not None:
+            return self._cached[index]
+        if index < 0:
+            index += len(self)
+        if index not in self._texts:
+            for _, self._kinds[index], self._texts[index] in _iter_extracted(
+                self.source, lambda: self.pdf, [index], self.backend, self.report, lambda: self.path
+            ):
+                pass
+        return self._texts[index]
+
+    def iter_pages(self, pages=None):
+        """Yield (page_no, text) for `pages` (0-based indices, default all), in order"""
+        pages = range(len(self)) if pages is None else list(pages)
+        if self._cached is not None:
+            kinds = self._cached.meta.get("kinds") if hasattr(self._cached, "meta") else None
+            for index in pages:
+                if kinds:
+                    self.report.record(self.name, index + 1, kinds[index])
+                yield index + 1, self._cached[index]
+            return
+
+        # Pages not seen yet go through the engine together so big selections
+        # still use the process pool
+        missing = [index for index in pages if index not in self._texts]
+        fresh = _iter_extracted(self.source, lambda: self.pdf, missing, self.backend, self.report, lambda: self.path)
+        # A pass over the whole document goes to the cache as it is extracted
+        whole = self.cache is not None and list(pages) == list(range(len(self)))
+        writer = self.cache.writer(self.cache_key) if whole else None
+        try:
+            for index in pages:
+                if index in self._texts:
+                    page_text = self._texts[index]
+                else:
+                    _, self._kinds[index], page_text = next(fresh)
+                if writer is not None:
+                    writer.add(page_text)
+                yield index + 1, page_text
+
+            # Documents with skipped pages are not cached: the failure may be transient.
+            # Skipped pages are this document's pages without a kind (not matched by
+            # file name, which two uploads may share)
+            if writer is not None and not any(self._kinds[index] is None for index in pages):
+                writer.commit(meta={"kinds": [self._kinds[index] for index in pages]})
+                self._cached = self.cache.get(self.cache_key)
+        finally:
+            fresh.close()
+            if writer is not None:
+                writer.abort()
+
+
+def extract_pages(source, cache=None, key=None, pages=None, backend=None, report=None):
+    """Extract page texts of a PDF as a list (empty pages are "")
+
+    With a page_cache.PageTextCache, documents seen before are served from the
+    cache without being parsed, and fully extracted ones are added to it. Pass
+    `key` when the SHA-256 of the source is already known (e.g. from
+    uploads.spool_upload) and `pages` (0-based indices) to extract a subset.
+    """
+    with LazyPdfDocument(source, cache=cache, key=key, backend=backend, report=report) as document:
+        return [page_text for _, page_text in document.iter_pages(pages)]
@@ -1,11 +1,39 @@
 import streamlit as st
-from PyPDF2 import PdfReader
-from transformers import pipeline
-import torch
 import io
+import os
+import time
 import base64
 from datetime import datetime
-import re
+from uploads import upload_size
+from pdf_extraction import ExtractionReport, LazyPdfDocument, parse_page_range
+from page_cache import PageTextCache
+from document import Document
+from text_cleanup import StreamingCleaner
+from chunking import CHUNK_OVERLAP, StreamingChunker, chunk_document, chunk_text, dedupe_summaries, estimate_tokens
+from streaming import SummaryPipeline
+import textrank
+from section_matcher import SectionBudget, SectionMatcher
+from warmup import WARMUP_ENABLED, warm_up
+from model_registry import MODELS
+from quantization import DISTILBART_MODEL, QUANTIZE_ENABLED
+from summary_engines import resolve_engine, summarization_pipeline
+from model_context import (
+    OLLAMA_DEFAULT_CTX, OLLAMA_NUM_CTX, OLLAMA_URL, chunk_budget, fetch_ollama_context_length,
+    transformers_context_length
+)
+
+# Documents with more words than this are summarized from their important
+# sections, streamed into the model while later pages are still extracted
+LARGE_DOCUMENT_WORDS = 4000
+
+# Compiled once; scans each page for important keywords, numbers and dates
+SECTION_MATCHER = SectionMatcher()
+
+# Default time the user is willing to wait; large documents are pre-selected
+# down to what the chosen model can summarize in that time
+SUMMARY_LATENCY_TARGET = int(os.environ.get("SUMMARY_LATENCY_TARGET", "120"))
+# Share of the latency target spent on chunk summaries (the rest is for the final one)
+MAP_TIME_SHARE = 0.8
 
 # Page configuration
 st.set_page_config(
@@ -247,7 +275,7 @@ def get_llama_ollama():
     try:
         import requests
         # Test Ollama connection
-        response = requests.get('http://localhost:11434/api/tags', timeout=5)
+        response = requests.get(f'{OLLAMA_URL}/api/tags', timeout=5)
         if response.status_code == 200:
             models = response.json().get('models', [])
             available_models = [model['name'] for model in models if 'llama' in model['name'].lower()]
@@ -256,46 +284,69 @@ def get_llama_ollama():
     except:
         return []
 
-@st.cache_resource
+def load_llama_transformers(model_name):
+    """Load a causal language model and its tokenizer via transformers"""
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    import torch
+    
+    with st.spinner(f"🦙 Loading {model_name}..."):
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
+            device_map="auto" if torch.cuda.is_available() else None,
+            low_cpu_mem_usage=True
+        )
+        
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+            
+        return model, tokenizer
+
 def get_llama_transformers(model_name="microsoft/DialoGPT-medium"):
     """Load Llama model via transformers (fallback to compatible model)"""
     try:
-        from transformers import AutoTokenizer, AutoModelForCausalLM
-        import torch
-        
-        with st.spinner(f"🦙 Loading {model_name}..."):
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            model = AutoModelForCausalLM.from_pretrained(
-                model_name,
-                torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-                device_map="auto" if torch.cuda.is_available() else None,
-                low_cpu_mem_usage=True
-            )
-            
-            if tokenizer.pad_token is None:
-                tokenizer.pad_token = tokenizer.eos_token
-                
-            return model, tokenizer
+        return MODELS.get(model_name, lambda: load_llama_transformers(model_name))
     except Exception as e:
         st.error(f"Failed to load Llama model: {e}")
         return None, None
 
-@st.cache_resource
+def load_distilbart_summarizer():
+    """Load the original DistilBART summarization pipeline on the engine chosen by SUMMARY_ENGINE"""
+    engine = resolve_engine()
+    if engine == "onnx":
+        label = "DistilBART model (ONNX Runtime)"
+    else:
+        label = "DistilBART model (int8)" if QUANTIZE_ENABLED else "DistilBART model"
+    with st.spinner(f"🤖 Loading {label}..."):
+        summarizer = summarization_pipeline(DISTILBART_MODEL, engine=engine)
+    if WARMUP_ENABLED:
+        # Pay first-inference costs here, once per load, not in the first summary
+        with st.spinner("🔥 Warming up DistilBART..."):
+            warm_up(lambda text: summarizer(text, max_length=60, min_length=20, do_sample=False))
+    return summarizer
+
 def get_distilbart_summarizer():
-    """Load the original DistilBART summarization pipeline"""
-    with st.spinner("🤖 Loading DistilBART model..."):
-        return pipeline(
-            "summarization",
-            model="sshleifer/distilbart-cnn-12-6",
-            device=0 if torch.cuda.is_available() else -1
-        )
+    """DistilBART pipeline from the shared model registry (reloaded if it was evicted)"""
+    return MODELS.get(DISTILBART_MODEL, load_distilbart_summarizer)
 
-def summarize_with_ollama(text, model_name="llama2", max_words=500):
-    """Summarize using Ollama Llama model"""
-    import requests
-    import json
-    
-    prompt = f"""You are an expert document analyst specializing in comprehensive summarization of confidential and sensitive documents. Your task is to create detailed summaries that preserve ALL critical information.
+@st.cache_data(show_spinner=False)
+def fetch_ollama_context_length_cached(model_name):
+    # Failed lookups raise, and st.cache_data does not cache exceptions
+    return fetch_ollama_context_length(model_name)
+
+def get_ollama_context_length(model_name):
+    """Context length of an Ollama model (looked up once per model, retried while the server is down)"""
+    if OLLAMA_NUM_CTX:
+        return OLLAMA_NUM_CTX
+    try:
+        return fetch_ollama_context_length_cached(model_name)
+    except Exception:
+        return OLLAMA_DEFAULT_CTX
+
+def ollama_prompt(text, max_words):
+    """Prompt sent to Ollama around one piece of document text"""
+    return f"""You are an expert document analyst specializing in comprehensive summarization of confidential and sensitive documents. Your task is to create detailed summaries that preserve ALL critical information.
 
 CRITICAL REQUIREMENTS:
 - Preserve ALL numbers, dates, names, references, and identifiers
@@ -312,17 +363,30 @@ DOCUMENT TO SUMMARIZE:
 
 COMPREHENSIVE SUMMARY:"""
 
+def summarize_with_ollama(text, model_name="llama2", max_words=500, num_ctx=None, num_predict=None):
+    """Summarize using Ollama Llama model
+    
+    `num_predict` caps the generated tokens; pass the output space reserved
+    when the chunk was sized so prompt, chunk and output fit in `num_ctx`.
+    """
+    import requests
+    
+    prompt = ollama_prompt(text, max_words)
+    options = {
+        'temperature': 0.3,  # Lower temperature for more focused output
+        'top_p': 0.9,
+        'num_predict': num_predict or max_words * 2  # Allow flexibility
+    }
+    if num_ctx:
+        options['num_ctx'] = num_ctx
+
     try:
-        response = requests.post('http://localhost:11434/api/generate',
+        response = requests.post(f'{OLLAMA_URL}/api/generate',
             json={
                 'model': model_name,
                 'prompt': prompt,
                 'stream': False,
-                'options': {
-                    'temperature': 0.3,  # Lower temperature for more focused output
-                    'top_p': 0.9,
-                    'max_tokens': max_words * 2  # Allow flexibility
-                }
+                'options': options
             },
             timeout=300  # 5 minute timeout
         )
@@ -335,18 +399,25 @@ COMPREHENSIVE SUMMARY:"""
     except Exception as e:
         raise Exception(f"Ollama summarization failed: {str(e)}")
 
-def summarize_with_transformers(text, model, tokenizer, max_words=500):
-    """Summarize using local Llama model via transformers"""
-    import torch
-    
-    prompt = f"""<s>[INST] You are an expert at creating comprehensive summaries of confidential documents. Create a detailed summary of the following text that preserves all important information including numbers, dates, names, and key details. Target length: {max_words} words.
+def transformers_prompt(text, max_words):
+    """Prompt given to the local transformers model around one piece of text"""
+    return f"""<s>[INST] You are an expert at creating comprehensive summaries of confidential documents. Create a detailed summary of the following text that preserves all important information including numbers, dates, names, and key details. Target length: {max_words} words.
 
 Text: {text}
 
 Summary: [/INST]"""
 
+def summarize_with_transformers(text, model, tokenizer, max_words=500):
+    """Summarize using local Llama model via transformers"""
+    import torch
+    
+    prompt = transformers_prompt(text, max_words)
+    context_length = transformers_context_length(tokenizer, model.config)
+    max_new_tokens = min(max_words * 2, context_length // 4)
+
     try:
-        inputs = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=2048)
+        # Prompt and generated tokens share the model's context
+        inputs = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=context_length - max_new_tokens)
         
         if torch.cuda.is_available():
             inputs = {k: v.cuda() for k, v in inputs.items()}
@@ -355,7 +426,7 @@ Summary: [/INST]"""
         with torch.no_grad():
             outputs = model.generate(
                 **inputs,
-                max_new_tokens=max_words * 2,
+                max_new_tokens=max_new_tokens,
                 temperature=0.3,
                 do_sample=True,
                 pad_token_id=tokenizer.eos_token_id,
@@ -382,7 +453,7 @@ def get_summarizer():
         # Check available models
         ollama_models = get_llama_ollama()
         
-        model_options = ["DistilBART (Fast, Good Quality)"]
+        model_options = ["DistilBART (Fast, Good Quality)", "TextRank (Extractive, No Model)"]
         if ollama_models:
             model_options.extend([f"Llama via Ollama: {model}" for model in ollama_models])
         model_options.append("Llama via Transformers (Local)")
@@ -396,94 +467,294 @@ def get_summarizer():
         # Model info
         if "DistilBART" in selected_model:
             st.info("🔸 **DistilBART**: Fast, good for general summaries")
+        elif "TextRank" in selected_model:
+            st.info("🕸️ **TextRank**: Picks the most central sentences, CPU only, no model download")
         elif "Ollama" in selected_model:
             st.success("🦙 **Llama via Ollama**: Best for confidential data, superior context understanding")
         else:
             st.warning("🦙 **Llama via Transformers**: Good quality but slower, requires more memory")
-    
+
+        resident = MODELS.loaded()
+        if resident:
+            used_mb = sum(size for _, size in resident) / (1024 * 1024)
+            budget = f"{MODELS.budget_bytes / (1024 * 1024):,.0f} MB" if MODELS.budget_bytes > 0 else "no limit"
+            st.caption(
+                f"🧠 Models in memory: {', '.join(key for key, _ in resident)} "
+                f"({used_mb:,.0f} MB of {budget}; least recently used are unloaded first)"
+            )
+
     return selected_model
 
-def extract_text_from_pdfs(pdf_files):
-    """Extract text from uploaded PDF files with progress tracking"""
-    text = ""
+@st.cache_resource
+def get_page_cache():
+    """Shared on-disk cache of extracted page text"""
+    return PageTextCache()
+
+def iter_pdf_pages(documents):
+    """Yield (file, page_no, text) records for the selected pages of each document"""
+    for pdf, document, pages in documents:
+        for page_no, page_text in document.iter_pages(pages):
+            yield pdf, page_no, page_text
+
+def open_documents(pdf_files, page_range=None):
+    """Open uploaded PDF files for lazy extraction
+    
+    `page_range` (e.g. "1-20") limits extraction to those pages of every file.
+    Returns ([(file, document, page_indices)], total_pages, report); close
+    the documents with close_documents() when done.
+    """
+    cache = get_page_cache()
+    report = ExtractionReport()
+    
+    # Documents are opened once and pages are only extracted when iterated
+    documents = []
+    opened = []
     total_pages = 0
+    try:
+        for pdf in pdf_files:
+            document = LazyPdfDocument(pdf, cache=cache, report=report)
+            opened.append(document)
+            pages = parse_page_range(page_range, len(document))
+            total_pages += len(pages)
+            documents.append((pdf, document, pages))
+    except ValueError:
+        for document in opened:
+            document.close()
+        raise
+    return documents, total_pages, report
+
+def close_documents(documents):
+    """Release the documents returned by open_documents() (and their temp copies)"""
+    for _, document, _ in documents:
+        document.close()
+
+def iter_clean_records(documents):
+    """Yield cleaned (file_name, page_no, text) records as pages are extracted"""
+    cleaner = StreamingCleaner()
+    for pdf, page_no, page_text in iter_pdf_pages(documents):
+        # Repeated headers/footers are dropped before they reach the model
+        for record in cleaner.add((pdf.name, page_no, page_text)):
+            yield record
+    for record in cleaner.finish():
+        yield record
+
+def show_extraction_report(report):
+    if report.skipped:
+        st.warning(f"⚠️ Skipped {len(report.skipped)} page(s) that could not be extracted")
+        with st.expander("Skipped pages"):
+            for line in report.summary():
+                st.write(f"- {line}")
+    
+    if report.image_only:
+        st.info(f"🖼️ {len(report.image_only)} page(s) contain only images (e.g. scans) and were skipped")
+
+def show_selection_report(selector, latency_target):
+    """How much of a large document the token budget left out"""
+    if not selector.total_tokens:
+        return
+    kept_share = selector.kept_tokens / selector.total_tokens * 100
+    st.info(
+        f"✂️ Pre-selection kept {selector.kept_tokens:,} of {selector.total_tokens:,} tokens ({kept_share:.0f}%) "
+        f"to finish in about {latency_target}s; dropped {selector.dropped_paragraphs:,} of "
+        f"{selector.total_paragraphs:,} paragraphs ({selector.dropped_tokens:,} tokens)."
+    )
+
+def show_text_stats(placeholder, total_pages, words, sentences):
+    placeholder.markdown(f"""
+    <div class="stats-container">
+        <div class="stat-box">
+            <strong>{total_pages}</strong><br>Pages
+        </div>
+        <div class="stat-box">
+            <strong>{words:,}</strong><br>Words
+        </div>
+        <div class="stat-box">
+            <strong>{sentences}</strong><br>Sentences
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+def summarize_with_textrank(document, max_words):
+    """The document's most central sentences, in their original order"""
+    spans = [span for page in document.pages for span in document.page_sentence_spans(page)]
+    sentences = [" ".join(document.text[start:end].split()) for start, end in spans or document.sentence_spans]
+    return " ".join(sentences[i] for i in textrank.summarize(sentences, max_words))
+
+class SummaryBackend:
+    """How one model summarizes chunks: chunk size, map step and reduce step
+    
+    `tokens_per_second` is a conservative CPU estimate of the input the
+    model gets through; it is replaced by the measured rate once the
+    backend has summarized something in this session.
+    """
+    
+    def __init__(self, label, max_size, tokenizer, summarize_chunk, reduce, tokens_per_second):
+        self.label = label
+        self.max_size = max_size
+        self.tokenizer = tokenizer
+        self.summarize_chunk = summarize_chunk  # (text, estimated_chunks) -> summary
+        self.reduce = reduce  # [chunk summaries] -> final summary
+        self.tokens_per_second = tokens_per_second
+    
+    @property
+    def throughput(self):
+        """Input tokens per second, as measured in this session if possible"""
+        return st.session_state.get("throughput", {}).get(self.label, self.tokens_per_second)
+    
+    def record_throughput(self, tokens, seconds):
+        if tokens and seconds > 0:
+            st.session_state.setdefault("throughput", {})[self.label] = tokens / seconds
+
+def ollama_backend(model_name, params):
+    target_words = params["max_length"]
+    num_ctx = get_ollama_context_length(model_name)
+    st.info(f"🦙 Using Ollama model: {model_name} ({num_ctx:,}-token context)")
+    
+    # Chunks fill the context, minus the prompt and the summary to generate
+    prompt_tokens = estimate_tokens(ollama_prompt("", target_words))
+    max_size = chunk_budget(num_ctx, prompt_tokens=prompt_tokens, output_tokens=min(target_words * 2, num_ctx // 4))
+    # Generation gets exactly the space the chunk leaves, so nothing overflows num_ctx
+    num_predict = max(num_ctx - prompt_tokens - max_size, 1)
+    
+    def summarize_chunk(text, total):
+        return summarize_with_ollama(text, model_name, target_words // total, num_ctx, num_predict)
+    
+    def reduce(summaries):
+        if len(summaries) == 1:
+            return summaries[0]
+        # Combine (without what overlapping chunks repeated) and create final summary
+        combined_text = "\n\n".join(dedupe_summaries(summaries))
+        if len(combined_text.split()) > target_words:
+            st.info("🔄 Creating final comprehensive summary...")
+            return summarize_with_ollama(combined_text, model_name, target_words, num_ctx, num_predict)
+        return combined_text
+    
+    return SummaryBackend("🦙 Llama", max_size, None, summarize_chunk, reduce, tokens_per_second=60)
+
+def transformers_backend(params):
+    target_words = params["max_length"]
+    st.info("🦙 Loading local Llama model...")
+    model, tokenizer = get_llama_transformers()
+    if not (model and tokenizer):
+        raise Exception("Failed to load local Llama model")
+    
+    context_length = transformers_context_length(tokenizer, model.config)
+    max_size = chunk_budget(
+        context_length,
+        prompt_tokens=len(tokenizer(transformers_prompt("", target_words))["input_ids"]),
+        output_tokens=min(target_words * 2, context_length // 4)
+    )
+    
+    def summarize_chunk(text, total):
+        return summarize_with_transformers(text, model, tokenizer, target_words // total)
+    
+    def reduce(summaries):
+        return "\n\n".join(dedupe_summaries(summaries))
+    
+    return SummaryBackend("🦙 Local Llama", max_size, tokenizer, summarize_chunk, reduce, tokens_per_second=20)
+
+def distilbart_backend(params):
+    st.info("🔸 Using DistilBART model...")
+    distilbart = get_distilbart_summarizer()
+    # Encoder-decoder: the summary does not share the input context
+    max_size = transformers_context_length(distilbart.tokenizer, distilbart.model.config)
+    
+    def summarize_chunk(text, total):
+        if total == 1:
+            return distilbart(
+                text,
+                max_length=params["max_length"],
+                min_length=params["min_length"],
+                do_sample=False
+            )[0]['summary_text']
+        chunk_max_length = min(200, len(text.split()) // 2)
+        chunk_min_length = min(100, chunk_max_length // 2)
+        return distilbart(
+            text,
+            max_length=chunk_max_length,
+            min_length=chunk_min_length,
+            do_sample=False
+        )[0]['summary_text']
+    
+    def reduce(summaries):
+        if len(summaries) == 1:
+            return summaries[0]
+        combined_summaries = "\n\n".join(dedupe_summaries(summaries))
+        if len(combined_summaries.split()) > params["max_length"] * 1.5:
+            return distilbart(
+                combined_summaries,
+                max_length=params["max_length"],
+                min_length=params["min_length"],
+                do_sample=False
+            )[0]['summary_text']
+        return combined_summaries
+    
+    return SummaryBackend("🔸 DistilBART", max_size, distilbart.tokenizer, summarize_chunk, reduce, tokens_per_second=300)
+
+def distilbart_fallback(params):
+    """DistilBART map step for chunks that were sized for another model"""
+    distilbart = get_distilbart_summarizer()
+    max_size = transformers_context_length(distilbart.tokenizer, distilbart.model.config)
+    
+    def summarize_chunk(text, total):
+        summaries = []
+        for part in chunk_text(text, max_size=max_size, tokenizer=distilbart.tokenizer):
+            summaries.append(distilbart(
+                part,
+                max_length=min(200, len(part.split()) // 2),
+                min_length=50,
+                do_sample=False
+            )[0]['summary_text'])
+        return "\n\n".join(summaries)
     
-    # First pass: count total pages
-    for pdf in pdf_files:
-        reader = PdfReader(pdf)
-        total_pages += len(reader.pages)
+    return summarize_chunk
+
+def summarize_chunks(chunks, backend, fallback=None, pipeline=None):
+    """Summarize (chunk, text, estimated_total) items as they arrive
     
-    # Second pass: extract text with progress
+    If the backend fails, `fallback()` provides the summarize function for
+    that chunk and the rest. Returns (chunk summaries, whether the fallback was used).
+    """
     progress_bar = st.progress(0)
     status_text = st.empty()
-    current_page = 0
+    summarize_chunk = backend.summarize_chunk
+    used_fallback = False
+    summaries = []
+    tokens = 0
+    seconds = 0.0
     
-    for pdf_idx, pdf in enumerate(pdf_files):
-        reader = PdfReader(pdf)
-        status_text.text(f"📖 Processing {pdf.name} ({pdf_idx + 1}/{len(pdf_files)})")
-        
-        for page_num, page in enumerate(reader.pages):
-            page_text = page.extract_text()
-            if page_text:
-                text += f"\n--- Page {page_num + 1} of {pdf.name} ---\n"
-                text += page_text + "\n"
-            
-            current_page += 1
-            progress_bar.progress(current_page / total_pages)
+    for i, (chunk, text, total) in enumerate(chunks):
+        status = f"{backend.label}: processing section {i + 1} of {total} ({chunk.label})"
+        if pipeline is not None and pipeline.extracting:
+            status += f" · 📖 {pipeline.pages_extracted}/{pipeline.total_pages} pages extracted"
+        status_text.text(status)
+        try:
+            started = time.perf_counter()
+            summaries.append(summarize_chunk(text, total))
+            if not used_fallback:
+                seconds += time.perf_counter() - started
+                tokens += estimate_tokens(text)
+        except Exception as e:
+            if fallback is None or used_fallback:
+                raise
+            st.error(f"❌ Summarization failed: {str(e)}")
+            st.info("🔄 Falling back to DistilBART...")
+            summarize_chunk = fallback()
+            used_fallback = True
+            summaries.append(summarize_chunk(text, total))
+        progress_bar.progress(min((i + 1) / total, 1.0))
     
     progress_bar.empty()
     status_text.empty()
-    return text, total_pages
-
-def chunk_text(text, max_tokens=1024):
-    """Split text into chunks for summarization"""
-    # Split by sentences first
-    sentences = re.split(r'(?<=[.!?]) +', text)
-    chunks = []
-    current_chunk = ""
-    
-    for sentence in sentences:
-        # Rough token estimation (1 token ≈ 4 characters)
-        if len(current_chunk) + len(sentence) < max_tokens * 4:
-            current_chunk += sentence + " "
-        else:
-            if current_chunk.strip():
-                chunks.append(current_chunk.strip())
-            current_chunk = sentence + " "
-    
-    if current_chunk.strip():
-        chunks.append(current_chunk.strip())
-    
-    return chunks
+    backend.record_throughput(tokens, seconds)
+    return summaries, used_fallback
 
-def extract_important_sections(text):
+def extract_important_sections(document):
     """Extract important sections while preserving all critical information"""
-    # Split into paragraphs and sentences
-    paragraphs = text.split('\n\n')
-    important_content = []
-    
-    # Keywords that indicate important information
-    important_keywords = [
-        'important', 'critical', 'key', 'significant', 'essential', 'required', 'mandatory',
-        'conclusion', 'result', 'finding', 'recommendation', 'decision', 'action',
-        'number', 'amount', 'date', 'deadline', 'percent', '%', '$', 'cost', 'price',
-        'name', 'contact', 'address', 'phone', 'email', 'reference', 'id', 'code'
-    ]
-    
-    for para in paragraphs:
-        if para.strip():
-            # Check if paragraph contains important keywords or specific data
-            para_lower = para.lower()
-            has_important_info = any(keyword in para_lower for keyword in important_keywords)
-            has_numbers = bool(re.search(r'\d+', para))
-            has_dates = bool(re.search(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b', para))
-            
-            if has_important_info or has_numbers or has_dates or len(para.split()) > 30:
-                important_content.append(para.strip())
-    
-    return important_content
+    # Paragraphs with important keywords, numbers, dates, or enough words of their own
+    return [paragraph.text.strip() for paragraph in SECTION_MATCHER.paragraphs(document.text) if paragraph.important]
 
-def create_comprehensive_summary(text, target_length="medium"):
+def create_comprehensive_summary(document, target_length="medium"):
     """Create comprehensive summary that preserves all important information"""
     
     # For confidential data, we want comprehensive coverage, not aggressive compression
@@ -495,14 +766,14 @@ def create_comprehensive_summary(text, target_length="medium"):
     }
     
     target_info = targets.get(target_length, targets["medium"])
-    words_in_text = len(text.split())
+    words_in_text = document.word_count
     
     # If text is already reasonably sized, don't over-compress
     if words_in_text <= target_info["words"] * 1.5:
-        return text  # Return original if already concise enough
+        return document.text  # Return original if already concise enough
     
     # Extract important sections first
-    important_sections = extract_important_sections(text)
+    important_sections = extract_important_sections(document)
     
     # If we have good section extraction, use it
     if important_sections:
@@ -522,12 +793,11 @@ def create_download_link(text, filename):
     href = f'<a href="data:text/plain;base64,{b64}" download="{filename}" class="download-button">📥 Download Summary</a>'
     return href
 
-def get_text_stats(text):
-    """Calculate text statistics"""
-    words = len(text.split())
-    chars = len(text)
-    sentences = len(re.split(r'[.!?]+', text))
-    return words, chars, sentences
+def get_text_stats(document):
+    """Calculate text statistics (cached on the Document)"""
+    if isinstance(document, str):
+        document = Document.from_text(document)
+    return document.word_count, document.char_count, document.sentence_count
 
 def main():
     # Header
@@ -550,6 +820,21 @@ def main():
             help="Choose how much detail to preserve in your summary"
         )
         
+        page_range = st.text_input(
+            "Page Range (optional)",
+            placeholder="e.g. 1-20, 35",
+            help="Only summarize these pages of each PDF. Leave empty for the whole document."
+        )
+        
+        latency_target = st.slider(
+            "⏱️ Target Time (seconds)",
+            min_value=30,
+            max_value=900,
+            value=min(max(SUMMARY_LATENCY_TARGET, 30), 900),
+            step=30,
+            help="Long documents are cut down to their most important paragraphs so the model finishes in about this time."
+        )
+        
         # Information preservation notice
         st.info("🔒 **Confidential Data Mode**: All important information will be preserved")
         
@@ -597,6 +882,14 @@ def main():
             - ✅ Low memory usage (~400MB)
             - ⚠️ Limited context window (1024 tokens)
             """)
+        elif "TextRank" in selected_model:
+            st.markdown("""
+            **🕸️ TextRank (LexRank)**
+            - ✅ No model download, CPU only
+            - ✅ Time grows linearly with length (about 10-15 s for 50,000 sentences)
+            - ✅ Sentences are quoted verbatim
+            - ⚠️ Extractive: no rephrasing or condensing
+            """)
         elif "Ollama" in selected_model:
             model_name = selected_model.split(": ")[1] if ": " in selected_model else "llama2"
             st.markdown(f"""
@@ -655,7 +948,7 @@ def main():
             
             with st.expander("📋 File Details"):
                 for i, pdf in enumerate(pdf_files, 1):
-                    file_size = len(pdf.getvalue()) / 1024  # Size in KB
+                    file_size = upload_size(pdf) / 1024  # Size in KB
                     st.write(f"{i}. **{pdf.name}** ({file_size:.1f} KB)")
     
     with col2:
@@ -666,200 +959,114 @@ def main():
             if st.button("🚀 Summarize PDFs", type="primary", use_container_width=True):
                 start_time = datetime.now()
                 
-                # Extract text
-                with st.spinner("📖 Extracting text from PDFs..."):
-                    text, total_pages = extract_text_from_pdfs(pdf_files)
-                
-                if not text.strip():
-                    st.error("❌ No text could be extracted from the uploaded PDFs.")
+                try:
+                    documents, total_pages, report = open_documents(pdf_files, page_range)
+                except ValueError as e:
+                    st.error(f"❌ {e}")
                     return
                 
-                # Show extraction stats
-                words, chars, sentences = get_text_stats(text)
-                
-                st.markdown(f"""
-                <div class="stats-container">
-                    <div class="stat-box">
-                        <strong>{total_pages}</strong><br>Pages
-                    </div>
-                    <div class="stat-box">
-                        <strong>{words:,}</strong><br>Words
-                    </div>
-                    <div class="stat-box">
-                        <strong>{sentences}</strong><br>Sentences
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Determine target length
-                target_length = summary_length.split()[0].lower()  # "short", "medium", or "long"
-                
-                # Get selected model
-                selected_model = get_summarizer()
-                
-                # Create comprehensive summary
-                st.info(f"🤖 Creating comprehensive summary with {selected_model.split(':')[0]}...")
-                
-                # First try comprehensive extraction for very short documents
-                comprehensive_summary = create_comprehensive_summary(text, target_length)
-                
-                if comprehensive_summary and len(text.split()) < 1000:
-                    final_summary = comprehensive_summary
-                    st.success("✨ Used intelligent extraction preserving all critical information")
-                else:
-                    # Use selected AI model for summarization
-                    params = length_params[summary_length]
-                    target_words = params["max_length"]
+                # Pages stream through extraction, chunking and the model concurrently
+                page_pipeline = SummaryPipeline(iter_clean_records(documents), total_pages).start()
+                try:
+                    with st.spinner("📖 Extracting text from PDFs..."):
+                        head, extracted = page_pipeline.head(LARGE_DOCUMENT_WORDS)
                     
-                    # For very long documents, extract important sections first
-                    if len(text.split()) > 4000:
-                        st.info("📄 Large document detected, extracting important sections...")
-                        important_sections = extract_important_sections(text)
-                        if important_sections:
-                            text_to_summarize = "\n\n".join(important_sections)
-                            st.info(f"📋 Focusing on {len(important_sections)} important sections")
-                        else:
-                            text_to_summarize = text
-                    else:
-                        text_to_summarize = text
+                    stats_placeholder = st.empty()
+                    document = None
+                    if extracted:
+                        # Small document: everything is extracted already
+                        document = Document.from_pages(head)
+                        show_extraction_report(report)
+                        if document.is_blank():
+                            st.error("❌ No text could be extracted from the uploaded PDFs.")
+                            return
+                        words, chars, sentences = get_text_stats(document)
+                        show_text_stats(stats_placeholder, total_pages, words, sentences)
                     
-                    try:
-                        if "Ollama" in selected_model:
-                            # Use Ollama Llama model
-                            model_name = selected_model.split(": ")[1] if ": " in selected_model else "llama2"
-                            st.info(f"🦙 Using Ollama model: {model_name}")
-                            
-                            # For very long texts, process in chunks
-                            if len(text_to_summarize.split()) > 2000:
-                                chunks = chunk_text(text_to_summarize, max_tokens=1500)  # Larger chunks for Llama
-                                chunk_summaries = []
-                                
-                                progress_bar = st.progress(0)
-                                status_text = st.empty()
-                                
-                                for i, chunk in enumerate(chunks):
-                                    status_text.text(f"🦙 Processing section {i + 1} of {len(chunks)} with Llama...")
-                                    chunk_summary = summarize_with_ollama(chunk, model_name, target_words // len(chunks))
-                                    chunk_summaries.append(chunk_summary)
-                                    progress_bar.progress((i + 1) / len(chunks))
-                                
-                                progress_bar.empty()
-                                status_text.empty()
-                                
-                                # Combine and create final summary
-                                combined_text = "\n\n".join(chunk_summaries)
-                                if len(combined_text.split()) > target_words:
-                                    st.info("🔄 Creating final comprehensive summary...")
-                                    final_summary = summarize_with_ollama(combined_text, model_name, target_words)
-                                else:
-                                    final_summary = combined_text
-                            else:
-                                # Direct summarization for shorter texts
-                                final_summary = summarize_with_ollama(text_to_summarize, model_name, target_words)
-                        
-                        elif "Transformers" in selected_model:
-                            # Use local Llama model via transformers
-                            st.info("🦙 Loading local Llama model...")
-                            model, tokenizer = get_llama_transformers()
-                            
-                            if model and tokenizer:
-                                # Process in chunks for long texts
-                                if len(text_to_summarize.split()) > 1500:
-                                    chunks = chunk_text(text_to_summarize, max_tokens=1000)
-                                    chunk_summaries = []
-                                    
-                                    progress_bar = st.progress(0)
-                                    status_text = st.empty()
-                                    
-                                    for i, chunk in enumerate(chunks):
-                                        status_text.text(f"🦙 Processing section {i + 1} of {len(chunks)} with local Llama...")
-                                        chunk_summary = summarize_with_transformers(chunk, model, tokenizer, target_words // len(chunks))
-                                        chunk_summaries.append(chunk_summary)
-                                        progress_bar.progress((i + 1) / len(chunks))
-                                    
-                                    progress_bar.empty()
-                                    status_text.empty()
-                                    
-                                    final_summary = "\n\n".join(chunk_summaries)
-                                else:
-                                    final_summary = summarize_with_transformers(text_to_summarize, model, tokenizer, target_words)
+                    # Determine target length
+                    target_length = summary_length.split()[0].lower()  # "short", "medium", or "long"
+                    
+                    # Get selected model
+                    selected_model = get_summarizer()
+                    
+                    # Create comprehensive summary
+                    st.info(f"🤖 Creating comprehensive summary with {selected_model.split(':')[0]}...")
+                    
+                    # First try comprehensive extraction for very short documents
+                    comprehensive_summary = create_comprehensive_summary(document, target_length) if document else None
+                    
+                    if comprehensive_summary and words < 1000:
+                        final_summary = comprehensive_summary
+                        st.success("✨ Used intelligent extraction preserving all critical information")
+                    elif "TextRank" in selected_model:
+                        if document is None:
+                            # Ranking needs every sentence, so wait for the remaining pages
+                            with st.spinner("📖 Extracting text from PDFs..."):
+                                document = Document.from_pages(page_pipeline.pages())
+                            show_extraction_report(report)
+                            words, chars, sentences = get_text_stats(document)
+                            show_text_stats(stats_placeholder, total_pages, words, sentences)
+                        with st.spinner("🕸️ Ranking sentences..."):
+                            final_summary = summarize_with_textrank(document, length_params[summary_length]["max_length"])
+                    else:
+                        # Use selected AI model for summarization
+                        params = length_params[summary_length]
+                        # DistilBART takes over if a Llama backend fails
+                        fallback = lambda: distilbart_fallback(params)
+                        try:
+                            if "Ollama" in selected_model:
+                                model_name = selected_model.split(": ")[1] if ": " in selected_model else "llama2"
+                                backend = ollama_backend(model_name, params)
+                            elif "Transformers" in selected_model:
+                                backend = transformers_backend(params)
                             else:
-                                raise Exception("Failed to load local Llama model")
+                                backend, fallback = distilbart_backend(params), None
+                        except Exception as e:
+                            st.error(f"❌ Summarization failed: {str(e)}")
+                            st.info("🔄 Falling back to DistilBART...")
+                            backend, fallback = distilbart_backend(params), None
                         
+                        if document is not None:
+                            chunks = chunk_document(
+                                document, max_size=backend.max_size, tokenizer=backend.tokenizer, overlap=CHUNK_OVERLAP
+                            )
+                            chunk_stream = [(chunk, chunk.text(document), len(chunks)) for chunk in chunks]
                         else:
-                            # Fallback to DistilBART
-                            st.info("🔸 Using DistilBART model...")
-                            distilbart = get_distilbart_summarizer()
-                            
-                            chunks = chunk_text(text_to_summarize, max_tokens=800)
-                            
-                            if len(chunks) == 1:
-                                final_summary = distilbart(
-                                    chunks[0], 
-                                    max_length=params["max_length"], 
-                                    min_length=params["min_length"], 
-                                    do_sample=False
-                                )[0]['summary_text']
-                            else:
-                                progress_bar = st.progress(0)
-                                status_text = st.empty()
-                                
-                                chunk_summaries = []
-                                for i, chunk in enumerate(chunks):
-                                    status_text.text(f"Processing section {i + 1} of {len(chunks)}")
-                                    chunk_max_length = min(200, len(chunk.split()) // 2)
-                                    chunk_min_length = min(100, chunk_max_length // 2)
-                                    
-                                    chunk_summary = distilbart(
-                                        chunk, 
-                                        max_length=chunk_max_length,
-                                        min_length=chunk_min_length, 
-                                        do_sample=False
-                                    )[0]['summary_text']
-                                    chunk_summaries.append(chunk_summary)
-                                    progress_bar.progress((i + 1) / len(chunks))
-                                
-                                progress_bar.empty()
-                                status_text.empty()
-                                
-                                combined_summaries = "\n\n".join(chunk_summaries)
-                                
-                                if len(combined_summaries.split()) > params["max_length"] * 1.5:
-                                    final_summary = distilbart(
-                                        combined_summaries, 
-                                        max_length=params["max_length"], 
-                                        min_length=params["min_length"], 
-                                        do_sample=False
-                                    )[0]['summary_text']
-                                else:
-                                    final_summary = combined_summaries
-                    
-                    except Exception as e:
-                        st.error(f"❌ Summarization failed: {str(e)}")
-                        st.info("🔄 Falling back to DistilBART...")
+                            # Large document: summarize the most important paragraphs the model can
+                            # get through in the target time, while extraction continues
+                            budget = int(backend.throughput * latency_target * MAP_TIME_SHARE)
+                            st.info(
+                                f"📄 Large document detected, summarizing up to {budget:,} tokens of important "
+                                f"sections as pages are extracted (~{backend.throughput:.0f} tokens/s)..."
+                            )
+                            selector = SectionBudget(budget, total_pages, SECTION_MATCHER)
+                            chunker = StreamingChunker(backend.max_size, tokenizer=backend.tokenizer, overlap=CHUNK_OVERLAP)
+                            chunk_stream = page_pipeline.stream_chunks(chunker, select=selector.select)
+                        
+                        summaries, used_fallback = summarize_chunks(
+                            chunk_stream, backend, fallback=fallback, pipeline=page_pipeline
+                        )
                         
-                        # Fallback to DistilBART
-                        distilbart = get_distilbart_summarizer()
-                        chunks = chunk_text(text_to_summarize, max_tokens=800)
+                        if document is None:
+                            show_extraction_report(report)
+                            words, chars, sentences = page_pipeline.words, page_pipeline.chars, page_pipeline.sentences
+                            show_text_stats(stats_placeholder, total_pages, words, sentences)
+                            show_selection_report(selector, latency_target)
                         
-                        if len(chunks) == 1:
-                            final_summary = distilbart(
-                                chunks[0], 
-                                max_length=params["max_length"], 
-                                min_length=params["min_length"], 
-                                do_sample=False
-                            )[0]['summary_text']
+                        if not summaries:
+                            st.error("❌ No text could be extracted from the uploaded PDFs.")
+                            return
+                        if used_fallback:
+                            final_summary = "\n\n".join(dedupe_summaries(summaries))
                         else:
-                            chunk_summaries = []
-                            for chunk in chunks:
-                                chunk_summary = distilbart(
-                                    chunk, 
-                                    max_length=min(200, len(chunk.split()) // 2),
-                                    min_length=50, 
-                                    do_sample=False
-                                )[0]['summary_text']
-                                chunk_summaries.append(chunk_summary)
-                            final_summary = "\n\n".join(chunk_summaries)
+                            try:
+                                final_summary = backend.reduce(summaries)
+                            except Exception as e:
+                                st.error(f"❌ Final summary failed: {str(e)}")
+                                final_summary = "\n\n".join(dedupe_summaries(summaries))
+                finally:
+                    page_pipeline.close()
+                    close_documents(documents)
                 
                 # Processing time
                 end_time = datetime.now()
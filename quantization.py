@@ -0,0 +1,96 @@
+"""
+Dynamic int8 quantization of the summarization models for CPU inference.
+
+On CPU-only nodes DistilBART is the throughput bottleneck. With
+MODEL_QUANTIZE=1 the weights of its linear layers are converted to int8
+(activations are quantized on the fly), which makes generation faster and
+the model about a third of its fp32 size at a small cost in quality;
+benchmark_quantization.py measures both.
+
+Quantizing takes a while, so the quantized weights are saved under
+MODEL_QUANTIZED_DIR, one file per model and torch/transformers version,
+and later starts only rebuild the module structure and load them. GPUs
+keep the fp32 model: dynamic quantization only has CPU kernels.
+"""
+
+import os
+import pickle
+import re
+import tempfile
+import warnings
+
+QUANTIZE_ENABLED = os.environ.get("MODEL_QUANTIZE", "0") == "1"
+QUANTIZED_DIR = os.environ.get(
+    "MODEL_QUANTIZED_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "pdf-summarizer", "quantized")
+)
+
+DISTILBART_MODEL = "sshleifer/distilbart-cnn-12-6"
+
+
+def quantized_model_path(model_name, directory=QUANTIZED_DIR):
+    """Cache file of the int8 weights of `model_name` for the installed library versions"""
+    # Quantized state dicts are not portable across torch/transformers releases
+    import torch
+    import transformers
+    name = re.sub(r"[^\w.-]+", "--", model_name)
+    return os.path.join(directory, f"{name}-int8-torch{torch.__version__}-transformers{transformers.__version__}.pt")
+
+
+def quantize_linear_layers(model):
+    """Copy of `model` with int8 weights in every nn.Linear"""
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_quantized_model(model_name, directory=QUANTIZED_DIR):
+    """int8 seq2seq model for `model_name`, quantized once and then loaded from disk"""
+    import torch
+    from transformers import AutoConfig, AutoModelForSeq2SeqLM
+
+    path = quantized_model_path(model_name, directory)
+    if os.path.exists(path):
+        try:
+            # Same structure as the saved model: quantize an untrained copy, then load the weights
+            model = quantize_linear_layers(AutoModelForSeq2SeqLM.from_config(AutoConfig.from_pretrained(model_name)))
+            # Only this function writes the file, and the packed int8 weights of
+            # quantized layers are not guaranteed to load with weights_only=True (the
+            # default since torch 2.6), which would re-quantize on every start
+            model.load_state_dict(torch.load(path, map_location="cpu", weights_only=False))
+            return model.eval()
+        except (OSError, RuntimeError, pickle.UnpicklingError) as e:
+            # Truncated or stale file: quantize again and overwrite it
+            warnings.warn(f"Could not load quantized weights from {path} ({e}); quantizing again")
+
+    model = quantize_linear_layers(AutoModelForSeq2SeqLM.from_pretrained(model_name).eval())
+    os.makedirs(directory, exist_ok=True)
+    # Write to a temp file and rename so a crash never leaves a partial entry
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            torch.save(model.state_dict(), f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return model
+
+
+def torch_pipeline(model_name=DISTILBART_MODEL, quantize=QUANTIZE_ENABLED):
+    """PyTorch summarization pipeline for `model_name`, int8-quantized on CPU when `quantize` is set"""
+    # torch/transformers are only imported by the backends that need them
+    from transformers import AutoTokenizer, pipeline
+    import torch
+
+    if torch.cuda.is_available():
+        return pipeline("summarization", model=model_name, device=0)
+    if not quantize:
+        return pipeline("summarization", model=model_name, device=-1)
+    return pipeline(
+        "summarization",
+        model=load_quantized_model(model_name),
+        tokenizer=AutoTokenizer.from_pretrained(model_name),
+        device=-1
+    )
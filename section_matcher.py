@@ -0,0 +1,192 @@
+"""
+Single-pass keyword, number and date matching over paragraphs.
+
+The important-section filter used to test every paragraph with one
+substring search per keyword plus two regex searches. SectionMatcher
+compiles the keywords into one regular expression whose alternatives are
+factored by common prefix (a trie), combined with the number pattern, and
+finds every hit of a whole page in one scan; dates are told apart from
+plain numbers only where a digit run contains separators. Pages can be
+scanned independently as they are extracted.
+
+SectionBudget turns the filter into a token-budgeted pre-selection: of
+each page's important paragraphs it keeps the densest in hits that fit
+the page's share of the budget, in their original order.
+"""
+
+import re
+
+from chunking import estimate_tokens
+
+# Paragraphs are separated by blank lines
+PARAGRAPH_BREAK = "\n\n"
+# A paragraph this long is kept even without any hit
+LONG_PARAGRAPH_WORDS = 30
+
+IMPORTANT_KEYWORDS = [
+    'important', 'critical', 'key', 'significant', 'essential', 'required', 'mandatory',
+    'conclusion', 'result', 'finding', 'recommendation', 'decision', 'action',
+    'number', 'amount', 'date', 'deadline', 'percent', '%', '$', 'cost', 'price',
+    'name', 'contact', 'address', 'phone', 'email', 'reference', 'id', 'code'
+]
+
+_DATE = re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}[/-]\d{1,2}[/-]\d{1,2}')
+
+
+def trie_pattern(words):
+    """Regex alternation of `words` with shared prefixes factored out"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return build(trie)
+
+
+class Paragraph:
+    """One paragraph of a scanned text and what the matcher found in it"""
+
+    __slots__ = ("text", "keywords", "numbers", "dates")
+
+    def __init__(self, text):
+        self.text = text
+        self.keywords = 0
+        self.numbers = 0
+        self.dates = 0
+
+    def __repr__(self):
+        return f"Paragraph({self.text[:30]!r}, keywords={self.keywords}, numbers={self.numbers}, dates={self.dates})"
+
+    @property
+    def word_count(self):
+        return len(self.text.split())
+
+    @property
+    def score(self):
+        """Hits per word; dates count double as they are rarely incidental"""
+        return (self.keywords + self.numbers + 2 * self.dates) / max(self.word_count, 1)
+
+    @property
+    def important(self):
+        """Has a keyword, a number or a date, or is long enough to matter on its own"""
+        return bool(self.keywords or self.numbers or self.dates) or self.word_count > LONG_PARAGRAPH_WORDS
+
+
+class SectionMatcher:
+    """Finds all keyword (case-insensitive substring), number and date hits in one scan"""
+
+    def __init__(self, keywords=IMPORTANT_KEYWORDS):
+        keywords = sorted({keyword.lower() for keyword in keywords if keyword})
+        self.pattern = re.compile(
+            r'(?P<number>\d+(?:[/-]\d+[/-]\d+)?)' + (f'|(?P<keyword>{trie_pattern(keywords)})' if keywords else "")
+        )
+
+    def hits(self, text):
+        """Yield (start, end, kind) for every hit; kind is "keyword", "number" or "date"
+
+        Offsets refer to text.lower(), which has the same paragraph breaks.
+        """
+        return self._hits(text.lower())
+
+    def _hits(self, lowered):
+        for match in self.pattern.finditer(lowered):
+            kind = match.lastgroup
+            if kind == "number" and match.end() - match.start() > 4 and _is_date(lowered, match):
+                kind = "date"
+            yield match.start(), match.end(), kind
+
+    def paragraphs(self, text):
+        """The non-blank paragraphs of `text`, each with its hit counts"""
+        lowered = text.lower()
+        # Paragraph starts in the lower-cased text (lower() may change lengths)
+        starts = []
+        offset = 0
+        for part in lowered.split(PARAGRAPH_BREAK):
+            starts.append(offset)
+            offset += len(part) + len(PARAGRAPH_BREAK)
+
+        paragraphs = [Paragraph(original) for original in text.split(PARAGRAPH_BREAK)]
+        index = 0
+        for start, _, kind in self._hits(lowered):
+            while index + 1 < len(starts) and starts[index + 1] <= start:
+                index += 1
+            paragraph = paragraphs[index]
+            if kind == "keyword":
+                paragraph.keywords += 1
+            elif kind == "number":
+                paragraph.numbers += 1
+            else:
+                paragraph.dates += 1
+        return [paragraph for paragraph in paragraphs if paragraph.text.strip()]
+
+
+def _is_date(text, match):
+    """A numeric hit that is a whole d/m/y or y-m-d date (with word boundaries)"""
+    start, end = match.span()
+    if not _DATE.fullmatch(text, start, end):
+        return False
+    before = text[start - 1] if start else " "
+    after = text[end] if end < len(text) else " "
+    return not (before.isalnum() or before == "_") and not (after.isalnum() or after == "_")
+
+
+class SectionBudget:
+    """Token-budgeted selection of important paragraphs, one page at a time
+
+    Each page may use its share (budget / total_pages) plus whatever
+    earlier pages left unused. Within a page the highest-scoring important
+    paragraphs that fit are kept, in page order. With no budget every
+    important paragraph is kept, as extract_important_sections() does.
+    Counters record how much of the input was kept and dropped.
+    """
+
+    def __init__(self, budget_tokens, total_pages, matcher=None, count_tokens=estimate_tokens):
+        self.budget_tokens = budget_tokens
+        self.total_pages = max(total_pages, 1)
+        self.matcher = matcher or SectionMatcher()
+        self.count_tokens = count_tokens
+        self.pages_seen = 0
+        self.total_tokens = 0
+        self.kept_tokens = 0
+        self.total_paragraphs = 0
+        self.kept_paragraphs = 0
+
+    @property
+    def dropped_tokens(self):
+        return self.total_tokens - self.kept_tokens
+
+    @property
+    def dropped_paragraphs(self):
+        return self.total_paragraphs - self.kept_paragraphs
+
+    def select(self, page_text):
+        """The kept paragraphs of one page, joined by blank lines"""
+        self.pages_seen += 1
+        paragraphs = self.matcher.paragraphs(page_text)
+        sizes = [self.count_tokens(paragraph.text) for paragraph in paragraphs]
+        self.total_tokens += sum(sizes)
+        self.total_paragraphs += len(paragraphs)
+
+        candidates = [i for i, paragraph in enumerate(paragraphs) if paragraph.important]
+        if self.budget_tokens:
+            allowance = self.budget_tokens * min(self.pages_seen, self.total_pages) // self.total_pages
+            allowance -= self.kept_tokens
+            kept = set()
+            for i in sorted(candidates, key=lambda i: -paragraphs[i].score):
+                if sizes[i] <= allowance:
+                    kept.add(i)
+                    allowance -= sizes[i]
+            candidates = [i for i in candidates if i in kept]
+
+        self.kept_tokens += sum(sizes[i] for i in candidates)
+        self.kept_paragraphs += len(candidates)
+        return PARAGRAPH_BREAK.join(paragraphs[i].text.strip() for i in candidates)
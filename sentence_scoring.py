@@ -0,0 +1,150 @@
+"""
+Vectorized sentence scoring for the extractive summarizers.
+
+The text is split into sentences and tokenized once into a sparse
+sentence x term matrix, stored as two parallel arrays (the sentence and the
+term of every token). Keyword, phrase and pattern checks then run once per
+vocabulary entry or once over the whole text instead of once per sentence,
+and the per-sentence features come out as NumPy arrays the summarizers
+combine with array arithmetic. top_sentences() picks the best sentences
+with argpartition rather than sorting them all.
+"""
+
+import re
+from bisect import bisect_right
+from collections import Counter
+from itertools import chain
+
+import numpy as np
+
+MIN_SENTENCE_CHARS = 20
+
+_SENTENCE_END = re.compile(r'[.!?]+')
+
+
+class SentenceMatrix:
+    """Sentences of a text and their sparse sentence x term matrix
+
+    `rows[i]` and `cols[i]` are the sentence and the vocabulary index of
+    the i-th token; tokens are the whitespace-separated words of the
+    lower-cased sentences, so a keyword without spaces occurs in a sentence
+    exactly when it is a substring of one of its tokens.
+    """
+
+    def __init__(self, sentences):
+        self.sentences = sentences
+        self.lengths = np.fromiter(map(len, sentences), dtype=np.int64, count=len(sentences))
+        self.lowered = "\n".join(sentences).lower()
+        # Offset of each sentence in `lowered`, for mapping matches back to sentences
+        self.starts = np.zeros(len(sentences), dtype=np.int64)
+        if sentences:
+            np.cumsum(self.lengths[:-1] + 1, out=self.starts[1:])
+        self._start_list = self.starts.tolist()
+
+        token_lists = [sentence.lower().split() for sentence in sentences]
+        tokens = list(chain.from_iterable(token_lists))
+        # Vocabulary in first-seen order; every mapping step runs in C
+        self.terms = list(dict.fromkeys(tokens))
+        term_ids = dict(zip(self.terms, range(len(self.terms))))
+        counts = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        self.rows = np.repeat(np.arange(len(sentences)), counts)
+        self.cols = np.fromiter(map(term_ids.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        self._vocabulary_text = None
+
+    @classmethod
+    def from_text(cls, text, min_chars=MIN_SENTENCE_CHARS):
+        """Split at terminal punctuation, keeping sentences longer than `min_chars`"""
+        sentences = [s.strip() for s in _SENTENCE_END.split(text)]
+        return cls([s for s in sentences if len(s) > min_chars])
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def term_frequencies(self):
+        """Occurrences of each vocabulary term across all sentences"""
+        return np.bincount(self.cols, minlength=len(self.terms))
+
+    def word_frequencies(self, pattern):
+        """Counter of the `pattern` matches in all tokens, found once per distinct term"""
+        pattern = re.compile(pattern)
+        frequencies = Counter()
+        for term, count in zip(self.terms, self.term_frequencies().tolist()):
+            for word in pattern.findall(term):
+                frequencies[word] += count
+        return frequencies
+
+    def term_lengths(self):
+        return np.fromiter(map(len, self.terms), dtype=np.int64, count=len(self.terms))
+
+    def _terms_containing(self, keyword):
+        """Boolean mask of the vocabulary terms that contain `keyword`"""
+        if self._vocabulary_text is None:
+            # All terms in one string, searched at C speed instead of term by term
+            self._vocabulary_text = "\n".join(self.terms)
+            self._vocabulary_offsets = np.zeros(len(self.terms), dtype=np.int64)
+            if self.terms:
+                np.cumsum(self.term_lengths()[:-1] + 1, out=self._vocabulary_offsets[1:])
+        positions = [match.start() for match in re.finditer(re.escape(keyword), self._vocabulary_text)]
+        mask = np.zeros(len(self.terms), dtype=bool)
+        mask[np.searchsorted(self._vocabulary_offsets, positions, side="right") - 1] = True
+        return mask
+
+    def sentences_of(self, positions):
+        """Sentence index of each character offset into `lowered`"""
+        return np.searchsorted(self.starts, positions, side="right") - 1
+
+    def contains(self, keywords):
+        """How many of `keywords` (lower case) each sentence contains as a substring
+
+        Single words are looked up in the vocabulary; phrases with spaces
+        are found with one substring search per containing sentence.
+        """
+        found = np.zeros(len(self.sentences), dtype=np.int64)
+        words = [keyword for keyword in keywords if not any(c.isspace() for c in keyword)]
+        phrases = [keyword for keyword in keywords if keyword not in words]
+        for keyword in words:
+            hit = self.rows[self._terms_containing(keyword)[self.cols]]
+            found[np.unique(hit)] += 1
+        for phrase in phrases:
+            found[self._find_sentences(phrase)] += 1
+        return found
+
+    def _find_sentences(self, phrase):
+        """Sentences containing `phrase`; after a hit the search resumes at the next sentence"""
+        starts = self._start_list
+        hits = []
+        position = self.lowered.find(phrase)
+        while position >= 0:
+            sentence = bisect_right(starts, position) - 1
+            hits.append(sentence)
+            if sentence + 1 == len(starts):
+                break
+            position = self.lowered.find(phrase, starts[sentence + 1])
+        return hits
+
+    def matches(self, pattern):
+        """Boolean array: sentences in which the regex `pattern` matches (lower-cased text)"""
+        pattern = re.compile(pattern)
+        starts = self._start_list
+        hit = np.zeros(len(self.sentences), dtype=bool)
+        match = pattern.search(self.lowered)
+        while match:
+            sentence = bisect_right(starts, match.start()) - 1
+            hit[sentence] = True
+            if sentence + 1 == len(starts):
+                break
+            match = pattern.search(self.lowered, starts[sentence + 1])
+        return hit
+
+
+def top_sentences(scores, k):
+    """Indices of the `k` best scores in document order; ties go to earlier sentences"""
+    scores = np.asarray(scores)
+    if k >= len(scores):
+        return np.arange(len(scores))
+    if k <= 0:
+        return np.arange(0)
+    threshold = scores[np.argpartition(-scores, k - 1)[:k]].min()
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+    return np.sort(np.concatenate([above, ties]))
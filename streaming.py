@@ -0,0 +1,187 @@
+"""
+Streaming extract -> chunk -> summarize pipeline with bounded queues.
+
+Extraction runs on one background thread and chunking on another; the
+caller (the Streamlit script thread, which owns the UI and the model) pulls
+finished chunks and summarizes them while later pages are still being
+extracted. The queues between the stages are bounded, so a slow model
+holds back extraction instead of letting pages and chunks pile up, and
+wall time approaches max(extract, infer) rather than their sum.
+
+Only running statistics of the extracted text are kept, not the text:
+LazyPdfDocument.iter_pages() hands pages on (and writes them to the page
+cache) without memoizing them.
+"""
+
+import os
+import queue
+import threading
+
+from document import sentence_spans
+
+PIPELINE_QUEUE_SIZE = int(os.environ.get("PIPELINE_QUEUE_SIZE", "8"))
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+class SummaryPipeline:
+    """Overlaps extraction, chunking and summarization of a stream of pages
+
+    `records` yields (file_name, page_no, text) and is consumed on a
+    background thread. Call start(), optionally head() to look at the first
+    pages before deciding how to summarize, then either stream_chunks() or
+    pages() to consume the rest. Always close() when done.
+    """
+
+    def __init__(self, records, total_pages, queue_size=PIPELINE_QUEUE_SIZE):
+        self.records = records
+        self.total_pages = total_pages
+        self.queue_size = queue_size
+        self.page_queue = queue.Queue(queue_size)
+        self.chunk_queue = queue.Queue(queue_size)
+        self.words = 0
+        self.chars = 0
+        self.sentences = 0
+        self.pages_extracted = 0
+        self.error = None
+        self._head = []
+        self._exhausted = False
+        self._stop = threading.Event()
+        self._threads = []
+
+    # Stages
+
+    def start(self):
+        self._spawn(self._extract)
+        return self
+
+    def _spawn(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _put(self, target, item):
+        """Put into a bounded queue, giving up if the pipeline is closed"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source):
+        while True:
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return _DONE
+
+    def _extract(self):
+        try:
+            for record in self.records:
+                page_text = record[2]
+                if page_text:
+                    self.words += len(page_text.split())
+                    self.chars += len(page_text)
+                    self.sentences += len(sentence_spans(page_text))
+                self.pages_extracted += 1
+                if not self._put(self.page_queue, record):
+                    return
+        except Exception as e:
+            self.error = e
+        finally:
+            self._put(self.page_queue, _DONE)
+
+    def _chunk(self, chunker, select):
+        pages_chunked = 0
+        chunks_made = 0
+        try:
+            records = self._drain_pages()
+            for file_name, page_no, page_text in records:
+                if select is not None:
+                    page_text = select(page_text)
+                pages_chunked += 1
+                for chunk, chunk_text in chunker.add_page(file_name, page_no, page_text):
+                    chunks_made += 1
+                    # Extrapolate the final chunk count from the pages seen so far
+                    estimate = -(-chunks_made * self.total_pages // pages_chunked)
+                    if not self._put(self.chunk_queue, (chunk, chunk_text, max(estimate, chunks_made + 1))):
+                        return
+            final = chunker.finish()
+            total = chunks_made + len(final)
+            for chunk, chunk_text in final:
+                if not self._put(self.chunk_queue, (chunk, chunk_text, total)):
+                    return
+        except Exception as e:
+            self.error = e
+        finally:
+            self._put(self.chunk_queue, _DONE)
+
+    # Consumers (caller's thread)
+
+    def head(self, min_words):
+        """Read pages until `min_words` words were seen or extraction ended
+
+        Returns (records, finished). The records are still passed on to
+        stream_chunks() or pages() afterwards.
+        """
+        words = 0
+        while words < min_words:
+            record = self._get(self.page_queue)
+            if record is _DONE:
+                self._exhausted = True
+                self._raise_error()
+                return list(self._head), True
+            self._head.append(record)
+            words += len(record[2].split())
+        return list(self._head), False
+
+    def _drain_pages(self):
+        for record in self._head:
+            yield record
+        self._head = []
+        while not self._exhausted:
+            record = self._get(self.page_queue)
+            if record is _DONE:
+                self._exhausted = True
+                return
+            yield record
+
+    def pages(self):
+        """All remaining page records (including any head), on the caller's thread"""
+        records = list(self._drain_pages())
+        self._raise_error()
+        return records
+
+    def stream_chunks(self, chunker, select=None):
+        """Yield (chunk, text, estimated_total_chunks) while extraction continues
+
+        `chunker` is a chunking.StreamingChunker; `select` optionally maps a
+        page's text to the part worth summarizing.
+        """
+        self._spawn(self._chunk, chunker, select)
+        while True:
+            item = self._get(self.chunk_queue)
+            if item is _DONE:
+                break
+            yield item
+        self._raise_error()
+
+    @property
+    def extracting(self):
+        """True while pages are still being extracted"""
+        return bool(self._threads) and self._threads[0].is_alive()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def close(self):
+        """Stop the background stages (they exit at their next queue operation)"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=1)
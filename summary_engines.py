@@ -0,0 +1,122 @@
+"""
+Selectable execution engines for the summarization models.
+
+- pytorch (default): the transformers pipeline, int8-quantized on CPU with
+  MODEL_QUANTIZE=1 (see quantization.py)
+- onnx: the encoder and the decoder (with past key values, so each step
+  only runs the newest token) exported to ONNX and generated with ONNX
+  Runtime on CPU, with all graph optimizations enabled. Needs
+  `pip install optimum[onnxruntime]`.
+
+SUMMARY_ENGINE picks the engine per deployment. Every engine returns a
+pipeline with the same call signature and output ([{"summary_text": ...}])
+and the same .tokenizer and .model.config. The ONNX export runs once per
+model and library version; the files are kept under MODEL_ONNX_DIR.
+"""
+
+import importlib.util
+import os
+import re
+import shutil
+import tempfile
+import warnings
+
+from quantization import DISTILBART_MODEL, QUANTIZE_ENABLED, torch_pipeline
+
+DEFAULT_ENGINE = os.environ.get("SUMMARY_ENGINE", "pytorch")
+ONNX_DIR = os.environ.get(
+    "MODEL_ONNX_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "pdf-summarizer", "onnx")
+)
+
+ENGINES = ("pytorch", "onnx")
+_ONNX_MODULES = ("optimum", "onnxruntime")
+
+
+def onnx_available():
+    """Whether optimum and ONNX Runtime are installed"""
+    return all(importlib.util.find_spec(module) is not None for module in _ONNX_MODULES)
+
+
+def resolve_engine(name=None):
+    """Engine to use for `name` (default: SUMMARY_ENGINE)
+
+    An unknown name raises ValueError. The onnx engine falls back to
+    pytorch with a warning when its libraries are not installed, so a
+    deployment setting never breaks summarization outright.
+    """
+    name = (name or DEFAULT_ENGINE).lower()
+    if name not in ENGINES:
+        raise ValueError(f"Unknown summary engine: {name!r} (choose from {', '.join(ENGINES)})")
+    if name == "onnx" and not onnx_available():
+        warnings.warn("Summary engine 'onnx' needs optimum[onnxruntime]; using pytorch")
+        return "pytorch"
+    return name
+
+
+def onnx_model_dir(model_name, directory=ONNX_DIR):
+    """Export directory of `model_name` for the installed library versions"""
+    # Exported graphs depend on the exporter and the model code that traced them
+    import optimum.version
+    import transformers
+    name = re.sub(r"[^\w.-]+", "--", model_name)
+    return os.path.join(directory, f"{name}-optimum{optimum.version.__version__}-transformers{transformers.__version__}")
+
+
+def export_onnx(model_name, directory=ONNX_DIR):
+    """Export `model_name` to ONNX once; returns the directory with the model and tokenizer"""
+    path = onnx_model_dir(model_name, directory)
+    if os.path.exists(os.path.join(path, "config.json")):
+        return path
+
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+
+    os.makedirs(directory, exist_ok=True)
+    # Export into a temp directory and rename so readers never see a partial export
+    tmp_path = tempfile.mkdtemp(dir=directory, suffix=".tmp")
+    try:
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, use_cache=True)
+        model.save_pretrained(tmp_path)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Another process finished the same export first
+        if not os.path.exists(os.path.join(path, "config.json")):
+            raise
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return path
+
+
+def onnx_pipeline(model_name=DISTILBART_MODEL, directory=ONNX_DIR):
+    """Summarization pipeline running `model_name` on ONNX Runtime (CPU)"""
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from optimum.pipelines import pipeline
+    from transformers import AutoTokenizer
+
+    path = export_onnx(model_name, directory)
+    session_options = onnxruntime.SessionOptions()
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        path,
+        use_cache=True,
+        provider="CPUExecutionProvider",
+        session_options=session_options
+    )
+    # The sessions hold the weights outside torch; the model registry counts the files
+    model.footprint_bytes = sum(
+        entry.stat().st_size for entry in os.scandir(path) if entry.name.endswith((".onnx", ".onnx_data"))
+    )
+    return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(path), accelerator="ort")
+
+
+def summarization_pipeline(model_name=DISTILBART_MODEL, engine=None, quantize=QUANTIZE_ENABLED):
+    """Summarization pipeline for `model_name` on the selected engine
+
+    `quantize` applies to the pytorch engine only.
+    """
+    if resolve_engine(engine) == "onnx":
+        return onnx_pipeline(model_name)
+    return torch_pipeline(model_name, quantize=quantize)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for the FastAPI backend: readiness, warmup retries and uploads
+"""
+
+import asyncio
+import contextlib
+import os
+import re
+import sys
+import tempfile
+import types
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+
+import backend
+from page_cache import PageTextCache
+from test_pdf_extraction import make_pdf
+from warmup import WARMUP_WORDS
+
+
+class WordTokenizer:
+    """Minimal stand-in for a fast tokenizer: one token per word"""
+
+    model_max_length = 200
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+    def __call__(self, texts, add_special_tokens=False, return_offsets_mapping=False):
+        return {"offset_mapping": [
+            [match.span() for match in re.finditer(r"\S+", text)] for text in texts
+        ]}
+
+
+class FakeSummarizer:
+    """Stands in for the DistilBART pipeline; its first `failures` calls fail"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+        self.tokenizer = WordTokenizer()
+        self.model = types.SimpleNamespace(config=types.SimpleNamespace(max_position_embeddings=200))
+
+    def __call__(self, text, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("CUDA out of memory")
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass  # A worker thread, not the event loop
+        else:
+            raise AssertionError("the model ran on the event loop")
+        return [{"summary_text": " ".join(text.split()[:5])}]
+
+
+@contextlib.contextmanager
+def serving(summarizer):
+    """A test client for the app with `summarizer` as its model and a fresh readiness state"""
+    saved = backend.get_summarizer, backend.WARMUP_ENABLED, dict(backend.readiness)
+    backend.get_summarizer = lambda: summarizer
+    backend.WARMUP_ENABLED = True
+    backend.readiness.update(ready=False, failed=False, error=None, attempts=0, warmup=[])
+    try:
+        yield TestClient(backend.app)
+    finally:
+        backend.get_summarizer, backend.WARMUP_ENABLED = saved[:2]
+        backend.readiness.clear()
+        backend.readiness.update(saved[2])
+
+
+def never_give_up():
+    raise AssertionError("the replica gave up")
+
+
+def test_ready_once_the_model_is_warm():
+    """/readyz fails while the model loads and succeeds after the warmup; /healthz always succeeds"""
+    with serving(FakeSummarizer()) as client:
+        response = client.get("/readyz")
+        assert response.status_code == 503 and response.json()["status"] == "warming up"
+        assert client.get("/healthz").json() == {"status": "ok"}
+
+        backend.prepare_models(give_up=never_give_up)
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert len(response.json()["warmup"]) == len(WARMUP_WORDS)
+
+
+def test_failed_warmup_is_retried_then_gives_up():
+    """A transient failure is retried; a persistent one marks the replica failed and stops it"""
+    with serving(FakeSummarizer(failures=1)) as client:
+        backend.prepare_models(attempts=3, backoff=0, give_up=never_give_up)
+        assert client.get("/readyz").status_code == 200
+        assert backend.readiness["attempts"] == 2
+
+    gave_up = []
+    with serving(FakeSummarizer(failures=100)) as client:
+        backend.prepare_models(attempts=2, backoff=0, give_up=lambda: gave_up.append(True))
+        assert gave_up == [True]
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["status"] == "failed" and "out of memory" in response.json()["error"]
+        assert response.json()["attempts"] == 2
+
+
+def test_upload_is_summarized_in_the_threadpool():
+    """Extraction and summarization of an upload run through run_in_threadpool"""
+    offloaded = []
+    run_in_threadpool = backend.run_in_threadpool
+
+    async def recording_run_in_threadpool(function, *args):
+        offloaded.append(function)
+        return await run_in_threadpool(function, *args)
+
+    page_cache = backend.page_cache
+    with tempfile.TemporaryDirectory() as directory, serving(FakeSummarizer()) as client:
+        backend.page_cache = PageTextCache(directory)
+        backend.run_in_threadpool = recording_run_in_threadpool
+        try:
+            pdf = make_pdf(["Revenue grew strongly this quarter", "Costs fell across every region"])
+            response = client.post("/summarize/", files={"file": ("report.pdf", pdf, "application/pdf")})
+            assert response.status_code == 200
+            result = response.json()
+            assert "Revenue" in result["summary"]
+            assert result["sections"][0]["pages"] == [1, 2]
+            assert offloaded == [backend.summarize_upload]
+
+            response = client.post(
+                "/summarize/", params={"pages": "3-1"}, files={"file": ("report.pdf", pdf, "application/pdf")}
+            )
+            assert response.status_code == 400
+        finally:
+            backend.page_cache = page_cache
+            backend.run_in_threadpool = run_in_threadpool
+
+
+if __name__ == "__main__":
+    test_ready_once_the_model_is_warm()
+    test_failed_warmup_is_retried_then_gives_up()
+    test_upload_is_summarized_in_the_threadpool()
+    print("✅ Backend tests passed!")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test script for the tokenizer-driven chunker
+"""
+
+import os
+import re
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from chunking import chunk_document, chunk_spans, chunk_text, dedupe_summaries
+from document import Document
+
+
+class WordTokenizer:
+    """Minimal stand-in for a fast tokenizer: one token per word"""
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+    def __call__(self, texts, add_special_tokens=False, return_offsets_mapping=False):
+        return {"offset_mapping": [
+            [match.span() for match in re.finditer(r"\S+", text)] for text in texts
+        ]}
+
+
+def count_tokens(text):
+    return len(text.split())
+
+
+def test_chunks_fill_but_never_exceed_the_budget():
+    """Sentences are packed up to max_tokens minus special tokens and margin"""
+    text = " ".join(f"Sentence number {i} has six words." for i in range(50))
+    chunks = chunk_text(text, max_size=40, tokenizer=WordTokenizer(), margin=2)
+    assert all(count_tokens(chunk) <= 36 for chunk in chunks)
+    assert all(count_tokens(chunk) == 36 for chunk in chunks[:-1])
+    assert " ".join(chunks) == text
+
+
+def test_long_sentences_are_split_at_token_boundaries():
+    """A sentence longer than the budget is cut between tokens"""
+    text = " ".join(f"word{i}" for i in range(25)) + "."
+    chunks = chunk_text(text, max_size=12, tokenizer=WordTokenizer(), margin=0)
+    assert [count_tokens(chunk) for chunk in chunks] == [10, 10, 5]
+    assert chunks[1].startswith("word10")
+
+
+def test_estimate_without_tokenizer():
+    """Without a tokenizer, about four characters count as one token"""
+    text = "Short one. " * 100
+    chunks = chunk_text(text, max_size=50, margin=0)
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert chunk_text("", max_size=50) == []
+
+
+def test_word_and_char_units_return_offsets():
+    """Spans index the source text; word and char limits are respected"""
+    text = "Alpha beta gamma. Delta epsilon. Zeta eta theta iota kappa lambda mu."
+    spans = chunk_spans(text, max_size=5, unit="words")
+    assert [text[start:end] for start, end in spans] == [
+        "Alpha beta gamma. Delta epsilon.", "Zeta eta theta iota kappa", "lambda mu."
+    ]
+    assert all(end - start <= 40 for start, end in chunk_spans(text, max_size=40, unit="chars"))
+    try:
+        chunk_spans(text, max_size=5, unit="pages")
+    except ValueError:
+        return
+    raise AssertionError("unknown units should be rejected")
+
+
+def test_overlap_repeats_trailing_sentences():
+    """Each chunk starts with the previous chunk's last sentences"""
+    text = " ".join(f"Fact {i} is here." for i in range(20))
+    chunks = chunk_text(text, max_size=16, unit="words", overlap=4)
+    assert all(len(chunk.split()) <= 16 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.startswith(previous.split(". ")[-1].rstrip("."))
+    assert chunks[-1].endswith("Fact 19 is here.")
+
+
+def test_dedupe_drops_sentences_repeated_by_the_neighbour():
+    """Restated sentences go; new material and the first summary stay"""
+    summaries = [
+        "Revenue rose 12 percent in the third quarter. Costs were flat.",
+        "Revenue rose 12 percent in the third quarter of the year. Hiring slowed sharply.",
+        "Hiring slowed sharply.",
+    ]
+    assert dedupe_summaries(summaries) == [
+        "Revenue rose 12 percent in the third quarter. Costs were flat.",
+        "Hiring slowed sharply.",
+    ]
+
+
+def test_dedupe_keeps_lines_and_list_markers():
+    """Markdown bullets and line breaks of model output survive deduplication"""
+    summaries = [
+        "Key points:\n- Revenue rose 12 percent in the third quarter.\n- Costs were flat.",
+        "Key findings:\n\n- Revenue rose 12 percent in the third quarter of the year.\n- Hiring slowed sharply.\n1. Margins improved to 38 percent.",
+    ]
+    assert dedupe_summaries(summaries) == [
+        summaries[0],
+        "Key findings:\n\n- Hiring slowed sharply.\n1. Margins improved to 38 percent.",
+    ]
+
+
+def test_document_chunks_keep_files_apart_and_pages_whole():
+    """Chunks never mix files, keep fitting pages whole and record page spans"""
+    records = [
+        ("a.pdf", 1, "One two three. Four five."),
+        ("a.pdf", 2, "Six seven eight nine."),
+        ("a.pdf", 3, "Ten eleven. Twelve thirteen fourteen."),
+        ("b.pdf", 1, "Other file."),
+    ]
+    document = Document.from_pages(records)
+    chunks = chunk_document(document, max_size=11, unit="words")
+    assert [chunk.label for chunk in chunks] == ["a.pdf p. 1-2", "a.pdf p. 3", "b.pdf p. 1"]
+    assert chunks[0].text(document) == "One two three. Four five.\nSix seven eight nine."
+    assert "---" not in "".join(chunk.text(document) for chunk in chunks)
+
+    split = chunk_document(document, max_size=11, unit="words", whole_pages=False)
+    assert split[0].label == "a.pdf p. 1-3" and split[0].text(document).endswith("Ten eleven.")
+    assert chunk_document("Plain text.", max_size=10, unit="words")[0].label == "text"
+
+
+def test_whole_pages_still_overlap():
+    """Keeping pages whole does not switch off the sliding window: the next chunk repeats the last sentences"""
+    records = [
+        ("a.pdf", 1, "One two three. Four five."),
+        ("a.pdf", 2, "Six seven eight nine."),
+        ("a.pdf", 3, "Ten eleven. Twelve thirteen fourteen."),
+        ("a.pdf", 4, "Fifteen sixteen. Seventeen."),
+    ]
+    document = Document.from_pages(records)
+    chunks = chunk_document(document, max_size=11, unit="words", overlap=4, whole_pages=True)
+    assert [chunk.label for chunk in chunks] == ["a.pdf p. 1-2", "a.pdf p. 2-3", "a.pdf p. 3-4"]
+    assert [chunk.text(document) for chunk in chunks] == [
+        "One two three. Four five.\nSix seven eight nine.",
+        "Six seven eight nine.\nTen eleven. Twelve thirteen fourteen.",
+        "Twelve thirteen fourteen.\nFifteen sixteen. Seventeen.",
+    ]
+
+
+if __name__ == "__main__":
+    test_chunks_fill_but_never_exceed_the_budget()
+    test_long_sentences_are_split_at_token_boundaries()
+    test_estimate_without_tokenizer()
+    test_word_and_char_units_return_offsets()
+    test_overlap_repeats_trailing_sentences()
+    test_dedupe_drops_sentences_repeated_by_the_neighbour()
+    test_dedupe_keeps_lines_and_list_markers()
+    test_document_chunks_keep_files_apart_and_pages_whole()
+    test_whole_pages_still_overlap()
+    print("✅ Chunking tests passed!")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test script for backend context lengths and chunk budgets
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(__file__))
+
+from model_context import chunk_budget, parse_ollama_show, transformers_context_length
+
+
+def test_transformers_context_length():
+    """The smaller of config and tokenizer limits wins; sentinels are ignored"""
+    bart = SimpleNamespace(max_position_embeddings=1024)
+    assert transformers_context_length(SimpleNamespace(model_max_length=1024), bart) == 1024
+    assert transformers_context_length(SimpleNamespace(model_max_length=int(1e30)), bart) == 1024
+    assert transformers_context_length(None, SimpleNamespace(n_positions=2048)) == 2048
+    assert transformers_context_length(None, None, default=512) == 512
+
+
+def test_parse_ollama_show():
+    """num_ctx from the Modelfile beats the trained context, which is capped"""
+    info = {
+        "parameters": "stop \"[INST]\"\nnum_ctx 4096",
+        "model_info": {"llama.context_length": 131072},
+    }
+    assert parse_ollama_show(info) == 4096
+    assert parse_ollama_show({"model_info": {"llama.context_length": 131072}}, max_ctx=8192) == 8192
+    assert parse_ollama_show({}) is None
+
+
+def test_chunk_budget():
+    """Prompt and output are taken out of the context, down to a floor that still fits"""
+    assert chunk_budget(4096, prompt_tokens=150, output_tokens=1000) == 2946
+    # The floor is taken from the output reservation...
+    assert chunk_budget(1024, prompt_tokens=500, output_tokens=400) == 256
+    # ...but never from the prompt: the chunk cannot overflow the context
+    assert chunk_budget(1024, prompt_tokens=900, output_tokens=500) == 124
+    assert chunk_budget(1024, prompt_tokens=1100) == 1
+
+
+if __name__ == "__main__":
+    test_transformers_context_length()
+    test_parse_ollama_show()
+    test_chunk_budget()
+    print("✅ Model context tests passed!")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script for the memory-bounded model registry
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from model_registry import ModelRegistry, model_footprint
+
+
+class FakeTensor:
+    def __init__(self, numel, element_size=4):
+        self._numel = numel
+        self._element_size = element_size
+
+    def numel(self):
+        return self._numel
+
+    def element_size(self):
+        return self._element_size
+
+
+class FakeModel:
+    def __init__(self, *tensors):
+        self.tensors = tensors
+
+    def parameters(self):
+        return iter(self.tensors)
+
+    def buffers(self):
+        return iter(())
+
+
+class FakeQuantizedLinear:
+    """Dynamically quantized layers expose their int8 weight and fp32 bias this way"""
+
+    def __init__(self, weight, bias):
+        self.packed = (weight, bias)
+
+    def _weight_bias(self):
+        return self.packed
+
+
+class FakeQuantizedModel(FakeModel):
+    def __init__(self, layers, *tensors):
+        super().__init__(*tensors)
+        self.layers = layers
+
+    def modules(self):
+        return iter([self, *self.layers])
+
+
+class FakePipeline:
+    def __init__(self, model):
+        self.model = model
+        self.tokenizer = object()
+
+
+def registry(budget):
+    """Registry whose models are plain byte counts"""
+    return ModelRegistry(budget_bytes=budget, footprint=lambda model: model)
+
+
+def test_footprint_counts_parameter_bytes():
+    """Pipelines, bare models and (model, tokenizer) pairs are all measured"""
+    model = FakeModel(FakeTensor(10), FakeTensor(5, element_size=2))
+    assert model_footprint(model) == 50
+    assert model_footprint(FakePipeline(model)) == 50
+    assert model_footprint((model, object())) == 50
+    assert model_footprint(None) == 0
+
+
+def test_footprint_counts_quantized_weights():
+    """int8 weights held outside parameters() are counted at one byte each"""
+    layer = FakeQuantizedLinear(FakeTensor(100, element_size=1), FakeTensor(10))
+    unbiased = FakeQuantizedLinear(FakeTensor(20, element_size=1), None)
+    model = FakeQuantizedModel([layer, unbiased], FakeTensor(5))
+    assert model_footprint(FakePipeline(model)) == 20 + 100 + 40 + 20
+
+
+def test_footprint_reported_by_the_model_wins():
+    """Models whose weights live outside torch report their own size"""
+    model = FakeModel(FakeTensor(10))
+    model.footprint_bytes = 1234
+    assert model_footprint(FakePipeline(model)) == 1234
+
+
+def test_least_recently_used_model_is_evicted():
+    """Loading past the budget unloads the model used longest ago"""
+    models = registry(100)
+    models.get("a", lambda: 40)
+    models.get("b", lambda: 40)
+    models.get("a", lambda: 40)  # "b" is now the least recently used
+    models.get("c", lambda: 40)
+    assert [key for key, _ in models.loaded()] == ["a", "c"]
+    assert models.used_bytes == 80
+    assert (models.loads, models.hits, models.evictions) == (3, 1, 1)
+
+
+def test_evicted_model_is_reloaded_on_demand():
+    """An evicted model is loaded again, making room before the load"""
+    models = registry(100)
+    calls = []
+
+    def load(key):
+        calls.append((key, [name for name, _ in models.loaded()]))
+        return 60
+
+    models.get("a", lambda: load("a"))
+    models.get("b", lambda: load("b"))
+    models.get("a", lambda: load("a"))
+    # The reload of "a" already knew its size and evicted "b" first
+    assert calls[-1] == ("a", [])
+    assert "a" in models and "b" not in models
+
+
+def test_oversized_model_is_kept_alone_and_unlimited_budget():
+    """A model above the budget still loads; a budget of 0 never evicts"""
+    models = registry(100)
+    models.get("a", lambda: 50)
+    models.get("huge", lambda: 500)
+    assert [key for key, _ in models.loaded()] == ["huge"]
+
+    unlimited = registry(0)
+    for key in "abc":
+        unlimited.get(key, lambda: 500)
+    assert len(unlimited) == 3
+
+
+def test_failed_load_is_not_cached():
+    """A loader that raises leaves nothing behind and can be retried"""
+    models = registry(100)
+
+    def broken():
+        raise OSError("download failed")
+    try:
+        models.get("a", broken)
+    except OSError:
+        pass
+    assert "a" not in models
+    assert models.get("a", lambda: 10) == 10
+
+
+if __name__ == "__main__":
+    test_footprint_counts_parameter_bytes()
+    test_footprint_counts_quantized_weights()
+    test_footprint_reported_by_the_model_wins()
+    test_least_recently_used_model_is_evicted()
+    test_evicted_model_is_reloaded_on_demand()
+    test_oversized_model_is_kept_alone_and_unlimited_budget()
+    test_failed_load_is_not_cached()
+    print("✅ Model registry tests passed!")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk page text cache
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from page_cache import PageTextCache, file_digest
+
+
+def test_round_trip():
+    """Cached pages come back identical, including empty and non-ASCII pages"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PageTextCache(cache_dir)
+        pages = ["First page", "", "Résumé – 25% growth"]
+        key = file_digest(b"%PDF-1.4 example")
+
+        assert cache.get(key) is None
+        cache.put(key, pages)
+        cached = cache.get(key)
+        assert len(cached) == 3
+        assert list(cached) == pages
+        assert cached[-1] == pages[-1]
+
+
+def test_lru_eviction():
+    """Least recently used entries are evicted once the budget is exceeded"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PageTextCache(cache_dir, max_bytes=2500)
+        page = "x" * 1000
+        cache.put("a", [page])
+        time.sleep(0.01)
+        cache.put("b", [page])
+        time.sleep(0.01)
+        assert cache.get("a") is not None  # touch "a" so "b" becomes the oldest
+        time.sleep(0.01)
+        cache.put("c", [page])
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+
+def test_file_digest_sources_agree():
+    """Paths, bytes and file objects of the same content share one key"""
+    data = b"%PDF-1.4 " + os.urandom(4096)
+    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+        tmp.write(data)
+    try:
+        with open(tmp.name, "rb") as f:
+            assert file_digest(tmp.name) == file_digest(data) == file_digest(f)
+    finally:
+        os.remove(tmp.name)
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_lru_eviction()
+    test_file_digest_sources_agree()
+    print("✅ Page cache tests passed!")
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared PDF extraction engine
+"""
+
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+import pdf_extraction
+from extraction_sandbox import SandboxPool
+from page_cache import PageTextCache
+
+
+def make_pdf(page_texts):
+    """Build an in-memory PDF with one line of Helvetica text per page
+
+    A None entry becomes an image-only page (a 1x1 image, no fonts).
+    """
+    writer = PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    for page_text in page_texts:
+        page = PageObject.create_blank_page(width=612, height=792)
+        if page_text is None:
+            image = DecodedStreamObject()
+            image.set_data(b"\x00\x00\x00")
+            image.update({
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(1),
+                NameObject("/Height"): NumberObject(1),
+                NameObject("/ColorSpace"): NameObject("/DeviceRGB"),
+                NameObject("/BitsPerComponent"): NumberObject(8),
+            })
+            content = DecodedStreamObject()
+            content.set_data(b"q 612 0 0 792 0 0 cm /Im1 Do Q")
+            page[NameObject("/Contents")] = content
+            page[NameObject("/Resources")] = DictionaryObject({
+                NameObject("/XObject"): DictionaryObject({NameObject("/Im1"): writer._add_object(image)})
+            })
+        elif page_text:
+            content = DecodedStreamObject()
+            content.set_data(f"BT /F1 12 Tf 72 720 Td ({page_text}) Tj ET".encode())
+            page[NameObject("/Contents")] = content
+            page[NameObject("/Resources")] = DictionaryObject({
+                NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})
+            })
+        writer.add_page(page)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_split_page_range():
+    """Ranges are contiguous, cover every page and respect the minimum size"""
+    ranges = pdf_extraction.split_page_range(100, 8, min_size=8)
+    assert ranges[0][0] == 0 and ranges[-1][1] == 100
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert pdf_extraction.split_page_range(5, 8, min_size=8) == [(0, 5)]
+
+
+def test_extract_pages_serial():
+    """Small documents keep page order and report empty pages as ''"""
+    pdf_bytes = make_pdf(["First page", "", "Third page"])
+    pages = pdf_extraction.extract_pages(pdf_bytes)
+    assert len(pages) == 3
+    assert "First page" in pages[0]
+    assert pages[1] == ""
+    assert "Third page" in pages[2]
+
+
+def test_extract_pages_parallel_matches_serial():
+    """The process pool returns the same pages, in the same order, as a serial pass"""
+    pdf_bytes = make_pdf([f"Page number {i}" for i in range(40)])
+    old_settings = (pdf_extraction.MAX_WORKERS, pdf_extraction.PARALLEL_MIN_PAGES,
+                    pdf_extraction.SANDBOX_ENABLED)
+    pdf_extraction.SANDBOX_ENABLED = False
+    try:
+        serial = pdf_extraction.extract_pages(pdf_bytes)
+        pdf_extraction.MAX_WORKERS, pdf_extraction.PARALLEL_MIN_PAGES = 2, 1
+        parallel = pdf_extraction.extract_pages(pdf_bytes)
+    finally:
+        pdf_extraction.shutdown_executor()
+        (pdf_extraction.MAX_WORKERS, pdf_extraction.PARALLEL_MIN_PAGES,
+         pdf_extraction.SANDBOX_ENABLED) = old_settings
+
+    assert parallel == serial
+    assert "Page number 39" in parallel[39]
+
+
+def test_sandbox_matches_in_process_extraction():
+    """Supervised workers return the same pages and report nothing for a clean PDF"""
+    pdf_bytes = make_pdf([f"Sandboxed page {i}" for i in range(5)])
+    old_enabled = pdf_extraction.SANDBOX_ENABLED
+    try:
+        pdf_extraction.SANDBOX_ENABLED = False
+        in_process = pdf_extraction.extract_pages(pdf_bytes)
+        pdf_extraction.SANDBOX_ENABLED = True
+        report = pdf_extraction.ExtractionReport()
+        sandboxed = pdf_extraction.extract_pages(pdf_bytes, report=report)
+    finally:
+        pdf_extraction.SANDBOX_ENABLED = old_enabled
+
+    assert sandboxed == in_process
+    assert report.skipped == []
+
+
+def test_sandbox_streams_pages_and_stops_when_closed():
+    """The first page arrives before the rest are extracted; closing stops the worker's group"""
+    pool = SandboxPool(1, page_timeout=30)
+    worker = pool._idle.get()
+    requested = []
+    release = threading.Event()
+    call = worker.call
+
+    def gated_call(message, timeout):
+        if message[0] == "page":
+            requested.append(message[1])
+            if message[1] > 0:
+                release.wait(10)
+        return call(message, timeout)
+
+    worker.call = gated_call
+    pool._idle.put(worker)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(make_pdf(["One", "Two", "Three", "Four"]))
+    try:
+        pages = pool.run(tmp.name, "pypdf2", [[0, 1, 2, 3]])
+        start = time.perf_counter()
+        kind, page_text, failure = next(pages)
+        assert "One" in page_text and failure is None
+        assert time.perf_counter() - start < 5  # Not held back until page 2 is released
+        pages.close()
+        release.set()
+        worker = pool._idle.get(timeout=10)  # The group hands its worker back after the page in flight
+        pool._idle.put(worker)
+        assert requested == [0, 1]
+    finally:
+        pool.shutdown()
+        os.remove(tmp.name)
+
+
+def test_page_budget_skips_and_reports():
+    """Pages past PDF_MAX_PAGES come back empty and are listed in the report"""
+    pdf_bytes = make_pdf(["One", "Two", "Three"])
+    old_budget = pdf_extraction.MAX_PAGES_PER_DOCUMENT
+    pdf_extraction.MAX_PAGES_PER_DOCUMENT = 2
+    try:
+        report = pdf_extraction.ExtractionReport()
+        pages = pdf_extraction.extract_pages(pdf_bytes, report=report)
+    finally:
+        pdf_extraction.MAX_PAGES_PER_DOCUMENT = old_budget
+
+    assert "Two" in pages[1] and pages[2] == ""
+    assert [page_no for _, page_no, _ in report.skipped] == [3]
+
+
+def test_parse_page_range():
+    """Specs are 1-based and inclusive; open ends and overflow are clipped"""
+    assert pdf_extraction.parse_page_range("1-3, 5, 9-", 10) == [0, 1, 2, 4, 8, 9]
+    assert pdf_extraction.parse_page_range("", 3) == [0, 1, 2]
+    assert pdf_extraction.parse_page_range("2-100", 4) == [1, 2, 3]
+    for bad in ["x", "0-2", "5-3"]:
+        try:
+            pdf_extraction.parse_page_range(bad, 10)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} should be rejected")
+
+
+def test_lazy_document_extracts_only_requested_pages():
+    """Pages are extracted on first access and never for skipped pages"""
+    document = pdf_extraction.LazyPdfDocument(make_pdf(["One", "Two", "Three", "Four"]))
+    assert len(document) == 4
+    assert "Three" in document[2]
+    assert [page_no for page_no, _ in document.iter_pages([1, 2])] == [2, 3]
+    assert sorted(document._kinds) == [1, 2]
+
+
+def test_image_only_and_empty_pages_are_classified():
+    """Scanned and blank pages are reported without running text extraction"""
+    data = make_pdf(["Hello", "", None])
+    report = pdf_extraction.ExtractionReport()
+    pages = pdf_extraction.extract_pages(data, report=report)
+    assert "Hello" in pages[0]
+    assert pages[1:] == ["", ""]
+    assert [page_no for _, page_no in report.image_only] == [3]
+    assert report.empty_pages == 1
+
+
+class ParentMustNotParse:
+    """The default backend, but opening a document in the test process fails"""
+
+    name = "pypdf2"
+
+    def open(self, source):
+        raise AssertionError("the parent process parsed the PDF")
+
+
+def test_sandboxed_document_is_never_parsed_in_the_parent():
+    """Page counts and pages come from sandbox workers only"""
+    pdf_bytes = make_pdf(["One", "Two", "Three"])
+    old_enabled = pdf_extraction.SANDBOX_ENABLED
+    pdf_extraction.SANDBOX_ENABLED = True
+    try:
+        document = pdf_extraction.LazyPdfDocument(pdf_bytes, backend=ParentMustNotParse())
+        assert len(document) == 3
+        pages = [page_text for _, page_text in document.iter_pages()]
+    finally:
+        pdf_extraction.SANDBOX_ENABLED = old_enabled
+    assert "Three" in pages[2]
+
+
+def test_same_file_name_does_not_block_caching():
+    """A skipped page of another upload with the same name does not stop caching"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = PageTextCache(directory)
+        report = pdf_extraction.ExtractionReport()
+        report.skip("report.pdf", 1, "timed out after 30s")  # An earlier upload named the same
+        upload = io.BytesIO(make_pdf(["One", "Two"]))
+        upload.name = "report.pdf"
+        document = pdf_extraction.LazyPdfDocument(upload, cache=cache, report=report)
+        list(document.iter_pages())
+        assert cache.get(document.cache_key) is not None
+
+
+def test_streamed_pages_are_cached_without_being_kept():
+    """A full pass writes the cache entry page by page; an abandoned pass leaves nothing behind"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = PageTextCache(directory)
+        document = pdf_extraction.LazyPdfDocument(make_pdf(["One", "Two", "Three"]), cache=cache)
+        pages = [page_text for _, page_text in document.iter_pages()]
+        assert document._texts == {}
+        assert list(cache.get(document.cache_key)) == pages
+        assert list(document.iter_pages()) == [(1, pages[0]), (2, pages[1]), (3, pages[2])]
+
+        abandoned = pdf_extraction.LazyPdfDocument(make_pdf(["Four", "Five"]), cache=cache)
+        stream = abandoned.iter_pages()
+        next(stream)
+        stream.close()
+        assert cache.get(abandoned.cache_key) is None
+        assert len(os.listdir(directory)) == 1
+
+
+def test_upload_is_spilled_once_per_document():
+    """The page count and every page read share one temp copy, removed on close"""
+    spill = pdf_extraction._spill
+    spilled = []
+
+    def counting_spill(source):
+        spilled.append(spill(source))
+        return spilled[-1]
+
+    old_enabled = pdf_extraction.SANDBOX_ENABLED
+    pdf_extraction.SANDBOX_ENABLED = True
+    pdf_extraction._spill = counting_spill
+    try:
+        with pdf_extraction.LazyPdfDocument(io.BytesIO(make_pdf(["One", "Two", "Three"]))) as document:
+            assert len(document) == 3
+            assert "Two" in document.page_text(1)
+            assert "Three" in document.page_text(2)
+            assert len(list(document.iter_pages())) == 3
+            assert len(spilled) == 1 and os.path.exists(spilled[0])
+    finally:
+        pdf_extraction._spill = spill
+        pdf_extraction.SANDBOX_ENABLED = old_enabled
+    assert not os.path.exists(spilled[0])
+
+
+if __name__ == "__main__":
+    test_split_page_range()
+    test_extract_pages_serial()
+    test_extract_pages_parallel_matches_serial()
+    test_parse_page_range()
+    test_lazy_document_extracts_only_requested_pages()
+    test_sandbox_matches_in_process_extraction()
+    test_sandbox_streams_pages_and_stops_when_closed()
+    test_page_budget_skips_and_reports()
+    test_image_only_and_empty_pages_are_classified()
+    test_sandboxed_document_is_never_parsed_in_the_parent()
+    test_same_file_name_does_not_block_caching()
+    test_streamed_pages_are_cached_without_being_kept()
+    test_upload_is_spilled_once_per_document()
+    print("✅ PDF extraction tests passed!")
+
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk cache of int8 quantized weights
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import types
+import warnings
+sys.path.append(os.path.dirname(__file__))
+
+from fake_modules import installed_modules
+from quantization import load_quantized_model, quantized_model_path
+
+MODEL = "org/tiny-model"
+
+
+class FakeModel:
+    """Stands in for a seq2seq model: its weights are a plain dict"""
+
+    def __init__(self, weights):
+        self.weights = dict(weights)
+        self.quantized = False
+
+    def state_dict(self):
+        return dict(self.weights)
+
+    def load_state_dict(self, state):
+        if state.keys() != self.weights.keys():
+            raise RuntimeError("Error(s) in loading state_dict")
+        self.weights = dict(state)
+
+    def eval(self):
+        return self
+
+
+class FakeLibraries:
+    """torch and transformers stand-ins that count pretrained loads and quantizations"""
+
+    def __init__(self, weights):
+        self.weights = weights
+        self.pretrained_loads = 0
+        self.quantizations = 0
+
+        torch = types.ModuleType("torch")
+        torch.__version__ = "2.0"
+        torch.qint8 = "qint8"
+        torch.nn = types.SimpleNamespace(Linear=object)
+        torch.quantization = types.SimpleNamespace(quantize_dynamic=self.quantize_dynamic)
+        torch.save = lambda obj, f: pickle.dump(obj, f)
+        torch.load = self.load
+
+        transformers = types.ModuleType("transformers")
+        transformers.__version__ = "4.0"
+        transformers.AutoConfig = types.SimpleNamespace(from_pretrained=lambda name: name)
+        transformers.AutoModelForSeq2SeqLM = types.SimpleNamespace(
+            from_config=lambda config: FakeModel({key: 0 for key in self.weights}),
+            from_pretrained=self.from_pretrained
+        )
+        self.modules = {"torch": torch, "transformers": transformers}
+
+    def from_pretrained(self, name):
+        self.pretrained_loads += 1
+        return FakeModel(self.weights)
+
+    def quantize_dynamic(self, model, layers, dtype):
+        self.quantizations += 1
+        model.quantized = True
+        return model
+
+    @staticmethod
+    def load(path, map_location=None, weights_only=None):
+        # torch 2.6 defaults to weights_only=True; the cache must not depend on the default
+        assert weights_only is not None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def installed(self):
+        return installed_modules(self.modules)
+
+
+def test_quantized_weights_are_saved_once_and_reused():
+    """The first load quantizes and saves; later loads read the file instead of the pretrained model"""
+    libraries = FakeLibraries({"encoder.weight": 1, "decoder.weight": 2})
+    with libraries.installed(), tempfile.TemporaryDirectory() as directory, warnings.catch_warnings():
+        warnings.simplefilter("error")
+        model = load_quantized_model(MODEL, directory)
+        assert model.quantized and libraries.pretrained_loads == 1
+        path = quantized_model_path(MODEL, directory)
+        # Written through a temp file that is renamed into place
+        assert os.listdir(directory) == [os.path.basename(path)]
+
+        model = load_quantized_model(MODEL, directory)
+        assert libraries.pretrained_loads == 1
+        assert model.quantized and model.weights == {"encoder.weight": 1, "decoder.weight": 2}
+
+
+def test_stale_or_truncated_weights_are_quantized_again():
+    """A file from another model layout or a partial write is replaced, not trusted"""
+    libraries = FakeLibraries({"encoder.weight": 1})
+    with libraries.installed(), tempfile.TemporaryDirectory() as directory:
+        path = quantized_model_path(MODEL, directory)
+        for stale in (pickle.dumps({"old.weight": 7}), b"truncated"):
+            with open(path, "wb") as f:
+                f.write(stale)
+            loads = libraries.pretrained_loads
+
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                model = load_quantized_model(MODEL, directory)
+            assert any("quantizing again" in str(warning.message) for warning in caught)
+            assert libraries.pretrained_loads == loads + 1
+            assert model.weights == {"encoder.weight": 1}
+            with open(path, "rb") as f:
+                assert pickle.load(f) == {"encoder.weight": 1}
+            assert os.listdir(directory) == [os.path.basename(path)]
+
+
+if __name__ == "__main__":
+    test_quantized_weights_are_saved_once_and_reused()
+    test_stale_or_truncated_weights_are_quantized_again()
+    print("✅ Quantization tests passed!")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass important-section matcher
+"""
+
+import os
+import re
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from section_matcher import IMPORTANT_KEYWORDS, SectionBudget, SectionMatcher, trie_pattern
+
+
+def reference_important(text):
+    """The per-paragraph keyword loop and regex searches the matcher replaces"""
+    kept = []
+    for para in text.split('\n\n'):
+        if para.strip():
+            para_lower = para.lower()
+            if (any(keyword in para_lower for keyword in IMPORTANT_KEYWORDS)
+                    or re.search(r'\d+', para)
+                    or re.search(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b', para)
+                    or len(para.split()) > 30):
+                kept.append(para.strip())
+    return kept
+
+
+def test_trie_pattern_matches_exactly_the_words():
+    """The factored alternation accepts each word, including prefixes of others"""
+    pattern = re.compile(trie_pattern(["cost", "code", "co", "$", "key"]))
+    for word in ["cost", "code", "co", "$", "key"]:
+        assert pattern.fullmatch(word)
+    assert not pattern.fullmatch("cod")
+
+
+def test_hits_classify_keywords_numbers_and_dates():
+    """Each hit is reported with its kind; dates need a whole d/m/y or y-m-d run"""
+    matcher = SectionMatcher()
+    kinds = [kind for _, _, kind in matcher.hits("Due 12/05/2024, KEY cost 555-123-4567 on 2024-01-05")]
+    assert kinds == ["date", "keyword", "keyword", "number", "date"]
+
+
+def test_paragraph_counts_and_importance_match_the_old_filter():
+    """Hits are attributed to the right paragraph and the kept set is unchanged"""
+    matcher = SectionMatcher()
+    text = "Due 12/05/2024.\n\nPlain words here.\n\n\n\nThe Monkey spoke.\n\n" + "word " * 31
+    paragraphs = matcher.paragraphs(text)
+    assert [(p.keywords, p.numbers, p.dates) for p in paragraphs] == [(0, 0, 1), (0, 0, 0), (1, 0, 0), (0, 0, 0)]
+    assert [p.text.strip() for p in paragraphs if p.important] == reference_important(text)
+
+    samples = ["İstanbul KEY", "said 7", "alpha\n\nbeta gamma", "$ only", "no hits at all", "x12/05/2024"]
+    for sample in samples:
+        kept = [p.text.strip() for p in matcher.paragraphs(sample) if p.important]
+        assert kept == reference_important(sample), sample
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def test_budget_keeps_densest_paragraphs_in_order():
+    """Each page keeps its best paragraphs within its share, carrying unused budget on"""
+    page = "Cost rose 5% in 2023.\n\nThe meeting was long and nothing was decided there.\n\nKey date 12/05/2024."
+    selector = SectionBudget(16, total_pages=2, count_tokens=count_words)
+    first = selector.select(page)
+    assert first == "Cost rose 5% in 2023.\n\nKey date 12/05/2024."
+    assert selector.kept_tokens == 8 and selector.total_paragraphs == 3
+
+    # The second page gets its own 8 tokens; the 10-word paragraph never fits
+    second = selector.select("Nothing at all here.\n\n" + "Important " * 10)
+    assert second == ""
+    assert selector.dropped_paragraphs == 3 and selector.dropped_tokens == 9 + 4 + 10
+
+
+def test_no_budget_keeps_every_important_paragraph():
+    """Without a budget the selection equals the plain important-section filter"""
+    text = "Due 12/05/2024.\n\nPlain words here.\n\nThe Monkey spoke."
+    selector = SectionBudget(0, total_pages=1)
+    assert selector.select(text).split("\n\n") == reference_important(text)
+
+
+if __name__ == "__main__":
+    test_trie_pattern_matches_exactly_the_words()
+    test_hits_classify_keywords_numbers_and_dates()
+    test_paragraph_counts_and_importance_match_the_old_filter()
+    test_budget_keeps_densest_paragraphs_in_order()
+    test_no_budget_keeps_every_important_paragraph()
+    print("✅ Section matcher tests passed!")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized sentence scoring engine
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+from sentence_scoring import SentenceMatrix, top_sentences
+
+
+def sample_matrix():
+    return SentenceMatrix.from_text(
+        "The key results show revenue grew 12% this year. "
+        "Short one. "
+        "Nothing else remains in this particular line of text! "
+        "As a result the main\nfinding is clear to everyone here? "
+        "Table 4 lists the quarterly figures for every region."
+    )
+
+
+def test_sentences_split_like_the_apps():
+    """Sentences end at terminal punctuation and fragments of 20 characters or fewer are dropped"""
+    matrix = sample_matrix()
+    assert len(matrix) == 4
+    assert matrix.sentences[0] == "The key results show revenue grew 12% this year"
+    assert list(matrix.lengths) == [len(sentence) for sentence in matrix.sentences]
+
+
+def test_contains_counts_substrings_per_sentence():
+    """Keywords match inside words, phrases match across tokens, each counts once"""
+    matrix = sample_matrix()
+    assert list(matrix.contains(["main"])) == [0, 1, 1, 0]  # "remains" contains "main"
+    assert list(matrix.contains(["results show", "as a result"])) == [1, 0, 1, 0]
+    assert list(matrix.contains(["the", "key", "key"])) == [3, 0, 1, 1]
+
+
+def test_matches_and_word_frequencies():
+    """Regex features map back to sentences; word counts come from the tokens"""
+    matrix = sample_matrix()
+    assert list(matrix.matches(r'\d+%|table \d+')) == [True, False, False, True]
+    frequencies = matrix.word_frequencies(r'\b[a-z]{4,}\b')
+    assert frequencies["results"] == 1 and frequencies["text"] == 1 and "the" not in frequencies
+
+
+def test_top_sentences_prefers_earlier_ties_and_keeps_order():
+    """argpartition selection matches a stable sort by score"""
+    scores = np.array([1, 3, 2, 3, 0, 2, 3])
+    assert list(top_sentences(scores, 2)) == [1, 3]
+    assert list(top_sentences(scores, 4)) == [1, 2, 3, 6]
+    assert list(top_sentences(scores, 10)) == list(range(7))
+
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        scores = rng.integers(0, 5, size=40)
+        expected = sorted(sorted(range(40), key=lambda i: -scores[i])[:7])
+        assert list(top_sentences(scores, 7)) == expected
+
+
+if __name__ == "__main__":
+    test_sentences_split_like_the_apps()
+    test_contains_counts_substrings_per_sentence()
+    test_matches_and_word_frequencies()
+    test_top_sentences_prefers_earlier_ties_and_keeps_order()
+    print("✅ Sentence scoring tests passed!")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming extract -> chunk -> summarize pipeline
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from chunking import StreamingChunker, chunk_document
+from document import Document
+from streaming import SummaryPipeline
+from text_cleanup import StreamingCleaner, clean_records
+
+
+def sample_records():
+    records = []
+    for file_name, pages in (("a.pdf", 7), ("b.pdf", 4)):
+        for page_no in range(1, pages + 1):
+            body = " ".join(f"Fact {page_no}{i} about {file_name} matters." for i in range(page_no))
+            records.append((file_name, page_no, f"ACME Corp Confidential\n{body}\nPage {page_no} of {pages}"))
+    return records
+
+
+def test_streaming_chunker_matches_chunk_document():
+    """Pages fed one at a time give the same chunks as the whole document"""
+    records = sample_records()
+    document = Document.from_pages(records)
+    expected = chunk_document(document, max_size=30, unit="words", overlap=5)
+
+    chunker = StreamingChunker(max_size=30, unit="words", overlap=5)
+    streamed = []
+    for record in records:
+        streamed.extend(chunker.add_page(*record))
+    streamed.extend(chunker.finish())
+
+    assert [chunk.label for chunk, _ in streamed] == [chunk.label for chunk in expected]
+    assert [text for _, text in streamed] == [chunk.text(document) for chunk in expected]
+
+
+def test_pipeline_streams_chunks_with_estimates():
+    """Chunks arrive in order with a running estimate that ends exact"""
+    records = sample_records()
+    pipeline = SummaryPipeline(iter(records), total_pages=len(records), queue_size=2).start()
+    try:
+        head, finished = pipeline.head(min_words=10)
+        assert not finished and head[0] == records[0]
+        items = list(pipeline.stream_chunks(StreamingChunker(max_size=30, unit="words")))
+    finally:
+        pipeline.close()
+
+    expected = chunk_document(Document.from_pages(records), max_size=30, unit="words")
+    assert [chunk.label for chunk, _, _ in items] == [chunk.label for chunk in expected]
+    assert items[-1][2] == len(expected)
+    assert pipeline.pages_extracted == len(records)
+    assert pipeline.words == sum(len(text.split()) for _, _, text in records)
+
+
+def test_pipeline_head_reports_small_documents_as_finished():
+    """A document shorter than the head size is fully available up front"""
+    records = sample_records()[:2]
+    pipeline = SummaryPipeline(iter(records), total_pages=2).start()
+    try:
+        head, finished = pipeline.head(min_words=10000)
+        assert finished and head == records
+        assert pipeline.pages() == records
+    finally:
+        pipeline.close()
+
+
+def test_pipeline_propagates_extraction_errors():
+    """An error on the extraction thread is raised on the caller's thread"""
+    def broken_records():
+        yield ("a.pdf", 1, "Fine page.")
+        raise ValueError("damaged page")
+
+    pipeline = SummaryPipeline(broken_records(), total_pages=2).start()
+    try:
+        pipeline.pages()
+    except ValueError as e:
+        assert "damaged" in str(e)
+    else:
+        raise AssertionError("extraction error was swallowed")
+    finally:
+        pipeline.close()
+
+
+def test_streaming_cleaner_matches_clean_records():
+    """Files shorter than the sample are cleaned exactly like clean_records()"""
+    records = sample_records()
+    cleaner = StreamingCleaner(sample_pages=16)
+    streamed = []
+    for record in records:
+        streamed.extend(cleaner.add(record))
+    streamed.extend(cleaner.finish())
+    assert streamed == clean_records(records)
+    assert not any("Confidential" in text for _, _, text in streamed)
+
+
+if __name__ == "__main__":
+    test_streaming_chunker_matches_chunk_document()
+    test_pipeline_streams_chunks_with_estimates()
+    test_pipeline_head_reports_small_documents_as_finished()
+    test_pipeline_propagates_extraction_errors()
+    test_streaming_cleaner_matches_clean_records()
+    print("✅ Streaming tests passed!")
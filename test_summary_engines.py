@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test script for summary engine selection
+"""
+
+import json
+import os
+import sys
+import tempfile
+import types
+import warnings
+sys.path.append(os.path.dirname(__file__))
+
+import summary_engines
+from fake_modules import installed_modules
+from summary_engines import export_onnx, onnx_model_dir, resolve_engine
+
+MODEL = "org/tiny-model"
+
+
+class FakeExporter:
+    """optimum and transformers stand-ins that count exports
+
+    `during_save` runs while the export is written, e.g. to finish a
+    competing export of the same model first.
+    """
+
+    def __init__(self, during_save=None):
+        self.exports = 0
+        self.during_save = during_save
+
+        optimum = types.ModuleType("optimum")
+        version = types.ModuleType("optimum.version")
+        version.__version__ = "1.0"
+        onnxruntime = types.ModuleType("optimum.onnxruntime")
+        onnxruntime.ORTModelForSeq2SeqLM = types.SimpleNamespace(from_pretrained=self.export)
+        optimum.version, optimum.onnxruntime = version, onnxruntime
+
+        transformers = types.ModuleType("transformers")
+        transformers.__version__ = "4.0"
+        transformers.AutoTokenizer = types.SimpleNamespace(
+            from_pretrained=lambda name: types.SimpleNamespace(save_pretrained=self.save_tokenizer)
+        )
+        self.modules = {
+            "optimum": optimum,
+            "optimum.version": version,
+            "optimum.onnxruntime": onnxruntime,
+            "transformers": transformers,
+        }
+
+    def export(self, model_name, export=False, use_cache=False):
+        assert export and use_cache
+        self.exports += 1
+        return types.SimpleNamespace(save_pretrained=self.save_model)
+
+    def save_model(self, path):
+        if self.during_save:
+            self.during_save()
+        for name in ("encoder_model.onnx", "decoder_with_past_model.onnx"):
+            with open(os.path.join(path, name), "wb") as f:
+                f.write(b"onnx")
+        with open(os.path.join(path, "config.json"), "w") as f:
+            json.dump({"exported_by": id(self)}, f)
+
+    @staticmethod
+    def save_tokenizer(path):
+        with open(os.path.join(path, "tokenizer.json"), "w") as f:
+            f.write("{}")
+
+    def installed(self):
+        return installed_modules(self.modules)
+
+
+def exported_by(path):
+    with open(os.path.join(path, "config.json")) as f:
+        return json.load(f)["exported_by"]
+
+
+def test_known_engines_resolve_case_insensitively():
+    """pytorch is always available; names are not case-sensitive"""
+    assert resolve_engine("pytorch") == "pytorch"
+    assert resolve_engine("PyTorch") == "pytorch"
+
+
+def test_unknown_engine_is_rejected():
+    """A typo in SUMMARY_ENGINE fails loudly instead of silently using pytorch"""
+    try:
+        resolve_engine("tensorrt")
+    except ValueError as e:
+        assert "tensorrt" in str(e)
+    else:
+        raise AssertionError("unknown engine was accepted")
+
+
+def test_onnx_falls_back_when_not_installed():
+    """Without optimum[onnxruntime] the onnx engine warns and uses pytorch"""
+    available = summary_engines.onnx_available
+    summary_engines.onnx_available = lambda: False
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            assert resolve_engine("onnx") == "pytorch"
+        assert any("optimum" in str(warning.message) for warning in caught)
+
+        summary_engines.onnx_available = lambda: True
+        assert resolve_engine("onnx") == "onnx"
+    finally:
+        summary_engines.onnx_available = available
+
+
+def test_onnx_export_runs_once_and_is_renamed_into_place():
+    """The export lands complete in its versioned directory and is reused afterwards"""
+    exporter = FakeExporter()
+    with exporter.installed(), tempfile.TemporaryDirectory() as directory:
+        path = export_onnx(MODEL, directory)
+        assert path == onnx_model_dir(MODEL, directory)
+        assert exporter.exports == 1
+        assert sorted(os.listdir(path)) == [
+            "config.json", "decoder_with_past_model.onnx", "encoder_model.onnx", "tokenizer.json"
+        ]
+        # Nothing but the finished export: the temp directory was renamed, not copied
+        assert os.listdir(directory) == [os.path.basename(path)]
+
+        assert export_onnx(MODEL, directory) == path
+        assert exporter.exports == 1
+
+
+def test_onnx_export_that_loses_the_race_keeps_the_winner():
+    """When another process renames its export in first, ours is discarded and theirs is used"""
+    winner = FakeExporter()
+
+    def finish_competing_export():
+        with winner.installed():
+            export_onnx(MODEL, directory)
+
+    loser = FakeExporter(during_save=finish_competing_export)
+    with tempfile.TemporaryDirectory() as directory:
+        with loser.installed():
+            path = export_onnx(MODEL, directory)
+        assert winner.exports == loser.exports == 1
+        assert exported_by(path) == id(winner)
+        assert os.listdir(directory) == [os.path.basename(path)]
+
+
+def test_failed_onnx_export_is_raised_and_cleaned_up():
+    """An export that fails for any other reason is reported and leaves no temp directory"""
+    def disk_full():
+        raise OSError("No space left on device")
+
+    exporter = FakeExporter(during_save=disk_full)
+    with exporter.installed(), tempfile.TemporaryDirectory() as directory:
+        try:
+            export_onnx(MODEL, directory)
+        except OSError as e:
+            assert "No space" in str(e)
+        else:
+            raise AssertionError("failed export was not raised")
+        assert os.listdir(directory) == []
+
+
+if __name__ == "__main__":
+    test_known_engines_resolve_case_insensitively()
+    test_unknown_engine_is_rejected()
+    test_onnx_falls_back_when_not_installed()
+    test_onnx_export_runs_once_and_is_renamed_into_place()
+    test_onnx_export_that_loses_the_race_keeps_the_winner()
+    test_failed_onnx_export_is_raised_and_cleaned_up()
+    print("✅ Summary engine tests passed!")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for header/footer stripping and whitespace normalization
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from text_cleanup import clean_pages, clean_records, line_signature
+
+
+BODIES = [
+    "Revenue grew in every region.",
+    "Costs were flat year over year.",
+    "Hiring slowed in the second half.",
+    "Outlook for next year is stable.",
+]
+
+
+def make_page(page_no, body):
+    return f"ACME Corp — Confidential\n{body}\nPage {page_no} of 4"
+
+
+def test_repeated_headers_and_footers_are_removed():
+    """Lines on the edge of most pages go; the body text stays"""
+    pages = [make_page(i + 1, body) for i, body in enumerate(BODIES)]
+    cleaned = clean_pages(pages)
+    assert cleaned == BODIES
+    assert all("Confidential" not in page and "Page" not in page for page in cleaned)
+
+
+def test_short_documents_are_left_alone():
+    """Two pages are not enough evidence to call a line boilerplate"""
+    pages = [make_page(1, "Intro."), make_page(2, "Outro.")]
+    assert all("Confidential" in page for page in clean_pages(pages))
+
+
+def test_hyphens_and_whitespace():
+    """Hyphenated line breaks are joined and whitespace runs collapsed"""
+    text = "The   infra-\nstructure  budget\n\n\n\nwas  approved.\t "
+    assert clean_pages([text]) == ["The infrastructure budget\n\nwas approved."]
+    assert clean_pages(["COVID-\n19"]) == ["COVID-\n19"]
+
+
+def test_boilerplate_is_detected_per_file():
+    """Each file's headers are judged against that file's pages only"""
+    records = [("a.pdf", i + 1, make_page(i + 1, body)) for i, body in enumerate(BODIES[:3])]
+    records += [("b.pdf", 1, "ACME Corp — Confidential\nOther body.")]
+    cleaned = clean_records(records)
+    assert [page for _, _, page in cleaned[:3]] == BODIES[:3]
+    assert "Confidential" in cleaned[3][2]
+    assert line_signature("Page 3 of 40") == line_signature("page  12 of 40")
+
+
+def test_repeated_data_lines_survive():
+    """Edge lines that differ only in their figures are data, not boilerplate"""
+    pages = [
+        f"Region {region}\nUnits sold: {units}\nTotal: ${total:,}"
+        for region, units, total in [("North", 120, 1234), ("South", 95, 5678), ("East", 40, 910), ("West", 77, 2345)]
+    ]
+    assert clean_pages(pages) == pages
+    assert line_signature("Total: $1,234") != line_signature("Total: $5,678")
+    assert line_signature("- 3 -") == line_signature("- 14 -")
+    assert line_signature("ACME Corp p. 3") == line_signature("ACME Corp p. 4")
+
+
+def test_only_the_outermost_lines_are_candidates():
+    """A line repeated just inside the header is body text and is kept"""
+    pages = [f"ACME Corp — Confidential\nSummary of findings\n{body}\nPage {i + 1} of 4" for i, body in enumerate(BODIES)]
+    cleaned = clean_pages(pages)
+    assert cleaned == [f"Summary of findings\n{body}" for body in BODIES]
+
+
+if __name__ == "__main__":
+    test_repeated_headers_and_footers_are_removed()
+    test_short_documents_are_left_alone()
+    test_hyphens_and_whitespace()
+    test_boilerplate_is_detected_per_file()
+    test_repeated_data_lines_survive()
+    test_only_the_outermost_lines_are_candidates()
+    print("✅ Text cleanup tests passed!")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the TextRank/LexRank extractive summarizer
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+from sentence_scoring import SentenceMatrix
+from textrank import pagerank, rank_sentences, similarity_graph, summarize, tfidf
+
+
+SENTENCES = [
+    "The company revenue grew strongly in the third quarter.",
+    "Revenue growth came from new markets in Asia.",
+    "The office cafeteria serves lunch at noon.",
+    "New markets in Asia drove revenue and company growth.",
+    "Cats sleep for most of the day.",
+]
+
+
+def dense_cosine(sentences):
+    """Reference cosine similarities computed densely from the same TF-IDF entries"""
+    matrix = SentenceMatrix(sentences)
+    rows, terms, weights = tfidf(matrix)
+    vectors = np.zeros((len(sentences), terms.max() + 1))
+    vectors[rows, terms] = weights
+    return vectors @ vectors.T
+
+
+def test_graph_keeps_top_k_neighbours_symmetrically():
+    """Edges match the dense cosine matrix and every sentence keeps its best neighbours"""
+    matrix = SentenceMatrix(SENTENCES)
+    rows, terms, weights = tfidf(matrix)
+    source, target, weight = similarity_graph(rows, terms, weights, len(SENTENCES), top_k=1, block_pairs=3)
+    reference = dense_cosine(SENTENCES)
+    np.testing.assert_allclose(weight, reference[source, target])
+    assert set(zip(source.tolist(), target.tolist())) == set(zip(target.tolist(), source.tolist()))
+    np.fill_diagonal(reference, 0)
+    for sentence in range(len(SENTENCES)):
+        if reference[sentence].max() > 0:
+            best = int(reference[sentence].argmax())
+            assert (sentence, best) in set(zip(source.tolist(), target.tolist()))
+
+
+def test_pagerank_is_a_distribution_favouring_hubs():
+    """Scores sum to one and the hub of a star graph ranks first"""
+    source = np.array([0, 0, 0, 1, 2, 3])
+    target = np.array([1, 2, 3, 0, 0, 0])
+    scores = pagerank(source, target, np.ones(6), 5)
+    assert abs(scores.sum() - 1) < 1e-6
+    assert scores.argmax() == 0
+    assert scores[4] < scores[1]  # Isolated sentence only gets the teleport share
+
+
+def test_summary_prefers_central_sentences_in_document_order():
+    """The sentences sharing the main topic are picked and returned in order"""
+    scores = rank_sentences(SENTENCES)
+    assert scores[[0, 1, 3]].min() > scores[[2, 4]].max()
+    assert summarize(SENTENCES, max_words=20) == [1, 3]
+    assert summarize(SENTENCES, max_words=30) == [0, 1, 3]
+    assert summarize([], max_words=20) == []
+
+
+def test_long_documents_stay_bounded():
+    """Pairs per term are capped, so the graph stays sparse on long inputs"""
+    rng = np.random.default_rng(0)
+    vocabulary = [f"term{i}" for i in range(500)]
+    sentences = [" ".join(rng.choice(vocabulary, size=12)) + "." for _ in range(3000)]
+    matrix = SentenceMatrix(sentences)
+    rows, terms, weights = tfidf(matrix)
+    source, _, _ = similarity_graph(rows, terms, weights, len(sentences), top_k=5)
+    assert len(source) <= 2 * 5 * len(sentences)
+    assert len(summarize(sentences, max_words=100)) <= 9
+
+
+def test_main_topic_of_long_documents_is_kept():
+    """A topic running through hundreds of sentences still links them, so they outrank unrelated ones"""
+    sentences = [
+        ("Quarterly revenue growth lifted the operating margin " if i % 3 == 0 else "")
+        + " ".join(f"detail{i}x{j}" for j in range(6)) + "."
+        for i in range(1500)
+    ]
+    scores = rank_sentences(sentences)
+    assert scores[0::3].min() > max(scores[1::3].max(), scores[2::3].max())
+
+
+if __name__ == "__main__":
+    test_graph_keeps_top_k_neighbours_symmetrically()
+    test_pagerank_is_a_distribution_favouring_hubs()
+    test_summary_prefers_central_sentences_in_document_order()
+    test_long_documents_stay_bounded()
+    test_main_topic_of_long_documents_is_kept()
+    print("✅ TextRank tests passed!")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test script for model warmup
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from warmup import WARMUP_WORDS, synthetic_text, warm_up
+
+
+def test_synthetic_text_reaches_the_requested_length():
+    """Warmup inputs have at least the requested number of words, in sentences"""
+    for words in (1, 60, 700):
+        text = synthetic_text(words)
+        assert words <= len(text.split()) < words + 20
+        assert text.endswith(".")
+
+
+def test_warm_up_runs_one_summary_per_length():
+    """Each representative length is summarized once and timed"""
+    seen = []
+    timings = warm_up(lambda text: seen.append(len(text.split())))
+    assert len(seen) == len(WARMUP_WORDS)
+    assert [words for words, _ in timings] == seen
+    assert all(seconds >= 0 for _, seconds in timings)
+
+
+def test_warm_up_failures_propagate():
+    """A model that cannot summarize must not be reported as warm"""
+    def broken(text):
+        raise RuntimeError("out of memory")
+    try:
+        warm_up(broken)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("warmup error was swallowed")
+
+
+if __name__ == "__main__":
+    test_synthetic_text_reaches_the_requested_length()
+    test_warm_up_runs_one_summary_per_length()
+    test_warm_up_failures_propagate()
+    print("✅ Warmup tests passed!")
@@ -0,0 +1,161 @@
+"""
+Normalization of extracted page text before chunking.
+
+Corporate PDFs repeat the same header, footer, confidentiality banner and
+page number on every page; left in, those lines reach the summarization
+model once per page. The first and last line of each page are indexed by
+a normalized signature (case-folded, page numbers replaced), and
+signatures that occur on a large share of a file's pages are removed from
+the page edges. Other digits stay in the signature, so repeated data lines
+such as "Total: $1,234" and "Total: $5,678" never match each other.
+Words hyphenated across a line break are joined, and runs of whitespace
+are collapsed.
+
+StreamingCleaner does the same for pages that arrive one at a time: it
+learns each file's boilerplate from its first BOILERPLATE_SAMPLE_PAGES
+pages, then cleans every later page as soon as it arrives.
+"""
+
+import os
+import re
+from collections import Counter
+
+CLEANUP_ENABLED = os.environ.get("PDF_STRIP_BOILERPLATE", "1") != "0"
+# A line counts as boilerplate when it sits at the edge of this share of pages
+BOILERPLATE_SHARE = float(os.environ.get("PDF_BOILERPLATE_SHARE", "0.5"))
+BOILERPLATE_MIN_PAGES = 3
+BOILERPLATE_SAMPLE_PAGES = 16
+# Only the outermost lines are header/footer candidates: on short pages a
+# wider edge would cover the body
+EDGE_LINES = 1
+
+_DIGITS = re.compile(r'\d+')
+# "Page 3", "p. 3", "Page 3 of 40", or a line that is only a number like "3", "- 3 -", "3 / 40"
+_PAGE_NUMBER = re.compile(
+    r'\b(?:page|pg\.?|p\.)\s*\d+(?:\s*(?:of|/)\s*\d+)?|^\W*\d+(?:\s*(?:of|/)\s*\d+)?\W*$',
+    re.IGNORECASE
+)
+_SPACES = re.compile(r'[^\S\n]+')
+_HYPHEN_BREAK = re.compile(r'([A-Za-z])-[^\S\n]*\n\s*([a-z])')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def line_signature(line):
+    """Key under which repeated lines match, e.g. "Page 3 of 40" ~ "page # of #"
+
+    Only page numbers are replaced; all other digits are kept.
+    """
+    line = _PAGE_NUMBER.sub(lambda match: _DIGITS.sub("#", match.group()), line)
+    return _SPACES.sub(" ", line).strip().casefold()
+
+
+def _edge_lines(lines):
+    """Indices of the first and last non-blank lines of a page"""
+    content = [i for i, line in enumerate(lines) if line.strip()]
+    return set(content[:EDGE_LINES] + content[-EDGE_LINES:])
+
+
+def find_boilerplate(page_texts, share=BOILERPLATE_SHARE, min_pages=BOILERPLATE_MIN_PAGES):
+    """Signatures of the edge lines that repeat on at least `share` of the pages"""
+    counts = Counter()
+    pages = 0
+    for page_text in page_texts:
+        if not page_text or page_text.isspace():
+            continue
+        pages += 1
+        lines = page_text.splitlines()
+        counts.update({line_signature(lines[i]) for i in _edge_lines(lines)})
+    if pages < min_pages:
+        return set()
+    threshold = max(2, share * pages)
+    return {signature for signature, count in counts.items() if count >= threshold and signature}
+
+
+def normalize_whitespace(text):
+    """Join hyphenated line breaks and collapse runs of spaces and blank lines"""
+    text = _HYPHEN_BREAK.sub(r'\1\2', text)
+    text = _SPACES.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def strip_boilerplate(page_text, boilerplate):
+    """Remove header/footer lines of one page whose signature is in `boilerplate`"""
+    if not boilerplate or not page_text:
+        return page_text
+    lines = page_text.splitlines()
+    drop = {i for i in _edge_lines(lines) if line_signature(lines[i]) in boilerplate}
+    if not drop:
+        return page_text
+    return "\n".join(line for i, line in enumerate(lines) if i not in drop)
+
+
+def clean_pages(page_texts):
+    """Clean the page texts of one file; returns a list of the same length"""
+    page_texts = list(page_texts)
+    if not CLEANUP_ENABLED:
+        return page_texts
+    boilerplate = find_boilerplate(page_texts)
+    return [normalize_whitespace(strip_boilerplate(page_text, boilerplate)) for page_text in page_texts]
+
+
+def clean_records(records):
+    """Clean (file_name, page_no, text) records, detecting boilerplate per file"""
+    cleaned = []
+    group = []
+    for record in records:
+        if group and record[0] != group[0][0]:
+            cleaned.extend(_clean_group(group))
+            group = []
+        group.append(record)
+    if group:
+        cleaned.extend(_clean_group(group))
+    return cleaned
+
+
+def _clean_group(group):
+    texts = clean_pages(page_text for _, _, page_text in group)
+    return [(file_name, page_no, page_text) for (file_name, page_no, _), page_text in zip(group, texts)]
+
+
+class StreamingCleaner:
+    """Per-file cleanup of (file_name, page_no, text) records as they arrive"""
+
+    def __init__(self, sample_pages=BOILERPLATE_SAMPLE_PAGES):
+        self.sample_pages = sample_pages
+        self._file_name = None
+        self._sample = []
+        self._boilerplate = None
+
+    def add(self, record):
+        """Feed one record; returns the records that are ready, cleaned"""
+        ready = []
+        if record[0] != self._file_name:
+            ready.extend(self.finish())
+            self._file_name = record[0]
+        if self._boilerplate is not None:
+            ready.append(self._clean(record))
+            return ready
+        self._sample.append(record)
+        if len(self._sample) >= self.sample_pages:
+            ready.extend(self._release())
+        return ready
+
+    def finish(self):
+        """Records still held back for the current file, cleaned"""
+        ready = self._release() if self._sample else []
+        self._boilerplate = None
+        return ready
+
+    def _release(self):
+        sample = (page_text for _, _, page_text in self._sample)
+        self._boilerplate = find_boilerplate(sample) if CLEANUP_ENABLED else set()
+        ready = [self._clean(record) for record in self._sample]
+        self._sample = []
+        return ready
+
+    def _clean(self, record):
+        file_name, page_no, page_text = record
+        if not CLEANUP_ENABLED:
+            return record
+        return file_name, page_no, normalize_whitespace(strip_boilerplate(page_text, self._boilerplate))
@@ -0,0 +1,234 @@
+"""
+Graph-based extractive summarization (LexRank/TextRank) without a model.
+
+Sentences become TF-IDF vectors over the vocabulary of a
+sentence_scoring.SentenceMatrix. Each sentence is linked to its TOP_K most
+cosine-similar sentences, and PageRank by power iteration over that sparse
+graph scores how central every sentence is to the document; the most
+central sentences, in document order, form the summary.
+
+Runtime and memory stay bounded on very long documents:
+
+- each sentence is paired with at most MAX_TERM_PAIRS of the sentences
+  sharing a term; a more common term (the document's main topic, on long
+  documents) links it to an evenly spaced sample of them instead, so it
+  still ties the topic together without a quadratic number of pairs
+- similarities are accumulated for BLOCK_PAIRS (sentence, sentence) pairs
+  at a time and only each sentence's TOP_K neighbours are kept, so the
+  graph has at most 2 * TOP_K * n edges
+- each power iteration is one pass over those edges
+"""
+
+import re
+
+import numpy as np
+
+from sentence_scoring import SentenceMatrix
+
+TOP_K = 10
+MAX_TERM_PAIRS = 64
+BLOCK_PAIRS = 2_000_000
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+MIN_SUMMARY_SENTENCE_WORDS = 5
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+# Function words link unrelated sentences; IDF alone does not weigh them
+# down enough
+STOP_WORDS = frozenset(
+    "a about above after again all also am an and any are as at be because been before being below "
+    "between both but by can could did do does doing down during each few for from further had has have "
+    "having he her here hers him his how i if in into is it its itself just me more most my no nor not "
+    "now of off on once only or other our ours out over own same she should so some such than that the "
+    "their theirs them then there these they this those through to too under until up very was we were "
+    "what when where which while who whom why will with would you your yours".split()
+)
+
+
+def tfidf(matrix):
+    """L2-normalized TF-IDF entries (rows, terms, weights) of a SentenceMatrix
+
+    Tokens are stripped of punctuation, so "revenue," and "revenue" are
+    one term, and STOP_WORDS are ignored. Terms in a single sentence
+    cannot link two sentences and are dropped.
+    """
+    n = len(matrix)
+    # Merge punctuation variants of a token into one normalized term
+    normalized = {}
+    term_ids = np.fromiter(
+        (normalized.setdefault(_NON_WORD.sub("", term), len(normalized)) for term in matrix.terms),
+        dtype=np.int64, count=len(matrix.terms)
+    )
+    ignored = np.zeros(len(normalized), dtype=bool)
+    ignored[[term_id for term, term_id in normalized.items() if not term or term in STOP_WORDS]] = True
+    cols = term_ids[matrix.cols]
+    keep = ~ignored[cols]
+
+    # Term frequency per (sentence, term)
+    keys = np.unique(matrix.rows[keep] * len(normalized) + cols[keep], return_counts=True)
+    rows, terms = np.divmod(keys[0], len(normalized))
+    counts = keys[1].astype(np.float64)
+
+    document_frequency = np.bincount(terms, minlength=len(normalized))
+    informative = document_frequency[terms] >= 2
+    rows, terms, counts = rows[informative], terms[informative], counts[informative]
+
+    # Smoothed IDF stays positive even for terms in every sentence
+    weights = counts * (np.log((1 + n) / (1 + document_frequency[terms])) + 1)
+    norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n))
+    weights /= norms[rows]
+    return rows, terms, weights
+
+
+def _ragged_ranges(starts, lengths):
+    """Concatenation of range(start, start + length) for each pair"""
+    total = int(lengths.sum())
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + np.arange(total) - offsets
+
+
+def _group_starts(values):
+    """Indices where a run of equal values begins in a sorted array"""
+    if not len(values):
+        return np.zeros(0, np.int64)
+    return np.flatnonzero(np.concatenate([[True], values[1:] != values[:-1]]))
+
+
+def _rank_in_groups(values):
+    """Position of each element within its run of equal values (sorted array)"""
+    starts = _group_starts(values)
+    sizes = np.diff(np.append(starts, len(values)))
+    return np.arange(len(values)) - np.repeat(starts, sizes)
+
+
+def _sum_duplicates(keys, values, n, reduce):
+    """Combine the values of equal source * n + target keys with `reduce`
+
+    Returns (source, target, value) sorted by source, then target. Sorting
+    once and reducing runs is much cheaper than np.unique(return_inverse).
+    """
+    order = np.argsort(keys)
+    keys, values = keys[order], values[order]
+    starts = _group_starts(keys)
+    source, target = np.divmod(keys[starts], n)
+    return source, target, reduce.reduceat(values, starts) if len(keys) else values
+
+
+def similarity_graph(rows, terms, weights, n, top_k=TOP_K, block_pairs=BLOCK_PAIRS, max_term_pairs=MAX_TERM_PAIRS):
+    """Sparse cosine-similarity graph keeping each sentence's top_k neighbours
+
+    Through a term in more than `max_term_pairs` sentences, a sentence is
+    only paired with `max_term_pairs` of them, spread evenly over the
+    postings and starting after itself; the similarities of the pairs
+    left out miss that term's share. Returns symmetric edge arrays
+    (source, target, weight).
+    """
+    # Postings: for each term, the sentences containing it
+    by_term = np.argsort(terms, kind="stable")
+    posting_rows, posting_weights = rows[by_term], weights[by_term]
+    posting_starts = np.searchsorted(terms[by_term], np.arange(terms.max() + 1 if len(terms) else 0))
+    posting_lengths = np.bincount(terms, minlength=len(posting_starts))
+
+    # Position of each entry in its term's postings, where its sample of a common term starts
+    posting_ranks = np.empty(len(rows), np.int64)
+    posting_ranks[by_term] = np.arange(len(rows)) - posting_starts[terms[by_term]]
+
+    # Entries are sorted by sentence; blocks of whole sentences are processed together
+    term_lengths = posting_lengths[terms]
+    pairs_per_entry = np.minimum(term_lengths, max_term_pairs)
+    pairs_before = np.concatenate([[0], np.cumsum(pairs_per_entry)])
+    sources, targets, similarities = [], [], []
+    block_start = 0
+    while block_start < len(rows):
+        block_end = int(np.searchsorted(pairs_before, pairs_before[block_start] + block_pairs, side="right")) - 1
+        block_end = max(block_end, block_start + 1)
+        # Extend to the end of the last sentence in the block
+        block_end = int(np.searchsorted(rows, rows[block_end - 1], side="right"))
+
+        entries = np.arange(block_start, block_end)
+        lengths = pairs_per_entry[entries]
+        offsets = _ragged_ranges(np.zeros(len(entries), np.int64), lengths)
+        pair_entries = np.repeat(entries, lengths)
+        term_length = term_lengths[pair_entries]
+        sampled = term_length > max_term_pairs
+        if sampled.any():
+            stride = term_length[sampled] // max_term_pairs
+            offsets[sampled] = (posting_ranks[pair_entries[sampled]] + 1 + offsets[sampled] * stride) % term_length[sampled]
+        postings = posting_starts[terms[pair_entries]] + offsets
+        source = np.repeat(rows[entries], lengths)
+        target = posting_rows[postings]
+        product = np.repeat(weights[entries], lengths) * posting_weights[postings]
+
+        distinct = source != target
+        source, target, sums = _sum_duplicates(source[distinct] * n + target[distinct], product[distinct], n, np.add)
+
+        # Top-k per source sentence: order by source, then by falling similarity
+        # (cosines lie in [0, 1], so one float key sorts by both), rank within each source
+        order = np.argsort(source * 2.0 - sums)
+        source, target, sums = source[order], target[order], sums[order]
+        best = _rank_in_groups(source) < top_k
+        sources.append(source[best])
+        targets.append(target[best])
+        similarities.append(sums[best])
+        block_start = block_end
+
+    if not sources:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0)
+    source = np.concatenate(sources)
+    target = np.concatenate(targets)
+    similarity = np.concatenate(similarities)
+
+    # Symmetrize: an edge kept by either endpoint links both ways
+    keys = np.concatenate([source * n + target, target * n + source])
+    return _sum_duplicates(keys, np.concatenate([similarity, similarity]), n, np.maximum)
+
+
+def pagerank(source, target, weight, n, damping=DAMPING, max_iterations=MAX_ITERATIONS, tolerance=TOLERANCE):
+    """PageRank by power iteration over a weighted edge list"""
+    if n == 0:
+        return np.zeros(0)
+    out_weight = np.bincount(source, weights=weight, minlength=n)
+    transition = weight / out_weight[source]
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iterations):
+        spread = np.bincount(target, weights=transition * scores[source], minlength=n)
+        # Sentences without neighbours pass nothing on (rather than spreading
+        # their score evenly), so unrelated sentences only keep the teleport share
+        updated = (1 - damping) / n + damping * spread
+        updated /= updated.sum()
+        change = np.abs(updated - scores).sum()
+        scores = updated
+        if change < tolerance:
+            break
+    return scores
+
+
+def rank_sentences(sentences, top_k=TOP_K):
+    """LexRank centrality score of each sentence"""
+    matrix = SentenceMatrix(list(sentences))
+    rows, terms, weights = tfidf(matrix)
+    graph = similarity_graph(rows, terms, weights, len(matrix), top_k=top_k)
+    return pagerank(*graph, len(matrix))
+
+
+def summarize(sentences, max_words, min_sentence_words=MIN_SUMMARY_SENTENCE_WORDS):
+    """Indices of the most central sentences that fit in `max_words`, in document order"""
+    sentences = list(sentences)
+    if not sentences:
+        return []
+    scores = rank_sentences(sentences)
+    word_counts = np.fromiter((len(sentence.split()) for sentence in sentences), dtype=np.int64, count=len(sentences))
+    # Fragments (headings, figure labels) may be central but read badly on their own
+    scores[word_counts < min_sentence_words] = -1
+    selected = []
+    words = 0
+    for index in np.argsort(-scores, kind="stable"):
+        if scores[index] < 0 or words >= max_words:
+            break
+        if words + word_counts[index] > max_words and selected:
+            continue
+        selected.append(int(index))
+        words += int(word_counts[index])
+    return sorted(selected)
@@ -0,0 +1,80 @@
+"""
+Upload handling shared by the FastAPI backend and the Streamlit apps.
+
+FastAPI uploads are streamed to a temporary file in fixed-size chunks and
+hashed on the way through, instead of being read into memory whole. PyPDF2
+then reads files through a read-only memory map, so the PDF bytes live in
+the OS page cache rather than in per-request Python buffers (PdfReader copies
+the whole file into a BytesIO when it is given a path).
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+
+# Bytes read from an UploadFile per await
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def map_file(path):
+    """Open a file as a read-only memory map that PdfReader can use as a stream"""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def upload_size(upload):
+    """Size of an uploaded file in bytes, taken from metadata when available"""
+    size = getattr(upload, "size", None)
+    if size is not None:
+        return size
+    position = upload.tell()
+    size = upload.seek(0, os.SEEK_END)
+    upload.seek(position)
+    return size
+
+
+class SpooledUpload:
+    """An upload written to a temporary file, with its size and SHA-256 digest"""
+
+    def __init__(self, path, size, sha256):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    def stream(self):
+        """Memory-mapped read-only view of the uploaded bytes"""
+        return map_file(self.path)
+
+    def close(self):
+        """Delete the temporary file"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+async def spool_upload(upload, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Stream a FastAPI UploadFile to disk chunk by chunk"""
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return SpooledUpload(path, size, digest.hexdigest())